@@ -23,5 +23,11 @@ setup(
         'asyncio',
         'cryptography>=3.3.1'
     ],
+    extras_require={
+        'http2': ['httpx[http2]']
+    },
+    entry_points={
+        'console_scripts': ['skyflow-bench=skyflow.testing.bench:main']
+    },
     python_requires=">=3.7"
 )
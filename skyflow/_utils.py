@@ -1,6 +1,8 @@
 import urllib.parse
 import logging
+import functools
 from enum import Enum
+import jwt
 
 skyflowLog = logging.getLogger('skyflow')
 skyflowLog.setLevel(logging.ERROR)
@@ -56,9 +58,16 @@ class InfoMessages(Enum):
     GET_BY_ID_SUCCESS = "Data fetched from ID successfully."
     BEARER_TOKEN_RECEIVED = "tokenProvider returned token successfully."
     INSERT_TRIGGERED = "Insert method triggered."
+    INSERT_STREAM_TRIGGERED = "Insert stream method triggered."
     DETOKENIZE_TRIGGERED = "Detokenize method triggered."
+    DETOKENIZE_STREAM_TRIGGERED = "Detokenize stream method triggered."
     GET_BY_ID_TRIGGERED = "Get by ID triggered."
     INVOKE_CONNECTION_TRIGGERED = "Invoke connection triggered."
+    WARMUP_TRIGGERED = "Warmup triggered."
+    WARMUP_SUCCESS = "Client warmed up successfully."
+    TOKEN_REFRESHED = "Bearer token refreshed in the background."
+    TOKEN_REFRESH_FAILED = "Background bearer token refresh failed, retrying: %s"
+    TOKEN_CACHE_WRITE_FAILED = "Could not store the bearer token in %s: %s"
     GENERATE_BEARER_TOKEN_TRIGGERED = "Generate bearer token triggered"
     GENERATE_BEARER_TOKEN_SUCCESS = "Generate bearer token returned successfully"
     IS_TOKEN_VALID_TRIGGERED = "isTokenValid() triggered"
@@ -70,15 +79,28 @@ class InfoMessages(Enum):
 class InterfaceName(Enum):
     CLIENT = "client"
     INSERT = "client.insert"
+    INSERT_STREAM = "client.insert_stream"
     DETOKENIZE = "client.detokenize"
+    DETOKENIZE_STREAM = "client.detokenize_stream"
     GET_BY_ID = "client.get_by_id"
     INVOKE_CONNECTION = "client.invoke_connection"
+    WARMUP = "client.warmup"
+    TOKEN_REFRESH = "client.token_refresh"
     GENERATE_BEARER_TOKEN = "service_account.generate_bearer_token"
 
     IS_TOKEN_VALID = "service_account.isTokenValid"
     IS_EXPIRED = "service_account.is_expired"
 
 
+@functools.lru_cache(maxsize=64)
+def decodeTokenClaims(token: str) -> dict:
+    '''
+    Decodes the claims of a JWT without verifying its signature. Every call checks the
+    expiry of the same few tokens, so results are cached per token and must not be modified.
+    '''
+    return jwt.decode(token, options={"verify_signature": False, "verify_aud": False})
+
+
 def http_build_query(data):
     '''
         Creates a form urlencoded string from python dictionary
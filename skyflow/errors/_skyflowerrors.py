@@ -4,6 +4,9 @@ from skyflow._utils import log_error
 
 class SkyflowErrorCodes(Enum):
     INVALID_INPUT = 400
+    REQUEST_TIMEOUT = 408
+    TOO_MANY_REQUESTS = 429
+    SERVICE_UNAVAILABLE = 503
     SERVER_ERROR = 500
     PARTIAL_SUCCESS = 500
 
@@ -56,6 +59,9 @@ class SkyflowErrorMessages(Enum):
     VAULT_ID_INVALID_TYPE = "Expected Vault ID to be str, got %s"
     VAULT_URL_INVALID_TYPE = "Expected Vault URL to be str, got %s"
     TOKEN_PROVIDER_ERROR = "Expected Token Provider to be function, got %s"
+    INVALID_POSITIVE_INT = "Expected %s to be a positive int, got %s"
+    INVALID_TIMEOUT = "Expected %s to be a positive number of seconds, got %s"
+    TIMEOUT = "Call did not complete within %s seconds, check SkyflowError.data for the finished requests"
 
     EMPTY_VAULT_ID = "Vault ID must not be empty"
     EMPTY_VAULT_URL = "Vault URL must not be empty"
@@ -63,6 +69,10 @@ class SkyflowErrorMessages(Enum):
 
     TOKEN_PROVIDER_INVALID_TOKEN = "Invalid token from tokenProvider"
 
+    RATE_LIMIT_EXCEEDED = "Client side rate limit of %s requests per second exceeded"
+    CIRCUIT_OPEN = "Circuit for %s is open, request was not sent"
+    HTTP2_NOT_AVAILABLE = "HTTP/2 transport requires the httpx and h2 packages, install skyflow[http2]"
+
 
 class SkyflowError(Exception):
     def __init__(self, code, message="An Error occured", data={}, interface: str = 'Unknown') -> None:
@@ -3,3 +3,4 @@ from ._token import generate_bearer_token
 from ._token import ResponseToken
 from ._token import generate_bearer_token_from_creds
 from ._validity import is_expired
+from ._tokenCache import BearerTokenCache
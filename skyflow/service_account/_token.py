@@ -5,6 +5,7 @@ import requests
 from warnings import warn
 from collections import namedtuple
 from skyflow._utils import log_info, InterfaceName, InfoMessages
+from skyflow.transport import Transport, RequestsTransport
 
 
 from skyflow.errors._skyflowerrors import *
@@ -13,11 +14,16 @@ ResponseToken = namedtuple('ResponseToken', ['AccessToken', 'TokenType'])
 interface = InterfaceName.GENERATE_BEARER_TOKEN
 
 
-def generate_bearer_token(credentialsFilePath: str) -> ResponseToken:
+def generate_bearer_token(credentialsFilePath: str, transport: Transport = None, cache=None) -> ResponseToken:
     '''
     This function is used to get the access token for skyflow Service Accounts.
     `credentialsFilePath` is the file path in string of the credentials file that is downloaded after Service Account creation.
 
+    `transport` sends the token request, plain requests calls being used by default.
+
+    `cache`, a BearerTokenCache, returns the unexpired token of an earlier call with the
+    same service account key instead of requesting a new one.
+
     Response Token is a named tupe with two attributes:
         1. AccessToken: The access token
         2. TokenType: The type of access token (eg: Bearer)
@@ -40,18 +46,23 @@ def generate_bearer_token(credentialsFilePath: str) -> ResponseToken:
     finally:
         credentialsFile.close()
 
-    result = getSAToken(credentials)
+    result = getSAToken(credentials, transport, cache)
 
     log_info(InfoMessages.GENERATE_BEARER_TOKEN_SUCCESS.value,
              interface=interface)
     return result
 
 
-def generate_bearer_token_from_creds(credentials: str) -> ResponseToken:
+def generate_bearer_token_from_creds(credentials: str, transport: Transport = None, cache=None) -> ResponseToken:
     '''
     This function is used to get the access token for skyflow Service Accounts.
     `credentials` arg takes the content of the credentials file that is downloaded after Service Account creation.
 
+    `transport` sends the token request, plain requests calls being used by default.
+
+    `cache`, a BearerTokenCache, returns the unexpired token of an earlier call with the
+    same service account key instead of requesting a new one.
+
     Response Token is a named tupe with two attributes:
         1. AccessToken: The access token
         2. TokenType: The type of access token (eg: Bearer)
@@ -64,14 +75,14 @@ def generate_bearer_token_from_creds(credentials: str) -> ResponseToken:
     except Exception as e:
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
                            SkyflowErrorMessages.INVALID_CREDENTIALS, interface=interface)
-    result = getSAToken(jsonCredentials)
+    result = getSAToken(jsonCredentials, transport, cache)
 
     log_info(InfoMessages.GENERATE_BEARER_TOKEN_SUCCESS.value,
              interface=interface)
     return result
 
 
-def getSAToken(credentials):
+def getSAToken(credentials, transport: Transport = None, cache=None):
     try:
         privateKey = credentials["privateKey"]
     except:
@@ -93,9 +104,15 @@ def getSAToken(credentials):
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
                            SkyflowErrorMessages.MISSING_TOKEN_URI, interface=interface)
 
+    if cache is not None:
+        return cache.getToken(credentials, lambda: requestSAToken(clientID, keyID, tokenURI, privateKey, transport))
+    return requestSAToken(clientID, keyID, tokenURI, privateKey, transport)
+
+
+def requestSAToken(clientID, keyID, tokenURI, privateKey, transport: Transport = None):
     signedToken = getSignedJWT(clientID, keyID, tokenURI, privateKey)
 
-    response = sendRequestWithToken(tokenURI, signedToken)
+    response = sendRequestWithToken(tokenURI, signedToken, transport)
     content = response.content.decode('utf-8')
 
     try:
@@ -121,7 +138,7 @@ def getSignedJWT(clientID, keyID, tokenURI, privateKey):
                            SkyflowErrorMessages.JWT_INVALID_FORMAT, interface=interface)
 
 
-def sendRequestWithToken(url, token):
+def sendRequestWithToken(url, token, transport: Transport = None):
     headers = {
         "content-type": "application/json"
     }
@@ -129,9 +146,12 @@ def sendRequestWithToken(url, token):
         "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
         "assertion":  token
     }
+    if transport is None:
+        transport = RequestsTransport()
     try:
-        response = requests.post(url=url, json=payload, headers=headers)
-        statusCode = response.status_code
+        response = transport.request(
+            "POST", url, headers=headers, data=json.dumps(payload))
+        statusCode = response.statusCode
     except requests.exceptions.InvalidURL:
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
                            SkyflowErrorMessages.INVALID_URL.value % (url), interface=interface)
@@ -139,18 +159,15 @@ def sendRequestWithToken(url, token):
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
                            SkyflowErrorMessages.INVALID_URL.value % (url), interface=interface)
 
-    try:
-        response.raise_for_status()
-    except requests.exceptions.HTTPError as error:
+    if statusCode >= 400:
         message = SkyflowErrorMessages.API_ERROR.value % statusCode
-        if error.response != None and error.response.content != None:
+        if response.content != None:
             try:
-                errorResponse = json.loads(
-                    error.response.content.decode('utf-8'))
+                errorResponse = json.loads(response.content.decode('utf-8'))
                 if 'error' in errorResponse and type(errorResponse['error']) == type({}) and 'message' in errorResponse['error']:
                     message = errorResponse['error']['message']
             except:
-                message = SkyflowErrorMessages.RESPONSE_NOT_JSON.value % error.response.content.decode(
+                message = SkyflowErrorMessages.RESPONSE_NOT_JSON.value % response.content.decode(
                     'utf-8')
         if 'x-request-id' in response.headers:
             message += ' - request id: ' + response.headers['x-request-id']
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from skyflow._utils import log_error, InfoMessages, InterfaceName, decodeTokenClaims
+from ._token import ResponseToken
+
+interface = InterfaceName.GENERATE_BEARER_TOKEN.value
+
+
+class BearerTokenCache:
+    '''
+    Keeps the bearer tokens returned by generate_bearer_token and
+    generate_bearer_token_from_creds per service account key (clientID and keyID),
+    and returns the cached token while it has more than `refreshMargin` seconds left
+    instead of signing a new assertion and calling the token endpoint.
+
+    With `directory`, tokens are also stored in files there, encrypted with a key
+    derived from the private key of the credentials, so that processes on one host
+    sharing the directory share tokens. Files are readable by the current user only
+    and a file that cannot be read or decrypted is ignored. A single instance is safe
+    to use from any thread.
+    '''
+
+    def __init__(self, directory: str = None, refreshMargin: float = 300):
+        self.directory = directory
+        self.refreshMargin = refreshMargin
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def getToken(self, credentials: dict, fetch) -> ResponseToken:
+        '''
+        Returns the cached token of the credentials, calling fetch for a new one if there is
+        none or it is about to expire. One fetch runs at a time per service account key.
+        '''
+        key = (credentials["clientID"], credentials["keyID"])
+        with self._keyLock(key):
+            token = self._tokens.get(key)
+            if token is None or not self._isFresh(token):
+                token = self._read(key, credentials["privateKey"])
+            if token is None or not self._isFresh(token):
+                token = fetch()
+                self._write(key, credentials["privateKey"], token)
+            self._tokens[key] = token
+            return token
+
+    def clear(self):
+        '''
+        Forgets the tokens held in memory, files in the directory are left in place
+        '''
+        with self._lock:
+            self._tokens = {}
+
+    def _keyLock(self, key):
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _isFresh(self, token: ResponseToken):
+        try:
+            return time.time() + self.refreshMargin < decodeTokenClaims(token.AccessToken)['exp']
+        except Exception:
+            return False
+
+    def _path(self, key):
+        # file names do not reveal the service account
+        name = hashlib.sha256('\0'.join(str(part) for part in key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.token')
+
+    def _read(self, key, privateKey: str):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as file:
+                content = _fernet(privateKey).decrypt(file.read())
+            token = json.loads(content.decode('utf-8'))
+            return ResponseToken(AccessToken=token["accessToken"], TokenType=token["tokenType"])
+        except (OSError, InvalidToken, ValueError, KeyError):
+            return None
+
+    def _write(self, key, privateKey: str, token: ResponseToken):
+        if self.directory is None or not self._isFresh(token):
+            return
+        content = _fernet(privateKey).encrypt(json.dumps(
+            {"accessToken": token.AccessToken, "tokenType": token.TokenType}).encode('utf-8'))
+        temporaryPath = None
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            # mkstemp creates the file with 0600 permissions, replacing the old file keeps readers consistent
+            descriptor, temporaryPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(content)
+            os.replace(temporaryPath, self._path(key))
+        except OSError as e:
+            log_error(InfoMessages.TOKEN_CACHE_WRITE_FAILED.value % (self.directory, str(e)), interface)
+            if temporaryPath is not None and os.path.exists(temporaryPath):
+                os.remove(temporaryPath)
+
+
+def _fernet(privateKey: str) -> Fernet:
+    '''
+    Fernet instance keyed from the private key, so only holders of the credentials can read the files
+    '''
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None,
+               info=b'skyflow bearer token cache').derive(privateKey.encode('utf-8'))
+    return Fernet(base64.urlsafe_b64encode(key))
@@ -2,7 +2,7 @@ from warnings import warn
 import jwt
 import time
 from skyflow.errors._skyflowerrors import *
-from skyflow._utils import InterfaceName, log_info, log_error, InfoMessages
+from skyflow._utils import InterfaceName, log_info, log_error, InfoMessages, decodeTokenClaims
 
 
 def is_expired(token: str):
@@ -17,9 +17,7 @@ def is_expired(token: str):
         return True
 
     try:
-        decoded = jwt.decode(
-            token, options={"verify_signature": False, "verify_aud": False})
-        if time.time() < decoded['exp']:
+        if time.time() < decodeTokenClaims(token)['exp']:
             return False
     except jwt.ExpiredSignatureError:
         return True
@@ -0,0 +1,2 @@
+from ._inMemoryVault import InMemoryVault, InMemoryTransport, AsyncInMemoryTransport
+from ._latency import FixedLatency, UniformLatency, LognormalLatency
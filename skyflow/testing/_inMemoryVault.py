@@ -0,0 +1,206 @@
+import asyncio
+import gzip
+import json
+import random
+import threading
+import time
+import uuid
+from urllib.parse import urlparse, parse_qs
+
+import jwt
+from requests.structures import CaseInsensitiveDict
+
+from skyflow.transport import Transport, AsyncTransport, TransportResponse
+
+
+class InMemoryVault:
+    '''
+    Emulates the vault APIs used by the SDK in process: batch insert with tokenization,
+    detokenize, get by id and the service account token endpoint. Any other request is
+    answered by echoing its method, path, headers and body, like a connection would.
+
+    `latency` is the time in seconds every request takes, or a function returning it so
+    that a latency distribution can be sampled. Records and tokens are kept in memory
+    for the lifetime of the instance, which can be shared by several transports and
+    used from any thread.
+
+    Faults are injected into every request but token requests: a fraction `throttleRate`
+    is answered with 429 and a `retryAfter` header (in seconds, None to leave it out),
+    and a fraction `errorRate` with 500. `seed` makes the injected faults reproducible.
+    '''
+
+    def __init__(self, latency=0.0, errorRate: float = 0.0, throttleRate: float = 0.0, retryAfter=1,
+                 seed: int = None):
+        self.latency = latency
+        self.errorRate = errorRate
+        self.throttleRate = throttleRate
+        self.retryAfter = retryAfter
+        self.tables = {}
+        self.tokens = {}
+        self.requestCount = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def getLatency(self) -> float:
+        return self.latency() if callable(self.latency) else self.latency
+
+    def handle(self, method: str, url: str, headers: dict = None, data=None, params: dict = None) -> TransportResponse:
+        headers = CaseInsensitiveDict(headers or {})
+        body = data.encode('utf-8') if isinstance(data, str) else (data or b'')
+        if headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        parsedURL = urlparse(url)
+        path = parsedURL.path.rstrip('/').split('/')
+        query = parse_qs(parsedURL.query)
+        for key, value in (params or {}).items():
+            query[key] = value if isinstance(value, list) else [value]
+
+        with self._lock:
+            self.requestCount += 1
+        payload = _loadJSON(body)
+        if method == 'POST' and isinstance(payload, dict) and 'grant_type' in payload:
+            return self._issueToken()
+        fault = self._injectFault()
+        if fault is not None:
+            return fault
+
+        isVault = len(path) >= 4 and path[1:3] == ['v1', 'vaults']
+        if method == 'POST' and isVault and len(path) == 4:
+            return self._insert(json.loads(body))
+        if method == 'POST' and isVault and path[-1] == 'detokenize':
+            return self._detokenize(json.loads(body))
+        if method == 'GET' and isVault and len(path) == 5:
+            return self._getById(path[4], query.get('skyflow_ids', []), query.get('redaction', ['DEFAULT'])[0])
+        return _respond(200, {'method': method, 'path': parsedURL.path, 'body': body.decode('utf-8'),
+                              'headers': {key.lower(): value for key, value in headers.items()}})
+
+    def _injectFault(self):
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.throttleRate:
+            headers = {} if self.retryAfter is None else {
+                'Retry-After': str(self.retryAfter)}
+            return _error(429, 'Too many requests', headers)
+        if draw < self.throttleRate + self.errorRate:
+            return _error(500, 'Injected server error')
+        return None
+
+    def _insert(self, body):
+        records = body['records']
+        inserts = [record for record in records if record['method'] == 'POST']
+        responses = []
+        with self._lock:
+            for record in inserts:
+                skyflowID = str(uuid.uuid4())
+                self.tables.setdefault(record['tableName'], {})[
+                    skyflowID] = dict(record['fields'])
+                responses.append({'records': [{'skyflow_id': skyflowID}]})
+            for record in records:
+                if record['method'] != 'GET':
+                    continue
+                # tokenization requests reference an insert as $responses.<index>.records.0.skyflow_id
+                skyflowID = responses[int(record['ID'].split('.')[1])]['records'][0]['skyflow_id']
+                fields = {}
+                for field, value in self.tables[record['tableName']][skyflowID].items():
+                    token = str(uuid.uuid4())
+                    self.tokens[token] = value
+                    fields[field] = token
+                responses.append({'fields': fields})
+        return _respond(200, {'responses': responses})
+
+    def _detokenize(self, body):
+        records = []
+        with self._lock:
+            for parameter in body['detokenizationParameters']:
+                token = parameter['token']
+                if token not in self.tokens:
+                    return _error(404, 'Token not found for ' + token)
+                records.append({'token': token, 'value': self.tokens[token]})
+        return _respond(200, {'records': records})
+
+    def _getById(self, table, ids, redaction):
+        records = []
+        with self._lock:
+            for skyflowID in ids:
+                fields = self.tables.get(table, {}).get(skyflowID)
+                if fields is None:
+                    return _error(404, 'No Records Found')
+                fields = {field: _redact(value, redaction)
+                          for field, value in fields.items()}
+                fields['skyflow_id'] = skyflowID
+                records.append({'fields': fields})
+        return _respond(200, {'records': records})
+
+    def _issueToken(self):
+        accessToken = jwt.encode({'exp': int(time.time()) + 3600}, uuid.uuid4().hex, algorithm='HS256')
+        return _respond(200, {'accessToken': accessToken, 'tokenType': 'Bearer'})
+
+
+class InMemoryTransport(Transport):
+    '''
+    Blocking transport answering every request from an InMemoryVault
+    '''
+
+    def __init__(self, vault: InMemoryVault = None):
+        self.vault = vault or InMemoryVault()
+
+    def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+        latency = self.vault.getLatency()
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('request did not complete within %s seconds' % timeout)
+        if latency > 0:
+            time.sleep(latency)
+        return self.vault.handle(method, url, headers, data, params)
+
+    def close(self):
+        pass
+
+
+class AsyncInMemoryTransport(AsyncTransport):
+    '''
+    Async transport answering every request from an InMemoryVault, it is not bound
+    to an event loop
+    '''
+
+    def __init__(self, vault: InMemoryVault = None):
+        self.vault = vault or InMemoryVault()
+
+    async def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+        latency = self.vault.getLatency()
+        if timeout is not None and latency > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        if latency > 0:
+            await asyncio.sleep(latency)
+        return self.vault.handle(method, url, headers, data, params)
+
+    async def close(self):
+        pass
+
+
+def _redact(value, redaction):
+    if redaction in ('PLAIN_TEXT', 'DEFAULT'):
+        return value
+    if redaction == 'REDACTED':
+        return '*REDACTED*'
+    value = str(value)
+    return '*' * max(0, len(value) - 4) + value[-4:]
+
+
+def _loadJSON(body):
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def _error(status, message, headers=None):
+    return _respond(status, {'error': {'http_code': status, 'message': message}}, headers)
+
+
+def _respond(status, body, headers=None):
+    headers = CaseInsensitiveDict(headers or {})
+    headers['Content-Type'] = 'application/json'
+    headers['x-request-id'] = str(uuid.uuid4())
+    return TransportResponse(status, json.dumps(body).encode('utf-8'), headers)
@@ -0,0 +1,43 @@
+import math
+import random
+
+
+class FixedLatency:
+    '''
+    Every request takes `seconds`
+    '''
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def __call__(self) -> float:
+        return self.seconds
+
+
+class UniformLatency:
+    '''
+    Request latencies are spread evenly between `low` and `high` seconds
+    '''
+
+    def __init__(self, low: float, high: float, seed: int = None):
+        self.low = low
+        self.high = high
+        self._random = random.Random(seed)
+
+    def __call__(self) -> float:
+        return self._random.uniform(self.low, self.high)
+
+
+class LognormalLatency:
+    '''
+    Request latencies follow a lognormal distribution around `median` seconds, the
+    long right tail growing with `sigma`. This is the usual shape of service latencies.
+    '''
+
+    def __init__(self, median: float, sigma: float, seed: int = None):
+        self.median = median
+        self.sigma = sigma
+        self._random = random.Random(seed)
+
+    def __call__(self) -> float:
+        return self._random.lognormvariate(math.log(self.median), self.sigma)
@@ -0,0 +1,322 @@
+'''
+Load generator driving a mix of Client calls against a vault, or against an embedded mock
+vault server when no URL is given, and reporting throughput, latency percentiles, error
+rates and client resource usage. Installed as the `skyflow-bench` command.
+'''
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+
+from skyflow._utils import skyflowLog, set_log_level, LogLevel
+from skyflow.errors._skyflowerrors import SkyflowError
+from skyflow.service_account import generate_bearer_token
+from skyflow.vault import Client
+from skyflow.vault._config import Configuration, PoolOptions, ConnectionConfig, RequestMethod, RedactionType, \
+    InsertOptions
+from .mockvault import parseLatency
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+OPERATIONS = ('insert', 'detokenize', 'get_by_id', 'invoke_connection')
+PERCENTILES = (50, 90, 99, 99.9)
+# records per insert request when preparing tokens, below the vault's per-request record limit
+PREPARE_BATCH_SIZE = 25
+
+
+class Recorder:
+    '''
+    Collects the latency and outcome of every call, from any thread
+    '''
+
+    def __init__(self):
+        self.latencies = {operation: [] for operation in OPERATIONS}
+        self.errors = {operation: {} for operation in OPERATIONS}
+        self._lock = threading.Lock()
+
+    def record(self, operation, latency, error=None):
+        with self._lock:
+            self.latencies[operation].append(latency)
+            if error is not None:
+                errors = self.errors[operation]
+                errors[error] = errors.get(error, 0) + 1
+
+
+class Workload:
+    '''
+    Issues single record calls of the given mix, reusing records inserted by `prepare`
+    '''
+
+    def __init__(self, client: Client, mix: dict, table: str, fields: dict, connectionURL: str = None):
+        self.client = client
+        self.table = table
+        self.fields = fields
+        self.connectionURL = connectionURL
+        self.operations = [operation for operation in OPERATIONS if mix.get(operation, 0) > 0]
+        self.weights = [mix[operation] for operation in self.operations]
+        self.records = []
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+    def prepare(self, count: int):
+        result = self.client.insert({'records': [{'table': self.table, 'fields': self.fields}
+                                                 for _ in range(count)]},
+                                    InsertOptions(batchSize=PREPARE_BATCH_SIZE))
+        self.records = result['records']
+
+    def choose(self):
+        with self._lock:
+            return self._random.choices(self.operations, self.weights)[0], self._random.choice(self.records)
+
+    def call(self, operation, record):
+        if operation == 'insert':
+            self.client.insert({'records': [{'table': self.table, 'fields': self.fields}]})
+        elif operation == 'detokenize':
+            token = next(value for key, value in record['fields'].items() if key != 'skyflow_id')
+            self.client.detokenize({'records': [{'token': token}]})
+        elif operation == 'get_by_id':
+            self.client.get_by_id({'records': [{'ids': [record['fields']['skyflow_id']], 'table': self.table,
+                                                'redaction': RedactionType.PLAIN_TEXT}]})
+        else:
+            self.client.invoke_connection(ConnectionConfig(
+                self.connectionURL, RequestMethod.POST, requestBody=self.fields))
+
+
+def run(workload: Workload, recorder: Recorder, duration: float, concurrency: int, rate: float = None):
+    '''
+    Runs the workload for duration seconds on concurrency threads, as fast as possible or
+    at rate calls per second. Rate limited latencies are measured from the scheduled start
+    of a call, so time spent queued behind slow calls is counted.
+    '''
+    deadline = time.perf_counter() + duration
+
+    def timedCall(scheduled):
+        operation, record = workload.choose()
+        error = None
+        try:
+            workload.call(operation, record)
+        except SkyflowError as e:
+            error = str(e.code)
+        except Exception as e:
+            error = type(e).__name__
+        recorder.record(operation, time.perf_counter() - scheduled, error)
+
+    def closedLoop():
+        while time.perf_counter() < deadline:
+            timedCall(time.perf_counter())
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if rate is None:
+            for _ in range(concurrency):
+                executor.submit(closedLoop)
+            return
+        scheduled = time.perf_counter()
+        while scheduled < deadline:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(timedCall, scheduled)
+            scheduled += 1 / rate
+
+
+def percentile(latencies, value):
+    '''
+    Nearest rank percentile of sorted latencies
+    '''
+    # the rank is rounded up, float noise such as 999.0000000000001 must not add a rank
+    rank = math.ceil(round(value * len(latencies) / 100, 9))
+    index = max(0, min(len(latencies) - 1, rank - 1))
+    return latencies[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    errorCount = sum(errors.values())
+    summary = {
+        'calls': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'errors': errorCount,
+        'errorRate': errorCount / len(latencies) if len(latencies) > 0 else 0.0,
+        'errorsByCode': errors
+    }
+    for value in PERCENTILES:
+        summary['p' + str(value).replace('.', '')] = percentile(latencies, value) if len(latencies) > 0 else None
+    return summary
+
+
+def report(recorder: Recorder, elapsed: float, cpuSeconds: float, maxRSS):
+    operations = {operation: summarize(recorder.latencies[operation], recorder.errors[operation], elapsed)
+                  for operation in OPERATIONS if len(recorder.latencies[operation]) > 0}
+    allErrors = {}
+    for operation in OPERATIONS:
+        for code, count in recorder.errors[operation].items():
+            allErrors[code] = allErrors.get(code, 0) + count
+    allLatencies = [latency for operation in OPERATIONS for latency in recorder.latencies[operation]]
+    return {
+        'duration': elapsed,
+        'total': summarize(allLatencies, allErrors, elapsed),
+        'operations': operations,
+        'client': {'cpuSeconds': cpuSeconds, 'cpuUtilization': cpuSeconds / elapsed, 'maxRSSBytes': maxRSS}
+    }
+
+
+def printReport(result, output=sys.stdout):
+    print('%-18s %8s %10s %8s %9s %9s %9s %9s' % ('operation', 'calls', 'calls/s', 'errors',
+                                                  'p50 ms', 'p90 ms', 'p99 ms', 'p999 ms'), file=output)
+    rows = list(result['operations'].items()) + [('total', result['total'])]
+    for name, summary in rows:
+        print('%-18s %8d %10.1f %7.2f%% %9s %9s %9s %9s' % (
+            name, summary['calls'], summary['throughput'], summary['errorRate'] * 100,
+            *[_milliseconds(summary[key]) for key in ('p50', 'p90', 'p99', 'p999')]), file=output)
+        if len(summary['errorsByCode']) > 0:
+            print('%-18s errors by code: %s' % ('', json.dumps(summary['errorsByCode'])), file=output)
+    client = result['client']
+    print('client cpu %.2fs (%.0f%% of one core), max rss %s' % (
+        client['cpuSeconds'], client['cpuUtilization'] * 100,
+        'unknown' if client['maxRSSBytes'] is None else '%.1f MiB' % (client['maxRSSBytes'] / 2 ** 20)), file=output)
+
+
+def _milliseconds(seconds):
+    return '-' if seconds is None else '%.2f' % (seconds * 1000)
+
+
+def _cpuSeconds():
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _maxRSS():
+    if resource is None:
+        return None
+    maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return maxRSS if sys.platform == 'darwin' else maxRSS * 1024
+
+
+def startMockVault(latency: str = None):
+    '''
+    Starts the mock vault in a separate process so that its work does not count as client CPU
+    '''
+    command = [sys.executable, '-m', 'skyflow.testing.mockvault', '--port', '0']
+    if latency is not None:
+        command += ['--latency', latency]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    line = process.stdout.readline()
+    process.stdout.close()
+    if line == '':
+        process.wait()
+        raise RuntimeError('mock vault failed to start')
+    return process, line.split()[-1]
+
+
+def _latencySpec(spec: str) -> str:
+    parseLatency(spec)
+    return spec
+
+
+def parseMix(spec: str) -> dict:
+    '''
+    Parses "insert=1,detokenize=4" into relative weights of the operations
+    '''
+    mix = {}
+    try:
+        for part in spec.split(','):
+            operation, _, weight = part.partition('=')
+            mix[operation.strip()] = float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid mix ' + repr(spec))
+    if any(operation not in OPERATIONS or weight < 0 for operation, weight in mix.items()) \
+            or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError('invalid mix ' + repr(spec))
+    return mix
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='skyflow-bench', description=__doc__.strip())
+    parser.add_argument('--url', help='vault URL, an embedded mock vault is started when left out')
+    parser.add_argument('--vault-id', default='vaultid')
+    parser.add_argument('--token', help='bearer token used for the vault calls')
+    parser.add_argument('--credentials', help='service account credentials file to generate tokens from')
+    parser.add_argument('--mix', type=parseMix, default=parseMix('insert=1,detokenize=4,get_by_id=1'),
+                        help='relative weights of %s, default insert=1,detokenize=4,get_by_id=1'
+                             % ', '.join(OPERATIONS))
+    parser.add_argument('--table', default='benchmark')
+    parser.add_argument('--fields', type=json.loads, default={'value': 'skyflow-bench'},
+                        help='JSON fields of inserted records')
+    parser.add_argument('--connection-url', help='connection URL called by invoke_connection')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run for')
+    parser.add_argument('--concurrency', type=int, default=10, help='calls in flight at most')
+    parser.add_argument('--rate', type=float, help='target calls per second instead of as many as possible')
+    parser.add_argument('--records', type=int, default=100,
+                        help='records inserted up front for detokenize and get_by_id')
+    parser.add_argument('--mock-latency', type=_latencySpec, default=None,
+                        help='latency of the embedded mock vault, see python -m skyflow.testing.mockvault')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    options = parser.parse_args(args)
+    if options.records < 1 or options.concurrency < 1:
+        parser.error('--records and --concurrency must be positive')
+    if options.url is not None:
+        if options.credentials is None and options.token is None:
+            parser.error('--token or --credentials is required with --url')
+        if options.mix.get('invoke_connection', 0) > 0 and options.connection_url is None:
+            parser.error('--connection-url is required to call invoke_connection')
+
+    if options.credentials is not None:
+        def tokenProvider():
+            return generate_bearer_token(options.credentials).AccessToken
+    else:
+        # the mock vault does not check signatures
+        token = options.token or jwt.encode({'exp': int(time.time()) + 86400}, 'skyflow-bench' * 3,
+                                            algorithm='HS256')
+
+        def tokenProvider():
+            return token
+
+    server = None
+    url = options.url
+    if url is None:
+        server, url = startMockVault(options.mock_latency)
+    connectionURL = options.connection_url or url + '/connection'
+
+    poolOptions = PoolOptions(maxConnectionsPerHost=options.concurrency, persistentEventLoop=True)
+    config = Configuration(options.vault_id, url, tokenProvider, poolOptions=poolOptions)
+    # failed calls are counted in the report rather than logged one by one
+    logLevel = skyflowLog.level
+    set_log_level(LogLevel.OFF)
+    try:
+        with Client(config) as client:
+            workload = Workload(client, options.mix, options.table, options.fields, connectionURL)
+            workload.prepare(options.records)
+
+            recorder = Recorder()
+            cpuStarted = _cpuSeconds()
+            started = time.perf_counter()
+            run(workload, recorder, options.duration, options.concurrency, options.rate)
+            result = report(recorder, time.perf_counter() - started, _cpuSeconds() - cpuStarted, _maxRSS())
+    finally:
+        skyflowLog.setLevel(logLevel)
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if options.json:
+        print(json.dumps(result, indent=2))
+    else:
+        printReport(result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+'''
+Mock vault server for load and latency tests, serving the vault APIs of an InMemoryVault
+over HTTP. Run it with `python -m skyflow.testing.mockvault --help`.
+'''
+import argparse
+import asyncio
+import threading
+
+from aiohttp import web
+
+from ._inMemoryVault import InMemoryVault
+from ._latency import FixedLatency, UniformLatency, LognormalLatency
+
+
+class MockVaultServer:
+    '''
+    HTTP server answering every request from `vault`, delayed by the vault's latency.
+    Use it from sync code with start() and close() or a `with` block, which run the
+    server on a background thread, or from a running event loop with startAsync()
+    and closeAsync(). `url` is known once the server has started; port 0 picks a free port.
+    '''
+
+    def __init__(self, vault: InMemoryVault = None, host: str = '127.0.0.1', port: int = 0):
+        self.vault = vault or InMemoryVault()
+        self.host = host
+        self.port = port
+        self.url = None
+        self._runner = None
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(
+            self.startAsync(), self._loop).result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(
+            self.closeAsync(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    async def startAsync(self):
+        application = web.Application(client_max_size=0)
+        application.router.add_route('*', '/{path:.*}', self._handle)
+        self._runner = web.AppRunner(application, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = 'http://%s:%d' % (self.host, port)
+
+    async def closeAsync(self):
+        await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request):
+        body = await request.read()
+        # aiohttp has already decoded compressed request bodies
+        headers = {key: value for key, value in request.headers.items()
+                   if key.lower() != 'content-encoding'}
+        latency = self.vault.getLatency()
+        if latency > 0:
+            await asyncio.sleep(latency)
+        response = self.vault.handle(
+            request.method, str(request.url), headers, body)
+        return web.Response(status=response.statusCode, body=response.content,
+                            headers={key: value for key, value in response.headers.items()
+                                     if key.lower() != 'content-type'},
+                            content_type='application/json')
+
+
+def parseLatency(spec: str):
+    '''
+    Parses "fixed:SECONDS", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA"
+    '''
+    kind, _, values = spec.partition(':')
+    distributions = {'fixed': FixedLatency,
+                     'uniform': UniformLatency, 'lognormal': LognormalLatency}
+    if kind not in distributions or values == '':
+        raise argparse.ArgumentTypeError('invalid latency ' + repr(spec))
+    try:
+        return distributions[kind](*[float(value) for value in values.split(',')])
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError('invalid latency ' + repr(spec))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m skyflow.testing.mockvault',
+                                     description='Serves an in-memory vault for load and latency tests.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=parseLatency, default=FixedLatency(0.0),
+                        help='fixed:SECONDS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed making injected faults reproducible')
+    options = parser.parse_args(args)
+
+    vault = InMemoryVault(latency=options.latency, errorRate=options.error_rate,
+                          throttleRate=options.throttle_rate, retryAfter=options.retry_after, seed=options.seed)
+    server = MockVaultServer(vault, options.host, options.port)
+
+    async def serve():
+        await server.startAsync()
+        print('Mock vault listening on ' + server.url, flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.closeAsync()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+from ._transport import TransportResponse, Transport, AsyncTransport
+from ._transport import RequestsTransport, AiohttpTransport, Http2Transport
@@ -0,0 +1,135 @@
+from abc import ABC, abstractmethod
+import requests
+from aiohttp import ClientSession, ClientTimeout
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
+
+try:
+    import httpx
+    import h2
+except ImportError:
+    httpx = None
+
+
+class TransportResponse:
+    '''
+    Fully read HTTP response, headers being a case insensitive mapping
+    '''
+
+    def __init__(self, statusCode: int, content: bytes, headers):
+        self.statusCode = statusCode
+        self.content = content
+        self.headers = headers
+
+
+class Transport(ABC):
+    '''
+    Sends the HTTP requests of blocking operations: Client.insert, Client.invoke_connection
+    and service account token requests. Implementations must be safe to use from several
+    threads at once, and should give up on a request after `timeout` seconds when it is set.
+    '''
+
+    @abstractmethod
+    def request(self, method: str, url: str, headers: dict = None, data=None, params: dict = None,
+                verify: bool = True, timeout: float = None) -> TransportResponse:
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class AsyncTransport(ABC):
+    '''
+    Sends the HTTP requests of async operations: every AsyncClient call and the
+    detokenize and get_by_id fan-outs of Client. Implementations must allow many
+    concurrent requests on the event loop they are used from, and release the connection
+    of a request that is cancelled.
+    '''
+
+    @abstractmethod
+    async def request(self, method: str, url: str, headers: dict = None, data=None, params: dict = None,
+                      verify: bool = True, timeout: float = None) -> TransportResponse:
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    '''
+    Blocking transport over a requests session, or over one-off requests without it
+    '''
+
+    def __init__(self, session: requests.Session = None):
+        self.session = session
+
+    def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+        send = self.session.request if self.session is not None else requests.request
+        # requests applies the timeout to connecting and to every read, not to the whole request
+        response = send(method, url, headers=headers, data=data,
+                        params=params, verify=verify, timeout=timeout)
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    '''
+    HTTP/1.1 transport over an aiohttp session, one connection per in-flight request
+    '''
+
+    def __init__(self, session: ClientSession):
+        self.session = session
+
+    async def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+        # only pass ssl when disabling verification, its accepted values differ between aiohttp versions
+        options = {} if verify else {'ssl': False}
+        if timeout is not None:
+            options['timeout'] = ClientTimeout(total=timeout)
+        async with self.session.request(method, url, headers=headers, data=data, params=params,
+                                        **options) as response:
+            content = await response.read()
+        return TransportResponse(response.status, content, response.headers)
+
+    async def close(self):
+        await self.session.close()
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+
+class Http2Transport(AsyncTransport):
+    '''
+    Transport multiplexing concurrent requests to a host over a few HTTP/2 connections,
+    falling back to HTTP/1.1 for servers that do not negotiate HTTP/2. Certificates are
+    always verified. Requires the httpx and h2 packages (`pip install skyflow[http2]`).
+    '''
+
+    def __init__(self, maxConnections: int = 100, keepAlive: bool = True):
+        checkHttp2Support()
+        limits = httpx.Limits(max_connections=maxConnections,
+                              max_keepalive_connections=None if keepAlive else 0)
+        self.client = httpx.AsyncClient(
+            http2=True, limits=limits, timeout=None)
+
+    async def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+        response = await self.client.request(method, url, headers=headers, content=data, params=params,
+                                             timeout=timeout)
+        return TransportResponse(response.status_code, response.content, response.headers)
+
+    async def close(self):
+        await self.client.aclose()
+
+    @property
+    def closed(self) -> bool:
+        return self.client.is_closed
+
+
+def checkHttp2Support(interface: str = 'Unknown'):
+    if httpx is None:
+        raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
+                           SkyflowErrorMessages.HTTP2_NOT_AVAILABLE, interface=interface)
@@ -1,2 +1,9 @@
 from ._client import Client
+from ._asyncClient import AsyncClient
+from ._adaptiveConcurrency import AdaptiveConcurrency
+from ._retry import RetryPolicy
+from ._rateLimiter import RateLimiter
+from ._circuitBreaker import CircuitBreaker, CircuitState
+from ._hedging import HedgingPolicy
+from ._tokenRefresh import TokenRefreshPolicy
 from ._config import * 
\ No newline at end of file
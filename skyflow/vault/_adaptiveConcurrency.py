@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class AdaptiveConcurrency:
+    '''
+    Additive-increase / multiplicative-decrease limit on in-flight vault requests.
+
+    The limit grows by `increase` for every full window of successful responses while
+    latency stays within `latencyThreshold` times its moving average, and is multiplied
+    by `backoffFactor` on a throttling status (429/503 by default), a failed request or
+    a latency spike. Latency only counts as a spike once it is also `latencyTolerance`
+    seconds above the average, so jitter on very fast responses is ignored. At most one
+    decrease happens per observed round trip, so a burst of throttled responses from
+    the same window only backs off once.
+
+    The current value is available as `limit` for monitoring.
+    '''
+
+    def __init__(self, initialLimit: int = 10, minLimit: int = 1, maxLimit: int = 200, increase: float = 1.0,
+                 backoffFactor: float = 0.5, latencyThreshold: float = 2.0, latencyTolerance: float = 0.05,
+                 throttleStatusCodes=(429, 503)):
+        self.minLimit = minLimit
+        self.maxLimit = maxLimit
+        self.increase = increase
+        self.backoffFactor = backoffFactor
+        self.latencyThreshold = latencyThreshold
+        self.latencyTolerance = latencyTolerance
+        self.throttleStatusCodes = set(throttleStatusCodes)
+        self._limit = float(min(max(initialLimit, minLimit), maxLimit))
+        self._averageLatency = None
+        self._lastDecrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def onResponse(self, latency: float, statusCode: int = None):
+        '''
+        Records the outcome of one request, statusCode None meaning it failed without a response
+        '''
+        with self._lock:
+            throttled = statusCode is None or statusCode in self.throttleStatusCodes
+            spiked = self._averageLatency is not None and latency > max(
+                self._averageLatency * self.latencyThreshold, self._averageLatency + self.latencyTolerance)
+            if throttled or spiked:
+                self._decrease(latency)
+                return
+
+            self._limit = min(self.maxLimit, self._limit +
+                              self.increase / self._limit)
+            if self._averageLatency is None:
+                self._averageLatency = latency
+            else:
+                self._averageLatency = 0.9 * self._averageLatency + 0.1 * latency
+
+    def _decrease(self, latency):
+        now = time.monotonic()
+        window = self._averageLatency if self._averageLatency is not None else latency
+        if now - self._lastDecrease < window:
+            return
+        self._lastDecrease = now
+        self._limit = max(self.minLimit, self._limit * self.backoffFactor)
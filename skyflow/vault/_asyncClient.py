@@ -0,0 +1,287 @@
+import asyncio
+import collections
+import functools
+from ._insert import parseResponse, convertResponse, mergeInsertResults, raiseStreamFailure, \
+    DEFAULT_STREAM_BATCH_SIZE
+from ._config import Configuration
+from ._config import InsertOptions, ConnectionConfig, DetokenizeOptions, GetByIdOptions
+from ._connection import createRequest
+from ._detokenize import sendDetokenizeRequests, streamDetokenizeRequests, createDetokenizeResponseBody
+from ._getById import sendGetByIdRequests, createGetByIdResponseBody
+from ._client import BaseClient, validatePositiveInt, openConnections
+from ._transport import createAsyncTransport
+from ._compression import ACCEPT_ENCODING
+from ._concurrency import runBounded, timedRequest, currentLimit
+from ._deadline import Deadline, DeadlineExceeded, withinDeadline
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
+from skyflow._utils import log_info, InfoMessages, InterfaceName
+
+
+class AsyncClient(BaseClient):
+    '''
+    Awaitable counterpart of Client for applications that already run an event loop.
+    The tokenProvider may be a regular function or a coroutine function.
+
+    The underlying transport is created on first use and is bound to the
+    event loop that is running at that time.
+    '''
+
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        self._transport = None
+        log_info(InfoMessages.CLIENT_INITIALIZED.value,
+                 interface=InterfaceName.CLIENT.value)
+
+    async def __aenter__(self):
+        if self.poolOptions.warmup:
+            await self.warmup()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        '''
+            Closes the pooled connections held by the client
+        '''
+        if self._transport is not None:
+            await self._transport.close()
+            self._transport = None
+
+    async def warmup(self, connections: int = None):
+        '''
+        Fetches the bearer token and opens `connections` pooled connections to the vault
+        (maxConnectionsPerHost by default) for detokenize and get_by_id, by sending that
+        many concurrent HEAD requests
+        '''
+        interface = InterfaceName.WARMUP.value
+        log_info(InfoMessages.WARMUP_TRIGGERED.value, interface)
+
+        self._checkConfig(interface)
+        connections = self._getWarmupConnections(connections, interface)
+        await self._refreshToken(interface)
+        await openConnections(self._getTransport(), self.vaultURL, connections)
+
+        log_info(InfoMessages.WARMUP_SUCCESS.value, interface)
+
+    async def insert(self, records: dict, options: InsertOptions = InsertOptions()):
+        interface = InterfaceName.INSERT.value
+        log_info(InfoMessages.INSERT_TRIGGERED.value, interface=interface)
+
+        self._checkConfig(interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        deadline = self._getDeadline(options, interface)
+
+        chunks = self._getInsertChunks(records, options, interface)
+        requestURL = self._get_complete_vault_url()
+        await self._refreshToken(interface, deadline)
+
+        futures = await runBounded([functools.partial(self._insertChunk, requestURL, chunk, options.tokens, deadline)
+                                    for chunk in chunks], maxConcurrency, self.adaptiveConcurrency, deadline)
+        result = mergeInsertResults(futures, [chunk[0]["records"] for chunk in chunks], deadline)
+
+        log_info(InfoMessages.INSERT_DATA_SUCCESS.value, interface)
+        return result
+
+    async def insert_stream(self, records, options: InsertOptions = InsertOptions()):
+        '''
+        Inserts records read lazily from an iterable or async iterable, yielding one
+        result dict per batch in input order with a bounded number of batches in flight.
+        The timeout of the options covers the whole stream. When a batch fails, the
+        batches in flight with it are awaited and reported as in Client.insert_stream.
+        '''
+        interface = InterfaceName.INSERT_STREAM.value
+        log_info(InfoMessages.INSERT_STREAM_TRIGGERED.value, interface=interface)
+
+        self._checkConfig(interface)
+        window = self._getStreamWindow(options, interface)
+        deadline = self._getDeadline(options, interface)
+        requestURL = self._get_complete_vault_url()
+
+        inFlight = collections.deque()
+        try:
+            async for batch in self._getAsyncStreamBatches(records, options, interface):
+                await self._refreshToken(interface, deadline)
+                inFlight.append((asyncio.ensure_future(timedRequest(self.adaptiveConcurrency, functools.partial(
+                    self._insertChunk, requestURL, batch, options.tokens, deadline))), batch))
+                while len(inFlight) >= currentLimit(window, self.adaptiveConcurrency):
+                    yield await self._nextStreamResult(inFlight, deadline, interface)
+            while len(inFlight) > 0:
+                yield await self._nextStreamResult(inFlight, deadline, interface)
+        except DeadlineExceeded:
+            raise deadline.error(interface)
+        finally:
+            for task, _ in inFlight:
+                task.cancel()
+
+        log_info(InfoMessages.INSERT_DATA_SUCCESS.value, interface)
+
+    async def _nextStreamResult(self, inFlight, deadline, interface):
+        task, _ = inFlight[0]
+        await asyncio.wait([task], timeout=deadline.remaining())
+        if task.done() and task.exception() is None:
+            inFlight.popleft()
+            return task.result()
+        # the batches sent after the failed one still commit, wait for them to report their records
+        tasks, batches = zip(*inFlight)
+        inFlight.clear()
+        await asyncio.wait(tasks, timeout=deadline.remaining())
+        results = []
+        for pending in tasks:
+            if not pending.done():
+                pending.cancel()
+                pending = asyncio.get_event_loop().create_future()
+                pending.set_exception(DeadlineExceeded())
+            results.append(pending)
+        raiseStreamFailure(results, batches, deadline, interface)
+
+    async def _getAsyncStreamBatches(self, records, options: InsertOptions, interface):
+        if not hasattr(records, '__aiter__'):
+            for batch in self._getStreamBatches(records, options, interface):
+                yield batch
+            return
+
+        batchSize = options.batchSize or DEFAULT_STREAM_BATCH_SIZE
+        validatePositiveInt('batchSize', batchSize, interface)
+        batch = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) == batchSize:
+                for chunk in self._getStreamBatches(batch, options, interface):
+                    yield chunk
+                batch = []
+        if len(batch) > 0:
+            for chunk in self._getStreamBatches(batch, options, interface):
+                yield chunk
+
+    async def _insertChunk(self, requestURL, chunk, tokens, deadline: Deadline = Deadline()):
+        request, jsonBody = chunk
+        headers = {
+            "Authorization": "Bearer " + self.storedToken,
+            "Accept-Encoding": ACCEPT_ENCODING
+        }
+        body, headers = self._policies.compressBody(jsonBody, headers)
+
+        async def send():
+            response = await self._getTransport().request("POST", requestURL, headers=headers, data=body)
+            self._policies.reportResponse(response.content, response.headers)
+            return (response.statusCode, response.content, response.headers), response.statusCode, response.headers
+
+        status, content, responseHeaders = await self._policies.sendAsync(
+            send, InterfaceName.INSERT.value, requestURL, deadline=deadline, idempotent=False)
+        processedResponse = parseResponse(status, content, responseHeaders)
+        return convertResponse(request, processedResponse, tokens)
+
+    async def detokenize(self, records, options: DetokenizeOptions = DetokenizeOptions()):
+        interface = InterfaceName.DETOKENIZE.value
+        log_info(InfoMessages.DETOKENIZE_TRIGGERED.value, interface)
+
+        self._checkConfig(interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        validatePositiveInt('batchSize', options.batchSize, interface)
+        deadline = self._getDeadline(options, interface)
+        await self._refreshToken(interface, deadline)
+        url = self._get_complete_vault_url() + '/detokenize'
+        responses = await sendDetokenizeRequests(
+            records, url, self.storedToken, transport=self._getTransport(), maxConcurrency=maxConcurrency,
+            batchSize=options.batchSize, limiter=self.adaptiveConcurrency, policies=self._policies,
+            deadline=deadline)
+        result, partial = createDetokenizeResponseBody(responses)
+        if "timedOut" in result:
+            raise deadline.error(interface, result)
+        if partial:
+            raise SkyflowError(SkyflowErrorCodes.PARTIAL_SUCCESS,
+                               SkyflowErrorMessages.PARTIAL_SUCCESS, result, interface=interface)
+        else:
+            log_info(InfoMessages.DETOKENIZE_SUCCESS.value, interface)
+            return result
+
+    async def detokenize_stream(self, records, options: DetokenizeOptions = DetokenizeOptions()):
+        '''
+        Yields each detokenized record, or {"error": ...} for a failed token, as soon as
+        its response arrives instead of waiting for the whole call to complete
+        '''
+        interface = InterfaceName.DETOKENIZE_STREAM.value
+        log_info(InfoMessages.DETOKENIZE_STREAM_TRIGGERED.value, interface)
+
+        self._checkConfig(interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        validatePositiveInt('batchSize', options.batchSize, interface)
+        deadline = self._getDeadline(options, interface)
+        await self._refreshToken(interface, deadline)
+        url = self._get_complete_vault_url() + '/detokenize'
+        stream = streamDetokenizeRequests(
+            records, url, self.storedToken, transport=self._getTransport(), maxConcurrency=maxConcurrency,
+            batchSize=options.batchSize, limiter=self.adaptiveConcurrency, policies=self._policies,
+            deadline=deadline)
+        try:
+            async for item in stream:
+                yield item
+        except DeadlineExceeded:
+            raise deadline.error(interface)
+        finally:
+            await stream.aclose()
+
+    async def get_by_id(self, records, options: GetByIdOptions = GetByIdOptions()):
+        interface = InterfaceName.GET_BY_ID.value
+        log_info(InfoMessages.GET_BY_ID_TRIGGERED.value, interface)
+
+        self._checkConfig(interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        deadline = self._getDeadline(options, interface)
+        await self._refreshToken(interface, deadline)
+        url = self._get_complete_vault_url()
+        responses = await sendGetByIdRequests(
+            records, url, self.storedToken, transport=self._getTransport(), maxConcurrency=maxConcurrency,
+            limiter=self.adaptiveConcurrency, policies=self._policies, deadline=deadline)
+        result, partial = createGetByIdResponseBody(responses)
+        if "timedOut" in result:
+            raise deadline.error(interface, result)
+        if partial:
+            raise SkyflowError(SkyflowErrorCodes.PARTIAL_SUCCESS,
+                               SkyflowErrorMessages.PARTIAL_SUCCESS, result, interface=interface)
+        else:
+            log_info(InfoMessages.GET_BY_ID_SUCCESS.value, interface)
+            return result
+
+    async def invoke_connection(self, config: ConnectionConfig):
+
+        interface = InterfaceName.INVOKE_CONNECTION.value
+        log_info(InfoMessages.INVOKE_CONNECTION_TRIGGERED.value, interface)
+
+        deadline = self._getDeadline(config, interface)
+        await self._refreshToken(interface, deadline)
+        request = createRequest(config)
+
+        if not 'X-Skyflow-Authorization'.lower() in request.headers:
+            request.headers['x-skyflow-authorization'] = self.storedToken
+        if not self.poolOptions.keepAlive and not self.poolOptions.http2:
+            request.headers['Connection'] = 'close'
+        # the transport computes the length of the body it sends itself
+        headers = {key: value for key, value in request.headers.items()
+                   if key.lower() != 'content-length'}
+
+        async def send():
+            response = await self._getTransport().request(request.method, request.url, headers=headers,
+                                                          data=request.body)
+            return (response.statusCode, response.content, response.headers), response.statusCode, response.headers
+
+        try:
+            status, content, responseHeaders = await withinDeadline(self._policies.sendAsync(
+                send, interface, config.connectionURL, retry=False, deadline=deadline), deadline)
+        except DeadlineExceeded:
+            raise deadline.error(interface)
+        return parseResponse(status, content, responseHeaders, interface=interface)
+
+    async def _refreshToken(self, interface, deadline: Deadline = Deadline()):
+        try:
+            await withinDeadline(self._tokenCache.getAsync(interface), deadline)
+        except DeadlineExceeded:
+            raise deadline.error(interface)
+
+    def _getTransport(self):
+        if self.asyncTransport is not None:
+            return self.asyncTransport
+        if self._transport is None:
+            self._transport = createAsyncTransport(self.poolOptions)
+        return self._transport
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from ._config import PoolOptions
+from ._transport import createAsyncTransport
+
+
+class BackgroundLoop:
+    '''
+    Event loop running on a dedicated daemon thread, together with one
+    long-lived transport that every coroutine submitted to it can reuse.
+    '''
+
+    def __init__(self, poolOptions: PoolOptions):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._runForever, name='skyflow-event-loop', daemon=True)
+        self._thread.start()
+        self.transport = self.run(self._createTransport(poolOptions))
+
+    def _runForever(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _createTransport(self, poolOptions: PoolOptions):
+        return createAsyncTransport(poolOptions)
+
+    def run(self, coroutine):
+        '''
+            Runs the coroutine on the background loop and blocks until it completes
+        '''
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        '''
+            Closes the shared transport and stops the loop thread
+        '''
+        if self._loop.is_closed():
+            return
+        self.run(self.transport.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
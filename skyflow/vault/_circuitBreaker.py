@@ -0,0 +1,121 @@
+import threading
+import time
+from enum import Enum
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
+
+
+class CircuitState(Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    '''
+    Keeps one circuit per endpoint: the vault records URL, the detokenize URL and the
+    URL of every invoked connection.
+
+    A circuit opens after `failureThreshold` consecutive failures, a failure being an
+    exception while sending or a status in `failureStatusCodes`. While open, requests
+    to the endpoint fail immediately with a SkyflowError of code 503, which detokenize
+    and get_by_id report as the error of each token or record not sent. After
+    `recoveryTimeout` seconds the circuit turns half-open and lets `halfOpenMaxCalls`
+    probe requests through: a successful probe closes it, a failed one opens it again.
+
+    `onStateChange(endpoint, oldState, newState)` is called on every transition, for
+    example to export metrics.
+    '''
+
+    def __init__(self, failureThreshold: int = 5, recoveryTimeout: float = 30.0, halfOpenMaxCalls: int = 1,
+                 failureStatusCodes=(500, 502, 503, 504), onStateChange=None):
+        self.failureThreshold = failureThreshold
+        self.recoveryTimeout = recoveryTimeout
+        self.halfOpenMaxCalls = halfOpenMaxCalls
+        self.failureStatusCodes = set(failureStatusCodes)
+        self.onStateChange = onStateChange
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def state(self, endpoint: str) -> CircuitState:
+        with self._lock:
+            return self._getCircuit(endpoint).state
+
+    def allow(self, endpoint: str, interface: str = 'Unknown'):
+        '''
+        Raises if the endpoint's circuit does not let a request through right now
+        '''
+        transitions = []
+        try:
+            with self._lock:
+                circuit = self._getCircuit(endpoint)
+                if circuit.state == CircuitState.OPEN:
+                    if time.monotonic() - circuit.openedAt < self.recoveryTimeout:
+                        self._reject(endpoint, interface)
+                    transitions.append(self._transition(
+                        circuit, CircuitState.HALF_OPEN))
+                if circuit.state == CircuitState.HALF_OPEN:
+                    if circuit.probes >= self.halfOpenMaxCalls:
+                        self._reject(endpoint, interface)
+                    circuit.probes += 1
+        finally:
+            self._notify(endpoint, transitions)
+
+    def record(self, endpoint: str, statusCode: int = None, error: Exception = None):
+        '''
+        Records the outcome of a request that was allowed through
+        '''
+        failed = error is not None or statusCode in self.failureStatusCodes
+        transitions = []
+        with self._lock:
+            circuit = self._getCircuit(endpoint)
+            if not failed:
+                circuit.failures = 0
+                if circuit.state != CircuitState.CLOSED:
+                    transitions.append(self._transition(
+                        circuit, CircuitState.CLOSED))
+            else:
+                circuit.failures += 1
+                if circuit.state == CircuitState.HALF_OPEN or \
+                        (circuit.state == CircuitState.CLOSED and circuit.failures >= self.failureThreshold):
+                    circuit.openedAt = time.monotonic()
+                    transitions.append(self._transition(
+                        circuit, CircuitState.OPEN))
+        self._notify(endpoint, transitions)
+
+    def release(self, endpoint: str):
+        '''
+        Gives back the probe slot of a request abandoned before its outcome was known
+        '''
+        with self._lock:
+            circuit = self._getCircuit(endpoint)
+            if circuit.state == CircuitState.HALF_OPEN and circuit.probes > 0:
+                circuit.probes -= 1
+
+    def _getCircuit(self, endpoint):
+        if endpoint not in self._circuits:
+            self._circuits[endpoint] = _Circuit()
+        return self._circuits[endpoint]
+
+    def _transition(self, circuit, state):
+        oldState = circuit.state
+        circuit.state = state
+        circuit.probes = 0
+        return oldState, state
+
+    def _notify(self, endpoint, transitions):
+        # called outside the lock so that the hook may query the breaker
+        if self.onStateChange is not None:
+            for oldState, newState in transitions:
+                self.onStateChange(endpoint, oldState, newState)
+
+    def _reject(self, endpoint, interface):
+        raise SkyflowError(SkyflowErrorCodes.SERVICE_UNAVAILABLE,
+                           SkyflowErrorMessages.CIRCUIT_OPEN.value % (endpoint), interface=interface)
+
+
+class _Circuit:
+    def __init__(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.probes = 0
+        self.openedAt = 0.0
@@ -1,18 +1,50 @@
 import types
+import threading
+import collections
+import itertools
+from typing import Iterable
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait
 import requests
-from ._insert import getInsertRequestBody, processResponse, convertResponse
+from requests.adapters import HTTPAdapter
+from ._insert import getInsertRequestChunks, parseResponse, convertResponse, mergeInsertResults, \
+    raiseStreamFailure, DEFAULT_STREAM_BATCH_SIZE
 from ._config import Configuration
-from ._config import InsertOptions, ConnectionConfig
+from ._config import InsertOptions, ConnectionConfig, PoolOptions, DetokenizeOptions, GetByIdOptions
 from ._connection import createRequest
-from ._detokenize import sendDetokenizeRequests, createDetokenizeResponseBody
+from ._detokenize import sendDetokenizeRequests, streamDetokenizeRequests, createDetokenizeResponseBody
 from ._getById import sendGetByIdRequests, createGetByIdResponseBody
 import asyncio
 from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
 from skyflow._utils import log_info, InfoMessages, InterfaceName
-from ._token import tokenProviderWrapper
+from ._token import TokenCache
+from ._tokenRefresh import TokenRefresher
+from ._backgroundLoop import BackgroundLoop
+from skyflow.transport import RequestsTransport
+from skyflow.transport._transport import checkHttp2Support
+from ._compression import ACCEPT_ENCODING
+from ._policies import RequestPolicies
+from ._concurrency import runBoundedThreads, timedCall, currentLimit
+from ._deadline import Deadline, DeadlineExceeded
 
 
-class Client:
+def validatePositiveInt(name, value, interface):
+    if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+        raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT, SkyflowErrorMessages.INVALID_POSITIVE_INT.value % (
+            name, str(value)), interface=interface)
+
+
+def validateTimeout(name, value, interface):
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+        raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT, SkyflowErrorMessages.INVALID_TIMEOUT.value % (
+            name, str(value)), interface=interface)
+
+
+class BaseClient:
+    '''
+    Validation and vault URL handling shared by Client and AsyncClient
+    '''
+
     def __init__(self, config: Configuration):
 
         interface = InterfaceName.CLIENT.value
@@ -30,44 +62,304 @@ class Client:
             raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT, SkyflowErrorMessages.TOKEN_PROVIDER_ERROR.value % (
                 str(type(config.tokenProvider))), interface=interface)
 
+        validatePositiveInt('poolSize', config.poolOptions.poolSize, interface)
+        validatePositiveInt('maxConnectionsPerHost',
+                            config.poolOptions.maxConnectionsPerHost, interface)
+        if config.maxConcurrency is not None:
+            validatePositiveInt(
+                'maxConcurrency', config.maxConcurrency, interface)
+        if config.timeout is not None:
+            validateTimeout('timeout', config.timeout, interface)
+        if config.poolOptions.http2:
+            checkHttp2Support(interface)
+
         self.vaultID = config.vaultID
         self.vaultURL = config.vaultURL.rstrip('/')
         self.tokenProvider = config.tokenProvider
-        self.storedToken = ''
-        log_info(InfoMessages.CLIENT_INITIALIZED.value, interface=interface)
+        self._tokenCache = TokenCache(config.tokenProvider)
+        self.poolOptions = config.poolOptions
+        self.maxConcurrency = config.maxConcurrency
+        self.adaptiveConcurrency = config.adaptiveConcurrency
+        self.retryPolicy = config.retryPolicy
+        self.rateLimiter = config.rateLimiter
+        self.circuitBreaker = config.circuitBreaker
+        self.hedgingPolicy = config.hedgingPolicy
+        self.compression = config.compression
+        self.transport = config.transport
+        self.asyncTransport = config.asyncTransport
+        self.timeout = config.timeout
+        self._policies = RequestPolicies(config.retryPolicy, config.rateLimiter, config.circuitBreaker,
+                                         config.hedgingPolicy, config.compression)
+
+    @property
+    def storedToken(self):
+        '''
+            Bearer token of the latest refresh, shared by every thread or task using the client
+        '''
+        return self._tokenCache.token
+
+    @storedToken.setter
+    def storedToken(self, token: str):
+        self._tokenCache.token = token
+
+    def _checkConfig(self, interface):
+        '''
+            Performs basic check on the given client config
+        '''
+        if not len(self.vaultID) > 0:
+            raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
+                               SkyflowErrorMessages.EMPTY_VAULT_ID, interface=interface)
+        if not len(self.vaultURL) > 0:
+            raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
+                               SkyflowErrorMessages.EMPTY_VAULT_URL, interface=interface)
+
+    def _get_complete_vault_url(self):
+        '''
+            Get the complete vault url from given vault url and vault id
+        '''
+        return self.vaultURL + "/v1/vaults/" + self.vaultID
+
+    def _getInsertChunks(self, records, options: InsertOptions, interface):
+        if options.batchSize is not None:
+            validatePositiveInt('batchSize', options.batchSize, interface)
+        if options.maxBatchBytes is not None:
+            validatePositiveInt(
+                'maxBatchBytes', options.maxBatchBytes, interface)
+        return getInsertRequestChunks(records, options.tokens, options.batchSize, options.maxBatchBytes)
+
+    def _getStreamWindow(self, options: InsertOptions, interface):
+        '''
+            Largest number of insert_stream batches allowed in flight
+        '''
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        if maxConcurrency is not None:
+            return maxConcurrency
+        if self.adaptiveConcurrency is not None:
+            return self.adaptiveConcurrency.maxLimit
+        return self.poolOptions.maxConnectionsPerHost
+
+    def _getStreamBatches(self, records: Iterable[dict], options: InsertOptions, interface):
+        '''
+            Reads batchSize records at a time from the iterable and yields their request chunks
+        '''
+        batchSize = options.batchSize or DEFAULT_STREAM_BATCH_SIZE
+        validatePositiveInt('batchSize', batchSize, interface)
+        if options.maxBatchBytes is not None:
+            validatePositiveInt(
+                'maxBatchBytes', options.maxBatchBytes, interface)
+
+        iterator = iter(records)
+        while True:
+            batch = list(itertools.islice(iterator, batchSize))
+            if len(batch) == 0:
+                return
+            yield from getInsertRequestChunks({"records": batch}, options.tokens, None, options.maxBatchBytes)
+
+    def _getWarmupConnections(self, connections, interface):
+        if connections is None:
+            return self.poolOptions.maxConnectionsPerHost
+        validatePositiveInt('connections', connections, interface)
+        return connections
+
+    def _getMaxConcurrency(self, options, interface):
+        '''
+            Per call options take precedence over the client wide concurrency limit
+        '''
+        if options.maxConcurrency is None:
+            return self.maxConcurrency
+        validatePositiveInt('maxConcurrency', options.maxConcurrency, interface)
+        return options.maxConcurrency
+
+    def _getDeadline(self, options, interface):
+        '''
+            Starts the deadline of a call, the options' timeout taking precedence over the client wide one
+        '''
+        if options.timeout is None:
+            return Deadline(self.timeout)
+        validateTimeout('timeout', options.timeout, interface)
+        return Deadline(options.timeout)
+
+
+class Client(BaseClient):
+    def __init__(self, config: Configuration):
+        super().__init__(config)
+        self._session = self._createSession(config.poolOptions)
+        self._transport = config.transport or RequestsTransport(self._session)
+        self._backgroundLoop = None
+        self._backgroundLoopLock = threading.Lock()
+        self._tokenRefresher = None
+        if config.tokenRefresh is not None:
+            self._tokenRefresher = TokenRefresher(self._tokenCache, config.tokenRefresh)
+            self._tokenRefresher.start()
+        log_info(InfoMessages.CLIENT_INITIALIZED.value,
+                 interface=InterfaceName.CLIENT.value)
+        if config.poolOptions.warmup:
+            try:
+                self.warmup()
+            except BaseException:
+                self.close()
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+            Closes the pooled connections held by the client and stops its token refresh
+        '''
+        if self._tokenRefresher is not None:
+            self._tokenRefresher.stop()
+        self._session.close()
+        with self._backgroundLoopLock:
+            if self._backgroundLoop is not None:
+                self._backgroundLoop.close()
+                self._backgroundLoop = None
+
+    def warmup(self, connections: int = None):
+        '''
+        Fetches the bearer token and opens `connections` pooled connections to the vault
+        (maxConnectionsPerHost by default) by sending that many concurrent HEAD requests,
+        so that the first calls do not pay for DNS, TCP and TLS setup or the token. With a
+        persistent event loop the pool of detokenize and get_by_id is warmed up as well.
+        '''
+        interface = InterfaceName.WARMUP.value
+        log_info(InfoMessages.WARMUP_TRIGGERED.value, interface)
+
+        self._checkConfig(interface)
+        connections = self._getWarmupConnections(connections, interface)
+        self._tokenCache.get(interface)
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(lambda _: self._request("HEAD", self.vaultURL, {}, None),
+                              range(connections)))
+        # with HTTP/2 and no transport of their own the fan-outs share the pool warmed up above
+        if self.poolOptions.persistentEventLoop and (self.asyncTransport is not None or not self.poolOptions.http2):
+            backgroundLoop = self._getBackgroundLoop()
+            backgroundLoop.run(openConnections(
+                self.asyncTransport or backgroundLoop.transport, self.vaultURL, connections))
+
+        log_info(InfoMessages.WARMUP_SUCCESS.value, interface)
 
     def insert(self, records: dict, options: InsertOptions = InsertOptions()):
         interface = InterfaceName.INSERT.value
         log_info(InfoMessages.INSERT_TRIGGERED.value, interface=interface)
 
         self._checkConfig(interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        deadline = self._getDeadline(options, interface)
 
-        jsonBody = getInsertRequestBody(records, options.tokens)
+        chunks = self._getInsertChunks(records, options, interface)
         requestURL = self._get_complete_vault_url()
-        self.storedToken = tokenProviderWrapper(
-            self.storedToken, self.tokenProvider, interface)
-        headers = {
-            "Authorization": "Bearer " + self.storedToken
-        }
+        self._tokenCache.get(interface)
+        if deadline.expired():
+            raise deadline.error(interface)
 
-        response = requests.post(requestURL, data=jsonBody, headers=headers)
-        processedResponse = processResponse(response)
-        result = convertResponse(records, processedResponse, options.tokens)
+        if len(chunks) == 1:
+            try:
+                result = timedCall(self.adaptiveConcurrency, self._insertChunk,
+                                   requestURL, chunks[0], options.tokens, deadline)
+            except DeadlineExceeded:
+                raise deadline.error(interface, {"records": [], "errors": [],
+                                                 "timedOut": chunks[0][0]["records"]})
+        else:
+            # one thread per pooled connection unless the caller or a limiter decides otherwise
+            if maxConcurrency is None and self.adaptiveConcurrency is None:
+                maxConcurrency = self.poolOptions.maxConnectionsPerHost
+            futures = runBoundedThreads([functools.partial(self._insertChunk, requestURL, chunk, options.tokens,
+                                                           deadline)
+                                         for chunk in chunks], maxConcurrency, self.adaptiveConcurrency)
+            result = mergeInsertResults(futures, [chunk[0]["records"] for chunk in chunks], deadline)
 
         log_info(InfoMessages.INSERT_DATA_SUCCESS.value, interface)
         return result
 
-    def detokenize(self, records):
+    def insert_stream(self, records: Iterable[dict], options: InsertOptions = InsertOptions()):
+        '''
+        Inserts records read lazily from any iterable, yielding one result dict per batch
+        in input order. At most maxConcurrency batches (the pool size by default) are
+        in flight, so memory is bounded by that window rather than by the input size.
+        The timeout of the options covers the whole stream, batches yielded before it
+        expired are complete. When a batch fails, the batches in flight with it are
+        awaited and the SkyflowError raised lists the records they inserted.
+        '''
+        interface = InterfaceName.INSERT_STREAM.value
+        log_info(InfoMessages.INSERT_STREAM_TRIGGERED.value, interface=interface)
+
+        self._checkConfig(interface)
+        window = self._getStreamWindow(options, interface)
+        deadline = self._getDeadline(options, interface)
+        requestURL = self._get_complete_vault_url()
+
+        with ThreadPoolExecutor(max_workers=window) as executor:
+            inFlight = collections.deque()
+            try:
+                for batch in self._getStreamBatches(records, options, interface):
+                    self._tokenCache.get(interface)
+                    deadline.check()
+                    inFlight.append((executor.submit(
+                        timedCall, self.adaptiveConcurrency, self._insertChunk, requestURL, batch, options.tokens,
+                        deadline), batch))
+                    while len(inFlight) >= currentLimit(window, self.adaptiveConcurrency):
+                        yield self._nextStreamResult(inFlight, deadline, interface)
+                while len(inFlight) > 0:
+                    yield self._nextStreamResult(inFlight, deadline, interface)
+            except DeadlineExceeded:
+                raise deadline.error(interface)
+
+        log_info(InfoMessages.INSERT_DATA_SUCCESS.value, interface)
+
+    def _nextStreamResult(self, inFlight, deadline, interface):
+        future, _ = inFlight[0]
+        if future.exception() is None:
+            inFlight.popleft()
+            return future.result()
+        # the batches sent after the failed one still commit, wait for them to report their records
+        futures, batches = zip(*inFlight)
+        inFlight.clear()
+        wait(futures)
+        raiseStreamFailure(futures, batches, deadline, interface)
+
+    def _insertChunk(self, requestURL, chunk, tokens, deadline: Deadline = Deadline()):
+        request, jsonBody = chunk
+        headers = {
+            "Authorization": "Bearer " + self.storedToken,
+            "Accept-Encoding": ACCEPT_ENCODING
+        }
+        body, headers = self._policies.compressBody(jsonBody, headers)
+
+        def send():
+            response = self._request("POST", requestURL, headers, body, deadline.remaining())
+            self._policies.reportResponse(response.content, response.headers)
+            return (response.statusCode, response.content, response.headers), response.statusCode, \
+                response.headers
+
+        status, content, responseHeaders = self._policies.send(
+            send, InterfaceName.INSERT.value, requestURL, deadline=deadline, idempotent=False)
+        processedResponse = parseResponse(status, content, responseHeaders)
+        return convertResponse(request, processedResponse, tokens)
+
+    def detokenize(self, records, options: DetokenizeOptions = DetokenizeOptions()):
         interface = InterfaceName.DETOKENIZE.value
         log_info(InfoMessages.DETOKENIZE_TRIGGERED.value, interface)
 
         self._checkConfig(interface)
-        self.storedToken = tokenProviderWrapper(
-            self.storedToken, self.tokenProvider, interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        validatePositiveInt('batchSize', options.batchSize, interface)
+        deadline = self._getDeadline(options, interface)
+        self._tokenCache.get(interface)
+        if deadline.expired():
+            raise deadline.error(interface)
         url = self._get_complete_vault_url() + '/detokenize'
-        responses = asyncio.run(sendDetokenizeRequests(
-            records, url, self.storedToken))
+        responses = self._runFanOut(lambda transport: sendDetokenizeRequests(
+            records, url, self.storedToken, transport=transport, maxConcurrency=maxConcurrency,
+            batchSize=options.batchSize, limiter=self.adaptiveConcurrency, policies=self._policies,
+            deadline=deadline))
         result, partial = createDetokenizeResponseBody(responses)
+        if "timedOut" in result:
+            raise deadline.error(interface, result)
         if partial:
             raise SkyflowError(SkyflowErrorCodes.PARTIAL_SUCCESS,
                                SkyflowErrorMessages.PARTIAL_SUCCESS, result, interface=interface)
@@ -75,17 +367,47 @@ class Client:
             log_info(InfoMessages.DETOKENIZE_SUCCESS.value, interface)
             return result
 
-    def get_by_id(self, records):
+    def detokenize_stream(self, records, options: DetokenizeOptions = DetokenizeOptions()):
+        '''
+        Yields each detokenized record, or {"error": ...} for a failed token, as soon as
+        its response arrives instead of waiting for the whole call to complete
+        '''
+        interface = InterfaceName.DETOKENIZE_STREAM.value
+        log_info(InfoMessages.DETOKENIZE_STREAM_TRIGGERED.value, interface)
+
+        self._checkConfig(interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        validatePositiveInt('batchSize', options.batchSize, interface)
+        deadline = self._getDeadline(options, interface)
+        self._tokenCache.get(interface)
+        if deadline.expired():
+            raise deadline.error(interface)
+        url = self._get_complete_vault_url() + '/detokenize'
+        try:
+            yield from self._iterateFanOut(lambda transport: streamDetokenizeRequests(
+                records, url, self.storedToken, transport=transport, maxConcurrency=maxConcurrency,
+                batchSize=options.batchSize, limiter=self.adaptiveConcurrency, policies=self._policies,
+                deadline=deadline))
+        except DeadlineExceeded:
+            raise deadline.error(interface)
+
+    def get_by_id(self, records, options: GetByIdOptions = GetByIdOptions()):
         interface = InterfaceName.GET_BY_ID.value
         log_info(InfoMessages.GET_BY_ID_TRIGGERED.value, interface)
 
         self._checkConfig(interface)
-        self.storedToken = tokenProviderWrapper(
-            self.storedToken, self.tokenProvider, interface)
+        maxConcurrency = self._getMaxConcurrency(options, interface)
+        deadline = self._getDeadline(options, interface)
+        self._tokenCache.get(interface)
+        if deadline.expired():
+            raise deadline.error(interface)
         url = self._get_complete_vault_url()
-        responses = asyncio.run(sendGetByIdRequests(
-            records, url, self.storedToken))
+        responses = self._runFanOut(lambda transport: sendGetByIdRequests(
+            records, url, self.storedToken, transport=transport, maxConcurrency=maxConcurrency,
+            limiter=self.adaptiveConcurrency, policies=self._policies, deadline=deadline))
         result, partial = createGetByIdResponseBody(responses)
+        if "timedOut" in result:
+            raise deadline.error(interface, result)
         if partial:
             raise SkyflowError(SkyflowErrorCodes.PARTIAL_SUCCESS,
                                SkyflowErrorMessages.PARTIAL_SUCCESS, result, interface=interface)
@@ -99,31 +421,108 @@ class Client:
         interface = InterfaceName.INVOKE_CONNECTION.value
         log_info(InfoMessages.INVOKE_CONNECTION_TRIGGERED.value, interface)
 
-        session = requests.Session()
-        self.storedToken = tokenProviderWrapper(
-            self.storedToken, self.tokenProvider, interface)
+        deadline = self._getDeadline(config, interface)
+        self._tokenCache.get(interface)
+        if deadline.expired():
+            raise deadline.error(interface)
         request = createRequest(config)
 
         if not 'X-Skyflow-Authorization'.lower() in request.headers:
             request.headers['x-skyflow-authorization'] = self.storedToken
+        if not self.poolOptions.keepAlive and not self.poolOptions.http2:
+            request.headers['Connection'] = 'close'
+        # the transport computes the length of the body it sends itself
+        headers = {key: value for key, value in request.headers.items()
+                   if key.lower() != 'content-length'}
 
-        response = session.send(request)
-        session.close()
-        return processResponse(response, interface=interface)
+        def send():
+            response = self._request(request.method, request.url, headers, request.body, deadline.remaining())
+            return (response.statusCode, response.content, response.headers), response.statusCode, \
+                response.headers
 
-    def _checkConfig(self, interface):
+        # connection requests are rate limited but never retried, they need not be idempotent
+        try:
+            status, content, responseHeaders = self._policies.send(
+                send, interface, config.connectionURL, retry=False, deadline=deadline)
+        except DeadlineExceeded:
+            raise deadline.error(interface)
+        return parseResponse(status, content, responseHeaders, interface=interface)
+
+    def _request(self, method, url, headers, data, timeout=None):
         '''
-            Performs basic check on the given client config
+            Sends one blocking request, through the background loop's transport when it carries every operation with HTTP/2
         '''
-        if not len(self.vaultID) > 0:
-            raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
-                               SkyflowErrorMessages.EMPTY_VAULT_ID, interface=interface)
-        if not len(self.vaultURL) > 0:
-            raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
-                               SkyflowErrorMessages.EMPTY_VAULT_URL, interface=interface)
+        if self.transport is not None or not self.poolOptions.http2:
+            return self._transport.request(method, url, headers=headers, data=data, timeout=timeout)
+        backgroundLoop = self._getBackgroundLoop()
+        return backgroundLoop.run(backgroundLoop.transport.request(
+            method, url, headers=headers, data=data, timeout=timeout))
 
-    def _get_complete_vault_url(self):
+    def _runFanOut(self, sendRequests):
         '''
-            Get the complete vault url from given vault url and vault id
+            Runs an async fan-out either on the client's background loop or on a fresh one.
+            sendRequests receives the transport to use, None meaning the fan-out opens its own
         '''
-        return self.vaultURL + "/v1/vaults/" + self.vaultID
+        if not self.poolOptions.persistentEventLoop:
+            return asyncio.run(sendRequests(self.asyncTransport))
+        backgroundLoop = self._getBackgroundLoop()
+        return backgroundLoop.run(sendRequests(self.asyncTransport or backgroundLoop.transport))
+
+    def _iterateFanOut(self, streamRequests):
+        '''
+            Iterates an async generator fan-out from sync code, one item at a time
+        '''
+        if self.poolOptions.persistentEventLoop:
+            backgroundLoop = self._getBackgroundLoop()
+            stream = streamRequests(self.asyncTransport or backgroundLoop.transport)
+            run = backgroundLoop.run
+            loop = None
+        else:
+            loop = asyncio.new_event_loop()
+            stream = streamRequests(self.asyncTransport)
+            run = loop.run_until_complete
+
+        try:
+            while True:
+                finished, item = run(_nextItem(stream))
+                if finished:
+                    return
+                yield item
+        finally:
+            run(stream.aclose())
+            if loop is not None:
+                loop.close()
+
+    def _getBackgroundLoop(self):
+        with self._backgroundLoopLock:
+            if self._backgroundLoop is None:
+                self._backgroundLoop = BackgroundLoop(self.poolOptions)
+            return self._backgroundLoop
+
+    def _createSession(self, poolOptions: PoolOptions):
+        '''
+            Creates the pooled session shared by all sync operations of the client
+        '''
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=poolOptions.poolSize,
+                              pool_maxsize=poolOptions.maxConnectionsPerHost)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not poolOptions.keepAlive:
+            session.headers['Connection'] = 'close'
+        return session
+
+
+async def openConnections(transport, url, connections):
+    '''
+        Sends concurrent HEAD requests so that the transport opens that many connections for detokenize and get_by_id
+    '''
+    # aiohttp pools connections per TLS setting, which must match the one of those requests
+    await asyncio.gather(*[transport.request("HEAD", url, verify=False) for _ in range(connections)])
+
+
+async def _nextItem(stream):
+    try:
+        return False, await stream.__anext__()
+    except StopAsyncIteration:
+        return True, None
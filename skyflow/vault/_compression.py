@@ -0,0 +1,47 @@
+import gzip
+import time
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# the HTTP libraries in use decode brotli whenever one of these packages is installed
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def compressRequestBody(data, headers: dict, compression):
+    '''
+    Gzips a request body of at least compression.requestThreshold bytes,
+    returning the body and headers to send
+    '''
+    if compression is None or compression.requestThreshold is None or data is None:
+        return data, headers
+    body = data.encode('utf-8') if isinstance(data, str) else data
+    if len(body) < compression.requestThreshold:
+        return data, headers
+
+    started = time.perf_counter()
+    compressed = gzip.compress(body, compression.level)
+    elapsed = time.perf_counter() - started
+    if compression.onCompress is not None:
+        compression.onCompress('request', len(body), len(compressed), elapsed)
+    headers = dict(headers)
+    headers["Content-Encoding"] = "gzip"
+    return compressed, headers
+
+
+def reportResponseCompression(content: bytes, headers, compression):
+    '''
+    Reports the wire and decoded size of a compressed response, decoding itself is
+    done by the HTTP library so its duration is not known
+    '''
+    if compression is None or compression.onCompress is None or headers is None:
+        return
+    if headers.get('Content-Encoding', 'identity') == 'identity' or 'Content-Length' not in headers:
+        return
+    compression.onCompress('response', len(content),
+                           int(headers['Content-Length']), None)
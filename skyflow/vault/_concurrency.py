@@ -0,0 +1,154 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from skyflow.errors._skyflowerrors import SkyflowError
+from ._deadline import Deadline, DeadlineExceeded
+
+
+async def runBounded(requestFactories: list, maxConcurrency: int = None, limiter=None,
+                     deadline: Deadline = Deadline()):
+    '''
+    Runs the coroutine factories with at most maxConcurrency of them in flight.
+
+    A fixed set of workers pulls the next factory as soon as one finishes, so the
+    number of in-flight requests stays at the limit until the input runs out. With an
+    AdaptiveConcurrency limiter the limit is re-read before every dispatch instead.
+    When the deadline passes the requests in flight are cancelled and the future of
+    every unfinished request holds DeadlineExceeded.
+    Returns one future per factory, in input order.
+    '''
+    loop = asyncio.get_event_loop()
+    futures = [loop.create_future() for _ in requestFactories]
+    if limiter is not None:
+        run = _runAdaptive(requestFactories, futures, maxConcurrency, limiter)
+    else:
+        run = _runWorkers(requestFactories, futures, maxConcurrency)
+
+    if deadline.remaining() is None:
+        await run
+        return futures
+    try:
+        await asyncio.wait_for(run, deadline.remaining())
+    except asyncio.TimeoutError:
+        for future in futures:
+            if not future.done():
+                future.set_exception(DeadlineExceeded())
+    return futures
+
+
+async def _runWorkers(requestFactories, futures, maxConcurrency):
+    pending = iter(enumerate(requestFactories))
+
+    async def worker():
+        for index, factory in pending:
+            try:
+                futures[index].set_result(await factory())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                futures[index].set_exception(e)
+
+    workers = len(requestFactories)
+    if maxConcurrency is not None:
+        workers = min(workers, maxConcurrency)
+    await asyncio.gather(*[worker() for _ in range(workers)])
+
+
+async def _runAdaptive(requestFactories, futures, maxConcurrency, limiter):
+    async def run(index, factory):
+        try:
+            futures[index].set_result(await timedRequest(limiter, factory))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            futures[index].set_exception(e)
+
+    inFlight = set()
+    try:
+        for index, factory in enumerate(requestFactories):
+            while len(inFlight) >= currentLimit(maxConcurrency, limiter):
+                _, inFlight = await asyncio.wait(inFlight, return_when=asyncio.FIRST_COMPLETED)
+            inFlight.add(asyncio.ensure_future(run(index, factory)))
+        if len(inFlight) > 0:
+            await asyncio.wait(inFlight)
+    except asyncio.CancelledError:
+        for task in inFlight:
+            task.cancel()
+        # wait for the cancelled requests to release their connections
+        await asyncio.gather(*inFlight, return_exceptions=True)
+        raise
+
+
+def runBoundedThreads(calls: list, maxConcurrency: int = None, limiter=None):
+    '''
+    Thread based counterpart of runBounded for blocking calls.
+    Returns one concurrent.futures.Future per call, in input order.
+    '''
+    maxWorkers = maxConcurrency or (limiter.maxLimit if limiter else None)
+    workers = min(len(calls), maxWorkers or len(calls))
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        inFlight = set()
+        for call in calls:
+            while len(inFlight) >= currentLimit(workers, limiter):
+                _, inFlight = wait(inFlight, return_when=FIRST_COMPLETED)
+            future = executor.submit(timedCall, limiter, call)
+            futures.append(future)
+            inFlight.add(future)
+    return futures
+
+
+async def timedRequest(limiter, factory):
+    '''
+    Awaits one request, reporting its latency and outcome to the limiter if any
+    '''
+    if limiter is None:
+        return await factory()
+    started = time.monotonic()
+    try:
+        result = await factory()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        limiter.onResponse(time.monotonic() - started, errorStatus(e))
+        raise
+    limiter.onResponse(time.monotonic() - started, resultStatus(result))
+    return result
+
+
+def timedCall(limiter, call, *args):
+    '''
+    Runs a blocking call, reporting its latency and outcome to the limiter if any
+    '''
+    if limiter is None:
+        return call(*args)
+    started = time.monotonic()
+    try:
+        result = call(*args)
+    except Exception as e:
+        limiter.onResponse(time.monotonic() - started, errorStatus(e))
+        raise
+    limiter.onResponse(time.monotonic() - started, resultStatus(result))
+    return result
+
+
+def currentLimit(maxConcurrency, limiter):
+    limit = limiter.limit if limiter is not None else maxConcurrency
+    if maxConcurrency is not None:
+        limit = min(limit, maxConcurrency)
+    return max(limit, 1)
+
+
+def resultStatus(result):
+    '''
+    Fan-out requests return (content, status, ...) tuples, other results are converted successes
+    '''
+    if isinstance(result, tuple):
+        return result[1]
+    return 200
+
+
+def errorStatus(error):
+    if isinstance(error, SkyflowError) and isinstance(error.code, int):
+        return error.code
+    return None
@@ -3,12 +3,82 @@ from types import FunctionType
 from typing import OrderedDict
 
 
+class PoolOptions:
+    '''
+    Connection pool settings for the HTTP session owned by the Client.
+
+    `poolSize` is the number of host pools kept open, `maxConnectionsPerHost`
+    caps the connections kept alive for a single host, and `keepAlive`
+    controls whether connections are reused between requests at all.
+
+    When `persistentEventLoop` is set, detokenize and get_by_id run on one
+    event loop kept on a dedicated thread and share a long-lived aiohttp
+    session, instead of creating both on every call.
+
+    `http2` sends every operation over multiplexed HTTP/2 connections, using the
+    optional httpx dependency (`pip install skyflow[http2]`). It implies
+    `persistentEventLoop`.
+
+    `warmup` calls warmup() when a Client is created, or when an AsyncClient
+    is entered with `async with`.
+    '''
+    def __init__(self, poolSize: int=10, maxConnectionsPerHost: int=10, keepAlive: bool=True,
+                 persistentEventLoop: bool=False, http2: bool=False, warmup: bool=False):
+        self.poolSize = poolSize
+        self.maxConnectionsPerHost = maxConnectionsPerHost
+        self.keepAlive = keepAlive
+        self.persistentEventLoop = persistentEventLoop or http2
+        self.http2 = http2
+        self.warmup = warmup
+
+class CompressionOptions:
+    '''
+    Request bodies of vault calls of at least `requestThreshold` bytes are sent
+    gzipped at the given compression `level`, None leaving them uncompressed.
+
+    `onCompress(direction, originalSize, compressedSize, seconds)` is called for
+    every compressed request body and every compressed response that declares its
+    length, direction being "request" or "response". Responses are decoded by the
+    HTTP library, so seconds is None for them.
+    '''
+    def __init__(self, requestThreshold: int=None, level: int=6, onCompress=None):
+        self.requestThreshold = requestThreshold
+        self.level = level
+        self.onCompress = onCompress
+
 class Configuration:
+    '''
+    `transport` replaces the HTTP client used by the blocking calls of Client (insert and
+    invoke_connection) and `asyncTransport` the one used by every AsyncClient call and by
+    the detokenize and get_by_id fan-outs of Client, see skyflow.transport. Transports
+    given here are shared, the client never closes them.
+
+    `timeout` is the default time limit in seconds of every call, see InsertOptions.
+
+    `tokenRefresh`, a TokenRefreshPolicy, makes a Client renew its bearer token on a
+    background thread ahead of expiry instead of during a call. AsyncClient ignores it.
+    '''
 
-    def __init__(self, vaultID: str=None, vaultURL: str=None, tokenProvider: FunctionType=None):
+    def __init__(self, vaultID: str=None, vaultURL: str=None, tokenProvider: FunctionType=None,
+                 poolOptions: PoolOptions=None, maxConcurrency: int=None, adaptiveConcurrency=None,
+                 retryPolicy=None, rateLimiter=None, circuitBreaker=None, hedgingPolicy=None,
+                 compression: CompressionOptions=None, transport=None, asyncTransport=None,
+                 timeout: float=None, tokenRefresh=None):
         
         self.vaultID = ''
         self.vaultURL = ''
+        self.poolOptions = poolOptions or PoolOptions()
+        self.maxConcurrency = maxConcurrency
+        self.adaptiveConcurrency = adaptiveConcurrency
+        self.retryPolicy = retryPolicy
+        self.rateLimiter = rateLimiter
+        self.circuitBreaker = circuitBreaker
+        self.hedgingPolicy = hedgingPolicy
+        self.compression = compression
+        self.transport = transport
+        self.asyncTransport = asyncTransport
+        self.timeout = timeout
+        self.tokenRefresh = tokenRefresh
           
         if tokenProvider == None and vaultURL == None and isinstance(vaultID, FunctionType):
             self.tokenProvider = vaultID
@@ -22,8 +92,39 @@ class Configuration:
             self.tokenProvider = tokenProvider
 
 class InsertOptions:
-    def __init__(self, tokens: bool=True):
+    '''
+    `batchSize` and `maxBatchBytes` split large inserts into several requests,
+    sent with at most `maxConcurrency` of them in flight.
+
+    `timeout` limits the whole call, token refresh, retries and every request
+    included, to that many seconds, overriding the one of the Configuration.
+    Requests still in flight when it expires are cancelled and a SkyflowError
+    with code 408 is raised; its data holds the records and errors of the
+    requests that finished and, under "timedOut", the input of those that did not.
+    '''
+    def __init__(self, tokens: bool=True, batchSize: int=None, maxBatchBytes: int=None,
+                 maxConcurrency: int=None, timeout: float=None):
         self.tokens = tokens
+        self.batchSize = batchSize
+        self.maxBatchBytes = maxBatchBytes
+        self.maxConcurrency = maxConcurrency
+        self.timeout = timeout
+
+class DetokenizeOptions:
+    '''
+    `batchSize` is the number of tokens sent in a single detokenize request,
+    `maxConcurrency` caps the requests in flight at once. `timeout` works as
+    in InsertOptions.
+    '''
+    def __init__(self, maxConcurrency: int=None, batchSize: int=1, timeout: float=None):
+        self.maxConcurrency = maxConcurrency
+        self.batchSize = batchSize
+        self.timeout = timeout
+
+class GetByIdOptions:
+    def __init__(self, maxConcurrency: int=None, timeout: float=None):
+        self.maxConcurrency = maxConcurrency
+        self.timeout = timeout
 
 class RequestMethod(Enum):
     GET = 'GET'
@@ -34,13 +135,15 @@ class RequestMethod(Enum):
 
 class ConnectionConfig:
     def __init__(self, connectionURL: str, methodName: RequestMethod, 
-    pathParams: dict={}, queryParams: dict={}, requestHeader: dict={}, requestBody: dict={}):
+    pathParams: dict={}, queryParams: dict={}, requestHeader: dict={}, requestBody: dict={},
+    timeout: float=None):
         self.connectionURL = connectionURL.rstrip("/")
         self.methodName = methodName
         self.pathParams = pathParams
         self.queryParams = queryParams
         self.requestHeader = requestHeader
         self.requestBody = requestBody
+        self.timeout = timeout
 
 class RedactionType(Enum):
     PLAIN_TEXT = "PLAIN_TEXT"
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
+
+
+class DeadlineExceeded(Exception):
+    '''
+    Raised by, or set on the future of, a sub-request that did not complete before the
+    deadline of its call. The fan-outs set `request` to the records of the sub-request,
+    and the clients turn it into a SkyflowError listing them.
+    '''
+
+    def __init__(self, request=None):
+        super().__init__()
+        self.request = request
+
+
+class Deadline:
+    '''
+    Point in time by which a call must complete, a None timeout meaning never
+    '''
+
+    def __init__(self, timeout: float = None):
+        self.timeout = timeout
+        self._expiresAt = None if timeout is None else time.monotonic() + timeout
+
+    def remaining(self):
+        '''
+        Seconds left, None without a deadline
+        '''
+        if self._expiresAt is None:
+            return None
+        return max(0.0, self._expiresAt - time.monotonic())
+
+    def expired(self) -> bool:
+        return self._expiresAt is not None and time.monotonic() >= self._expiresAt
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded()
+
+    def error(self, interface: str, result: dict = None) -> SkyflowError:
+        return SkyflowError(SkyflowErrorCodes.REQUEST_TIMEOUT, SkyflowErrorMessages.TIMEOUT.value % self.timeout,
+                            result or {}, interface=interface)
+
+
+def markTimedOut(futures, requests):
+    '''
+    Attaches its records to the DeadlineExceeded of every sub-request that timed out
+    '''
+    for future, request in zip(futures, requests):
+        error = future.exception()
+        if isinstance(error, DeadlineExceeded):
+            error.request = request
+
+
+async def withinDeadline(awaitable, deadline: Deadline):
+    '''
+    Awaits awaitable, cancelling it and raising DeadlineExceeded once the deadline passes
+    '''
+    if deadline.remaining() is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        if deadline.expired():
+            raise DeadlineExceeded()
+        raise
@@ -1,8 +1,14 @@
 from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
 import asyncio
-from aiohttp import ClientSession, request
+import functools
+from aiohttp import ClientSession
 import json
 from skyflow._utils import InterfaceName
+from ._concurrency import runBounded, timedRequest, currentLimit
+from ._policies import RequestPolicies, rejectedContent
+from skyflow.transport._transport import AsyncTransport, AiohttpTransport
+from ._compression import ACCEPT_ENCODING
+from ._deadline import Deadline, DeadlineExceeded, markTimedOut, withinDeadline
 
 interface = InterfaceName.DETOKENIZE.value
 
@@ -23,10 +29,54 @@ def getDetokenizeRequestBody(data):
     return requestBody
 
 
-async def sendDetokenizeRequests(data, url, token):
+async def sendDetokenizeRequests(data, url, token, transport: AsyncTransport = None, maxConcurrency: int = None,
+                                 batchSize: int = 1, limiter=None,
+                                 policies: RequestPolicies = RequestPolicies(), deadline: Deadline = Deadline()):
 
-    tasks = []
+    records = _validateRecords(data)
+    batches = getDetokenizeBatches(records, batchSize)
 
+    if transport is not None:
+        return await _postBatches(batches, url, token, transport, maxConcurrency, limiter, policies, deadline)
+    async with ClientSession() as session:
+        return await _postBatches(batches, url, token, AiohttpTransport(session), maxConcurrency, limiter,
+                                  policies, deadline)
+
+
+async def streamDetokenizeRequests(data, url, token, transport: AsyncTransport = None, maxConcurrency: int = None,
+                                   batchSize: int = 1, limiter=None, policies: RequestPolicies = RequestPolicies(),
+                                   deadline: Deadline = Deadline()):
+    '''
+    Async generator yielding each detokenized record, or error, as soon as its response
+    arrives. Workers stop taking new batches while the consumer is behind, so at most
+    maxConcurrency requests and their results are buffered at any time. With an
+    AdaptiveConcurrency limiter, requests in flight also follow its limit. Raises
+    DeadlineExceeded when the deadline passes before the last item arrives.
+    '''
+    records = _validateRecords(data)
+    batches = getDetokenizeBatches(records, batchSize)
+
+    if transport is not None:
+        async for item in _streamBatches(batches, url, token, transport, maxConcurrency, limiter, policies,
+                                         deadline):
+            yield item
+        return
+    async with ClientSession() as session:
+        async for item in _streamBatches(batches, url, token, AiohttpTransport(session), maxConcurrency, limiter,
+                                         policies, deadline):
+            yield item
+
+
+def getDetokenizeBatches(records, batchSize):
+    parameters = []
+    for record in records:
+        requestBody = getDetokenizeRequestBody(record)
+        parameters += requestBody["detokenizationParameters"]
+    return [parameters[i:i + batchSize]
+            for i in range(0, len(parameters), batchSize)]
+
+
+def _validateRecords(data):
     try:
         records = data["records"]
     except KeyError:
@@ -36,58 +86,209 @@ async def sendDetokenizeRequests(data, url, token):
         recordsType = str(type(records))
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT, SkyflowErrorMessages.INVALID_RECORDS_TYPE.value % (
             recordsType), interface=interface)
+    return records
 
-    validatedRecords = []
-    for record in records:
-        requestBody = getDetokenizeRequestBody(record)
-        jsonBody = json.dumps(requestBody)
-        validatedRecords.append(jsonBody)
-    async with ClientSession() as session:
-        for record in validatedRecords:
-            headers = {
-                "Authorization": "Bearer " + token
-            }
-            task = asyncio.ensure_future(post(url, record, headers, session))
-            tasks.append(task)
-        await asyncio.gather(*tasks)
-        await session.close()
-    return tasks
-
-
-async def post(url, data, headers, session):
-    async with session.post(url, data=data, headers=headers, ssl=False) as response:
+
+async def _streamBatches(batches, url, token, transport, maxConcurrency, limiter, policies, deadline):
+    headers = {
+        "Authorization": "Bearer " + token,
+        "Accept-Encoding": ACCEPT_ENCODING
+    }
+    work = asyncio.Queue()
+    for batch in batches:
+        work.put_nowait(batch)
+    # enough workers to send the tokens of split batches concurrently too
+    workers = sum(map(len, batches))
+    maxWorkers = maxConcurrency or (limiter.maxLimit if limiter else None)
+    if maxWorkers is not None:
+        workers = min(workers, maxWorkers)
+    # one slot per worker and token, workers block on put while the consumer is behind
+    results = asyncio.Queue(maxsize=max(workers, 1) * max(map(len, batches), default=1))
+    done = object()
+    inFlight = 0
+    slots = asyncio.Condition()
+
+    async def send(batch):
+        nonlocal inFlight
+        async with slots:
+            await slots.wait_for(lambda: inFlight < currentLimit(workers, limiter))
+            inFlight += 1
+        try:
+            return await timedRequest(limiter, functools.partial(
+                post, url, json.dumps({"detokenizationParameters": batch}), headers, transport, policies, deadline))
+        finally:
+            async with slots:
+                inFlight -= 1
+                slots.notify_all()
+
+    async def worker():
+        # workers live until all work is done, tokens of a split batch go to all of them
+        while True:
+            batch = await work.get()
+            try:
+                response = await send(batch)
+                if _isTokenError(batch, response):
+                    for parameter in batch:
+                        work.put_nowait([parameter])
+                    continue
+                for item in parseDetokenizeResponse(response) * _errorCopies(batch, response):
+                    await results.put(item)
+            finally:
+                work.task_done()
+
+    async def run():
+        tasks = [asyncio.ensure_future(worker()) for _ in range(workers)]
+        joined = asyncio.ensure_future(work.join())
         try:
-            return (await response.read(), response.status, response.headers['x-request-id'])
+            # workers only finish by raising
+            finished, _ = await asyncio.wait([joined] + tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                task.result()
+            await results.put(done)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await results.put(e)
+        finally:
+            joined.cancel()
+            for task in tasks:
+                task.cancel()
+
+    runner = asyncio.ensure_future(run())
+    try:
+        while True:
+            item = await withinDeadline(results.get(), deadline)
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        runner.cancel()
+
+
+async def _postBatches(batches, url, token, transport, maxConcurrency, limiter, policies, deadline):
+    '''
+    Posts every batch, then re-posts the tokens of batches failed by a client error one
+    by one so that errors map back to the individual tokens. Throttled and server errors
+    are reported once per token of the batch instead, retrying them is up to the RetryPolicy.
+    '''
+    headers = {
+        "Authorization": "Bearer " + token,
+        "Accept-Encoding": ACCEPT_ENCODING
+    }
+    responses = await _postBodies(batches, url, headers, transport, maxConcurrency, limiter, policies, deadline)
+
+    failedBatches = {index for index, batch in enumerate(batches)
+                     if responses[index].exception() is None and _isTokenError(batch, responses[index].result())}
+    singles = [[parameter] for index, batch in enumerate(batches)
+               if index in failedBatches for parameter in batch]
+    singleResponses = iter([])
+    if len(singles) > 0:
+        singleResponses = iter(await _postBodies(singles, url, headers, transport, maxConcurrency, limiter,
+                                                 policies, deadline))
+    result = []
+    for index, batch in enumerate(batches):
+        if index in failedBatches:
+            result += [next(singleResponses) for _ in batch]
+        elif responses[index].exception() is None:
+            result += [responses[index]] * _errorCopies(batch, responses[index].result())
+        else:
+            result.append(responses[index])
+    return result
+
+
+async def _postBodies(batches, url, headers, transport, maxConcurrency, limiter, policies, deadline):
+    requests = [functools.partial(post, url, json.dumps({"detokenizationParameters": batch}), headers, transport,
+                                  policies, deadline)
+                for batch in batches]
+    responses = await runBounded(requests, maxConcurrency, limiter, deadline)
+    markTimedOut(responses, batches)
+    return responses
+
+
+def _isTokenError(batch, response):
+    '''
+    Whether a multi-token batch failed with a client error, which may come from a single token.
+    Throttling and a rejected bearer token fail every token alike.
+    '''
+    status = response[1]
+    return len(batch) > 1 and 400 <= status < 500 and status not in (401, 403, 429)
+
+
+def _errorCopies(batch, response):
+    '''
+    How many times a response counts, a failed batch giving one error per token
+    '''
+    return 1 if response[1] == 200 else len(batch)
+
+
+async def post(url, data, headers, transport: AsyncTransport, policies: RequestPolicies = RequestPolicies(),
+               deadline: Deadline = Deadline()):
+    data, headers = policies.compressBody(data, headers)
+
+    async def send():
+        response = await transport.request("POST", url, headers=headers, data=data, verify=False)
+        policies.reportResponse(response.content, response.headers)
+        try:
+            result = (response.content, response.statusCode, response.headers['x-request-id'])
         except KeyError:
-            return (await response.read(), response.status)
+            result = (response.content, response.statusCode)
+        return result, response.statusCode, response.headers
+
+    try:
+        return await policies.sendAsync(send, interface, url, hedge=True, deadline=deadline)
+    except SkyflowError as e:
+        return rejectedContent(e), e.code
 
 
 def createDetokenizeResponseBody(responses):
+    '''
+    Collects the records and errors of the responses, the tokens of requests that
+    did not complete before the deadline go to "timedOut"
+    '''
     result = {
         "records": [],
         "errors": []
     }
     partial = False
     for response in responses:
-        r = response.result()
-        status = r[1]
-        try:
-            jsonRes = json.loads(r[0].decode('utf-8'))
-        except:
-            raise SkyflowError(status,
-                               SkyflowErrorMessages.RESPONSE_NOT_JSON.value % r[0].decode('utf-8'), interface=interface)
+        error = response.exception()
+        if isinstance(error, DeadlineExceeded):
+            result.setdefault("timedOut", []).extend(error.request or [])
+            continue
+        for item in parseDetokenizeResponse(response.result()):
+            if "error" in item:
+                result["errors"].append(item)
+                partial = True
+            else:
+                result["records"].append(item)
+    return result, partial
+
 
-        if status == 200:
+def parseDetokenizeResponse(r):
+    '''
+    Converts one (content, status[, requestID]) response into its records, or a single error
+    '''
+    status = r[1]
+    try:
+        jsonRes = json.loads(r[0].decode('utf-8'))
+    except:
+        raise SkyflowError(status,
+                           SkyflowErrorMessages.RESPONSE_NOT_JSON.value % r[0].decode('utf-8'), interface=interface)
+
+    if status == 200:
+        items = []
+        for record in jsonRes["records"]:
             temp = {}
-            temp["token"] = jsonRes["records"][0]["token"]
-            temp["value"] = jsonRes["records"][0]["value"]
-            result["records"].append(temp)
-        else:
-            temp = {"error": {}}
-            temp["error"]["code"] = jsonRes["error"]["http_code"]
-            temp["error"]["description"] = jsonRes["error"]["message"]
-            if len(r) > 2 and r[2] != None:
-                temp["error"]["description"] += ' - Request ID: ' + str(r[2])
-            result["errors"].append(temp)
-            partial = True
-    return result, partial
+            temp["token"] = record["token"]
+            temp["value"] = record["value"]
+            items.append(temp)
+        return items
+
+    temp = {"error": {}}
+    temp["error"]["code"] = jsonRes["error"]["http_code"]
+    temp["error"]["description"] = jsonRes["error"]["message"]
+    if len(r) > 2 and r[2] != None:
+        temp["error"]["description"] += ' - Request ID: ' + str(r[2])
+    return [temp]
@@ -1,9 +1,14 @@
 from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
-import asyncio
+import functools
 from aiohttp import ClientSession
 import json
 from ._config import RedactionType
 from skyflow._utils import InterfaceName
+from ._concurrency import runBounded
+from ._policies import RequestPolicies, rejectedContent
+from skyflow.transport._transport import AsyncTransport, AiohttpTransport
+from ._compression import ACCEPT_ENCODING
+from ._deadline import Deadline, DeadlineExceeded, markTimedOut
 
 interface = InterfaceName.GET_BY_ID.value
 
@@ -44,8 +49,9 @@ def getGetByIdRequestBody(data):
     return ids, table, redaction.value
 
 
-async def sendGetByIdRequests(data, url, token):
-    tasks = []
+async def sendGetByIdRequests(data, url, token, transport: AsyncTransport = None, maxConcurrency: int = None,
+                              limiter=None, policies: RequestPolicies = RequestPolicies(),
+                              deadline: Deadline = Deadline()):
     try:
         records = data["records"]
     except KeyError:
@@ -60,35 +66,61 @@ async def sendGetByIdRequests(data, url, token):
     for record in records:
         ids, table, redaction = getGetByIdRequestBody(record)
         validatedRecords.append((ids, table, redaction))
+
+    if transport is not None:
+        return await _getRecords(validatedRecords, url, token, transport, maxConcurrency, limiter, policies, deadline)
     async with ClientSession() as session:
-        for record in validatedRecords:
-            headers = {
-                "Authorization": "Bearer " + token
-            }
-            params = {"skyflow_ids": record[0], "redaction": record[2]}
-            task = asyncio.ensure_future(
-                get(url, headers, params, session, record[1]))
-            tasks.append(task)
-        await asyncio.gather(*tasks)
-        await session.close()
-    return tasks
+        return await _getRecords(validatedRecords, url, token, AiohttpTransport(session), maxConcurrency, limiter,
+                                 policies, deadline)
+
+
+async def _getRecords(validatedRecords, url, token, transport, maxConcurrency, limiter, policies, deadline):
+    headers = {
+        "Authorization": "Bearer " + token,
+        "Accept-Encoding": ACCEPT_ENCODING
+    }
+    requests = []
+    for record in validatedRecords:
+        params = {"skyflow_ids": record[0], "redaction": record[2]}
+        requests.append(functools.partial(
+            get, url, headers, params, transport, record[1], policies, deadline))
+    responses = await runBounded(requests, maxConcurrency, limiter, deadline)
+    markTimedOut(responses, [{"ids": record[0], "table": record[1]} for record in validatedRecords])
+    return responses
 
 
-async def get(url, headers, params, session, table):
-    async with session.get(url + "/" + table, headers=headers, params=params, ssl=False) as response:
+async def get(url, headers, params, transport: AsyncTransport, table, policies: RequestPolicies = RequestPolicies(),
+              deadline: Deadline = Deadline()):
+    async def send():
+        response = await transport.request("GET", url + "/" + table, headers=headers, params=params, verify=False)
+        policies.reportResponse(response.content, response.headers)
         try:
-            return (await response.read(), response.status, table, response.headers['x-request-id'])
+            result = (response.content, response.statusCode, table, response.headers['x-request-id'])
         except KeyError:
-            return (await response.read(), response.status, table)
+            result = (response.content, response.statusCode, table)
+        return result, response.statusCode, response.headers
+
+    try:
+        return await policies.sendAsync(send, interface, url, hedge=True, deadline=deadline)
+    except SkyflowError as e:
+        return rejectedContent(e), e.code, table
 
 
 def createGetByIdResponseBody(responses):
+    '''
+    Collects the records and errors of the responses, the records of requests that
+    did not complete before the deadline go to "timedOut"
+    '''
     result = {
         "records": [],
         "errors": []
     }
+    partial = False
     for response in responses:
-        partial = False
+        error = response.exception()
+        if isinstance(error, DeadlineExceeded):
+            result.setdefault("timedOut", []).append(error.request)
+            continue
         r = response.result()
         status = r[1]
         try:
@@ -111,6 +143,5 @@ def createGetByIdResponseBody(responses):
             if len(r) > 3 and r[3] != None:
                 temp["error"]["description"] += ' - Request ID: ' + str(r[3])
             result["errors"].append(temp)
-            result["errors"].append(temp)
             partial = True
     return result, partial
@@ -0,0 +1,87 @@
+import asyncio
+import collections
+import threading
+import time
+
+
+class HedgingPolicy:
+    '''
+    Sends a duplicate of a read request (detokenize or get_by_id) that has not answered
+    within the `percentile` of recently observed latencies, and uses whichever copy
+    answers first. Until `minSamples` latencies are known `initialDelay` is used; the
+    delay never drops below `minDelay`.
+
+    Every request earns `budget` hedges and each hedge spends one, so on average at most
+    that fraction of extra requests is sent; at most `maxBurst` hedges can be saved up.
+    '''
+
+    def __init__(self, percentile: float = 95.0, initialDelay: float = 0.1, minDelay: float = 0.005,
+                 budget: float = 0.05, maxBurst: float = 10.0, sampleSize: int = 200, minSamples: int = 20):
+        self.percentile = percentile
+        self.initialDelay = initialDelay
+        self.minDelay = minDelay
+        self.budget = budget
+        self.maxBurst = maxBurst
+        self.minSamples = minSamples
+        self._latencies = collections.deque(maxlen=sampleSize)
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def getDelay(self) -> float:
+        with self._lock:
+            if len(self._latencies) < self.minSamples:
+                return self.initialDelay
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1,
+                    int(len(latencies) * self.percentile / 100))
+        return max(self.minDelay, latencies[index])
+
+    def onRequest(self):
+        with self._lock:
+            self._tokens = min(self.maxBurst, self._tokens + self.budget)
+
+    def tryHedge(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def onLatency(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+
+async def hedgeAsync(hedgingPolicy: HedgingPolicy, request):
+    '''
+    Awaits request, starting a second copy if the first is slower than the hedging delay
+    '''
+    if hedgingPolicy is None:
+        return await request()
+
+    async def timed():
+        started = time.monotonic()
+        result = await request()
+        hedgingPolicy.onLatency(time.monotonic() - started)
+        return result
+
+    hedgingPolicy.onRequest()
+    copies = [asyncio.ensure_future(timed())]
+    try:
+        done, _ = await asyncio.wait(copies, timeout=hedgingPolicy.getDelay())
+        if len(done) > 0 or not hedgingPolicy.tryHedge():
+            return await copies[0]
+
+        copies.append(asyncio.ensure_future(timed()))
+        pending = set(copies)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for copy in done:
+                if copy.exception() is None:
+                    return copy.result()
+            # a failed copy only counts once the other one has failed too
+            if len(pending) == 0:
+                return done.pop().result()
+    finally:
+        for copy in copies:
+            copy.cancel()
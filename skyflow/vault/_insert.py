@@ -1,14 +1,27 @@
 import json
 
 import requests
-from requests.models import HTTPError
 from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
 from skyflow._utils import InterfaceName
+from ._deadline import Deadline, DeadlineExceeded, markTimedOut
 
 interface = InterfaceName.INSERT.value
 
+# records read per request by insert_stream when no batchSize is given
+DEFAULT_STREAM_BATCH_SIZE = 100
+
 
 def getInsertRequestBody(data, tokens: bool):
+    return getInsertRequestChunks(data, tokens)[0][1]
+
+
+def getInsertRequestChunks(data, tokens: bool, batchSize: int = None, maxBatchBytes: int = None):
+    '''
+    Splits the records into chunks of at most batchSize records and, where possible,
+    maxBatchBytes of request body. A record larger than maxBatchBytes is sent on its own.
+
+    Returns a list of (request, jsonBody) tuples where request holds the records of the chunk.
+    '''
     try:
         records = data["records"]
     except KeyError:
@@ -20,30 +33,54 @@ def getInsertRequestBody(data, tokens: bool):
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT, SkyflowErrorMessages.INVALID_RECORDS_TYPE.value % (
             recordsType), interface=interface)
 
-    requestPayload = []
-    insertTokenPayload = []
-    for index, record in enumerate(records):
-        tableName, fields = getTableAndFields(record)
-        requestPayload.append({
+    tables = [getTableAndFields(record) for record in records]
+    try:
+        # every record is serialized once, chunk bodies are joined from these
+        insertPayloads = [json.dumps({
             "tableName": tableName,
             "fields": fields,
             "method": "POST",
-            "quorum": True})
-        if tokens:
-            insertTokenPayload.append({
-                "method": "GET",
-                "tableName": tableName,
-                "ID": "$responses." + str(index) + ".records.0.skyflow_id",
-                "tokenization": True
-            })
-    requestBody = {"records": requestPayload + insertTokenPayload}
-    try:
-        jsonBody = json.dumps(requestBody)
+            "quorum": True}) for tableName, fields in tables]
     except Exception as e:
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT, SkyflowErrorMessages.INVALID_JSON.value % (
             'insert payload'), interface=interface)
 
-    return jsonBody
+    chunks = []
+    start = 0
+    while start < len(records) or len(chunks) == 0:
+        end = start
+        bodySize = len('{"records": []}')
+        while end < len(records):
+            if batchSize is not None and end - start >= batchSize:
+                break
+            # payload length plus the ', ' separating it from the next one
+            recordSize = len(insertPayloads[end]) + 2
+            if tokens:
+                recordSize += len(getTokenPayload(tables[end][0], end - start)) + 2
+            if maxBatchBytes is not None and end > start and bodySize + recordSize > maxBatchBytes:
+                break
+            bodySize += recordSize
+            end += 1
+
+        tokenPayloads = []
+        if tokens:
+            tokenPayloads = [getTokenPayload(tableName, index)
+                             for index, (tableName, _) in enumerate(tables[start:end])]
+        jsonBody = '{"records": [' + \
+            ', '.join(insertPayloads[start:end] + tokenPayloads) + ']}'
+        chunks.append(({"records": records[start:end]}, jsonBody))
+        start = end
+
+    return chunks
+
+
+def getTokenPayload(tableName, index):
+    return json.dumps({
+        "method": "GET",
+        "tableName": tableName,
+        "ID": "$responses." + str(index) + ".records.0.skyflow_id",
+        "tokenization": True
+    })
 
 
 def getTableAndFields(record):
@@ -73,27 +110,32 @@ def getTableAndFields(record):
 
 
 def processResponse(response: requests.Response, interface=interface):
-    statusCode = response.status_code
-    content = response.content.decode('utf-8')
-    try:
-        response.raise_for_status()
+    return parseResponse(response.status_code, response.content, response.headers, interface=interface)
+
+
+def parseResponse(statusCode: int, rawContent: bytes, headers, interface=interface):
+    '''
+        Parses a raw vault response, raising a SkyflowError for error statuses
+    '''
+    content = rawContent.decode('utf-8')
+    if statusCode < 400:
         try:
             return json.loads(content)
         except:
             raise SkyflowError(
                 statusCode, SkyflowErrorMessages.RESPONSE_NOT_JSON.value % content, interface=interface)
-    except HTTPError:
-        message = SkyflowErrorMessages.API_ERROR.value % statusCode
-        if response != None and response.content != None:
-            try:
-                errorResponse = json.loads(content)
-                if 'error' in errorResponse and type(errorResponse['error']) == type({}) and 'message' in errorResponse['error']:
-                    message = errorResponse['error']['message']
-            except:
-                message = SkyflowErrorMessages.RESPONSE_NOT_JSON.value % content
-        if 'x-request-id' in response.headers:
-            message += ' - request id: ' + response.headers['x-request-id']
-        raise SkyflowError(statusCode, message, interface=interface)
+
+    message = SkyflowErrorMessages.API_ERROR.value % statusCode
+    if rawContent != None:
+        try:
+            errorResponse = json.loads(content)
+            if 'error' in errorResponse and type(errorResponse['error']) == type({}) and 'message' in errorResponse['error']:
+                message = errorResponse['error']['message']
+        except:
+            message = SkyflowErrorMessages.RESPONSE_NOT_JSON.value % content
+    if 'x-request-id' in headers:
+        message += ' - request id: ' + headers['x-request-id']
+    raise SkyflowError(statusCode, message, interface=interface)
 
 
 def convertResponse(request: dict, response: dict, tokens: bool):
@@ -101,9 +143,9 @@ def convertResponse(request: dict, response: dict, tokens: bool):
     records = request['records']
     recordsSize = len(records)
     result = []
-    for idx, _ in enumerate(request):
+    for idx, _ in enumerate(records):
         table = records[idx]['table']
-        skyflow_id = responseArray[0]['records'][idx]['skyflow_id']
+        skyflow_id = responseArray[idx]['records'][0]['skyflow_id']
         if tokens:
             fieldsDict = responseArray[recordsSize + idx]['fields']
             fieldsDict['skyflow_id'] = skyflow_id
@@ -111,3 +153,41 @@ def convertResponse(request: dict, response: dict, tokens: bool):
         else:
             result.append({'table': table, 'skyflow_id': skyflow_id})
     return {'records': result}
+
+
+def mergeInsertResults(chunkResults, chunkRecords, deadline: Deadline = Deadline(), interface=interface):
+    '''
+    Stitches the converted responses of insert chunks back together in input order.
+    chunkResults holds one future per chunk and chunkRecords the input records of each
+    chunk. Failed chunks are reported in errors along with their records, the records of
+    chunks that did not complete before the deadline in "timedOut"
+    '''
+    markTimedOut(chunkResults, chunkRecords)
+    result = {"records": [], "errors": []}
+    firstError = None
+    for chunkResult, records in zip(chunkResults, chunkRecords):
+        try:
+            result["records"] += chunkResult.result()["records"]
+        except SkyflowError as e:
+            firstError = firstError or e
+            result["errors"].append(
+                {"error": {"code": e.code, "description": e.message}, "records": records})
+        except DeadlineExceeded as e:
+            result.setdefault("timedOut", []).extend(e.request or [])
+
+    if "timedOut" in result:
+        raise deadline.error(interface, result)
+    if firstError is None:
+        return {"records": result["records"]}
+    if len(result["records"]) == 0:
+        raise firstError
+    raise SkyflowError(SkyflowErrorCodes.PARTIAL_SUCCESS,
+                       SkyflowErrorMessages.PARTIAL_SUCCESS, result, interface=interface)
+
+
+def raiseStreamFailure(batchResults, batches, deadline: Deadline = Deadline(), interface=interface):
+    '''
+    Raises the failure of the first of the finished stream batches, reporting the results
+    of the batches that were in flight with it since the vault may have stored them
+    '''
+    mergeInsertResults(batchResults, [batch[0]["records"] for batch in batches], deadline, interface)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from skyflow.errors._skyflowerrors import SkyflowError
+from ._retry import retrySync, retryAsync
+from ._hedging import hedgeAsync
+from ._compression import compressRequestBody, reportResponseCompression
+from ._deadline import Deadline, DeadlineExceeded
+
+
+class RequestPolicies:
+    '''
+    Client wide behaviour applied to every single HTTP request: each attempt first
+    passes the rate limiter and the circuit breaker of its endpoint, failed attempts
+    are retried by the retry policy. Slow reads may be hedged by a second copy, which
+    goes through the rate limiter and circuit breaker as well.
+
+    Request and response compression of vault calls is handled here too.
+
+    With a deadline no attempt or retry starts after it has passed, and a failure once it
+    has passed is raised as DeadlineExceeded.
+    '''
+
+    def __init__(self, retryPolicy=None, rateLimiter=None, circuitBreaker=None, hedgingPolicy=None,
+                 compression=None):
+        self.retryPolicy = retryPolicy
+        self.rateLimiter = rateLimiter
+        self.circuitBreaker = circuitBreaker
+        self.hedgingPolicy = hedgingPolicy
+        self.compression = compression
+
+    def compressBody(self, data, headers: dict):
+        return compressRequestBody(data, headers, self.compression)
+
+    def reportResponse(self, content: bytes, headers):
+        reportResponseCompression(content, headers, self.compression)
+
+    def send(self, send, interface: str, endpoint: str = None, retry: bool = True,
+             deadline: Deadline = Deadline(), idempotent: bool = True):
+        '''
+        Calls send, which returns (result, statusCode, headers), and returns its result.
+        Requests that are not idempotent are only retried when they cannot have been processed.
+        '''
+        def attempt():
+            deadline.check()
+            if self.rateLimiter is not None:
+                self.rateLimiter.acquire(interface, deadline.remaining())
+            if self.circuitBreaker is None or endpoint is None:
+                return send()
+            self.circuitBreaker.allow(endpoint, interface)
+            try:
+                response = send()
+            except Exception as e:
+                self.circuitBreaker.record(endpoint, error=e)
+                raise
+            self.circuitBreaker.record(endpoint, response[1])
+            return response
+
+        try:
+            return retrySync(self.retryPolicy if retry else None, attempt, deadline, idempotent)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if deadline.expired():
+                raise DeadlineExceeded() from e
+            raise
+
+    async def sendAsync(self, send, interface: str, endpoint: str = None, retry: bool = True,
+                        hedge: bool = False, deadline: Deadline = Deadline(), idempotent: bool = True):
+        '''
+        Awaitable counterpart of send, hedge marking idempotent reads that may be sent twice
+        '''
+        async def attempt():
+            deadline.check()
+            if self.rateLimiter is not None:
+                await self.rateLimiter.acquireAsync(interface, deadline.remaining())
+            if self.circuitBreaker is None or endpoint is None:
+                return await send()
+            self.circuitBreaker.allow(endpoint, interface)
+            try:
+                response = await send()
+            except asyncio.CancelledError:
+                self.circuitBreaker.release(endpoint)
+                raise
+            except Exception as e:
+                self.circuitBreaker.record(endpoint, error=e)
+                raise
+            self.circuitBreaker.record(endpoint, response[1])
+            return response
+
+        hedgingPolicy = self.hedgingPolicy if hedge else None
+        try:
+            return await retryAsync(self.retryPolicy if retry else None,
+                                    lambda: hedgeAsync(hedgingPolicy, attempt), deadline, idempotent)
+        except (DeadlineExceeded, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            if deadline.expired():
+                raise DeadlineExceeded() from e
+            raise
+
+
+def rejectedContent(error: SkyflowError) -> bytes:
+    '''
+    Vault style error body for a request the rate limiter or circuit breaker rejected
+    before sending it, so that one rejected request of a fan-out fails on its own
+    '''
+    return json.dumps({"error": {"http_code": error.code, "message": error.message}}).encode('utf-8')
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes, SkyflowErrorMessages
+from ._deadline import DeadlineExceeded
+
+
+class RateLimiter:
+    '''
+    Token bucket allowing `rate` requests per second on average and bursts of up to
+    `burst` requests (`rate` rounded up by default).
+
+    With `blocking` set, a request over the budget waits for its turn, waiting requests
+    being served in arrival order. Otherwise it fails immediately with a SkyflowError
+    carrying code 429.
+    '''
+
+    def __init__(self, rate: float, burst: int = None, blocking: bool = True):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(-(-rate // 1)))
+        self.blocking = blocking
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, interface: str = 'Unknown', timeout: float = None):
+        '''
+        Takes one token, sleeping the calling thread until it is available. Raises
+        DeadlineExceeded without waiting when that takes longer than `timeout` seconds.
+        '''
+        delay = self._reserve(interface, timeout)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquireAsync(self, interface: str = 'Unknown', timeout: float = None):
+        '''
+        Takes one token without blocking the event loop while waiting for it
+        '''
+        delay = self._reserve(interface, timeout)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # a request cancelled while waiting, like a losing hedge, does not keep the bucket in debt
+                self._refund()
+                raise
+
+    def _refund(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def _reserve(self, interface, timeout=None):
+        '''
+        Takes a token, possibly borrowed from the future, and returns how long to wait before using it
+        '''
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1 and not self.blocking:
+                raise SkyflowError(SkyflowErrorCodes.TOO_MANY_REQUESTS,
+                                   SkyflowErrorMessages.RATE_LIMIT_EXCEEDED.value % (self.rate), interface=interface)
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self.rate)
+            if timeout is not None and delay > timeout:
+                # the token goes back to the requests that can still use it in time
+                self._tokens += 1
+                raise DeadlineExceeded()
+            return delay
@@ -0,0 +1,149 @@
+import asyncio
+import email.utils
+import random
+import time
+import aiohttp
+import requests
+
+try:
+    import httpx
+    # raised by the HTTP/2 transport, timeouts are transport errors too
+    HTTPX_EXCEPTIONS = (httpx.TransportError, httpx.TimeoutException)
+    HTTPX_CONNECT_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout)
+except ImportError:
+    HTTPX_EXCEPTIONS = ()
+    HTTPX_CONNECT_EXCEPTIONS = ()
+
+# failures to connect, after which the vault cannot have processed the request
+CONNECT_EXCEPTIONS = (requests.exceptions.ConnectionError, aiohttp.ClientConnectorError) + HTTPX_CONNECT_EXCEPTIONS
+
+
+class RetryPolicy:
+    '''
+    Retries a failed vault request up to `maxAttempts` times in total.
+
+    A request is retried when its status code is in `retryableStatusCodes` or it raised
+    one of `retryableExceptions`, by default the connection errors and timeouts of every
+    transport. The wait before attempt n+1 is
+    initialBackoff * backoffMultiplier ** (n - 1), capped at maxBackoff, and randomized
+    between zero and that value when `jitter` is set. With `respectRetryAfter`, a
+    Retry-After header sets the wait instead; a request asking for more than maxBackoff
+    is not retried.
+
+    Inserts are not idempotent: a request that timed out or got a 502 or 504 may have
+    been stored, so they are only retried on `nonIdempotentStatusCodes` and
+    `nonIdempotentExceptions`, by default throttling, 503 and failures to connect.
+    '''
+
+    def __init__(self, maxAttempts: int = 3, initialBackoff: float = 0.1, maxBackoff: float = 10.0,
+                 backoffMultiplier: float = 2.0, jitter: bool = True,
+                 retryableStatusCodes=(429, 502, 503, 504),
+                 retryableExceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                                      aiohttp.ClientConnectionError, asyncio.TimeoutError) + HTTPX_EXCEPTIONS,
+                 respectRetryAfter: bool = True, nonIdempotentStatusCodes=(429, 503),
+                 nonIdempotentExceptions=CONNECT_EXCEPTIONS):
+        self.maxAttempts = maxAttempts
+        self.initialBackoff = initialBackoff
+        self.maxBackoff = maxBackoff
+        self.backoffMultiplier = backoffMultiplier
+        self.jitter = jitter
+        self.retryableStatusCodes = set(retryableStatusCodes)
+        self.retryableExceptions = tuple(retryableExceptions)
+        self.respectRetryAfter = respectRetryAfter
+        self.nonIdempotentStatusCodes = set(nonIdempotentStatusCodes)
+        self.nonIdempotentExceptions = tuple(nonIdempotentExceptions)
+
+    def getDelay(self, attempt: int, statusCode: int = None, error: Exception = None, headers=None,
+                 idempotent: bool = True):
+        '''
+        Returns the seconds to wait before retrying the given attempt, or None if it must not be retried
+        '''
+        if attempt >= self.maxAttempts:
+            return None
+        retryableExceptions = self.retryableExceptions if idempotent else self.nonIdempotentExceptions
+        retryableStatusCodes = self.retryableStatusCodes if idempotent else self.nonIdempotentStatusCodes
+        if error is not None:
+            if not isinstance(error, retryableExceptions):
+                return None
+        elif statusCode not in retryableStatusCodes:
+            return None
+
+        if self.respectRetryAfter and headers is not None and 'Retry-After' in headers:
+            retryAfter = parseRetryAfter(headers['Retry-After'])
+            if retryAfter is not None:
+                return retryAfter if retryAfter <= self.maxBackoff else None
+
+        backoff = min(self.maxBackoff, self.initialBackoff *
+                      self.backoffMultiplier ** (attempt - 1))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        return backoff
+
+
+def parseRetryAfter(value: str):
+    '''
+    Retry-After holds either a number of seconds or an HTTP date
+    '''
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retrySync(retryPolicy: RetryPolicy, request, deadline=None, idempotent: bool = True):
+    '''
+    Calls request, which returns (result, statusCode, headers), until it succeeds or the policy gives up.
+    No retry is made that would start after the deadline.
+    '''
+    attempt = 1
+    while True:
+        try:
+            result, statusCode, headers = request()
+        except Exception as e:
+            delay = retryPolicy.getDelay(
+                attempt, error=e, idempotent=idempotent) if retryPolicy else None
+            if delay is None or _outlives(deadline, delay):
+                raise
+        else:
+            delay = retryPolicy.getDelay(
+                attempt, statusCode, headers=headers, idempotent=idempotent) if retryPolicy else None
+            if delay is None or _outlives(deadline, delay):
+                return result
+        time.sleep(delay)
+        attempt += 1
+
+
+async def retryAsync(retryPolicy: RetryPolicy, request, deadline=None, idempotent: bool = True):
+    '''
+    Awaits request, which returns (result, statusCode, headers), until it succeeds or the policy gives up
+    '''
+    attempt = 1
+    while True:
+        try:
+            result, statusCode, headers = await request()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            delay = retryPolicy.getDelay(
+                attempt, error=e, idempotent=idempotent) if retryPolicy else None
+            if delay is None or _outlives(deadline, delay):
+                raise
+        else:
+            delay = retryPolicy.getDelay(
+                attempt, statusCode, headers=headers, idempotent=idempotent) if retryPolicy else None
+            if delay is None or _outlives(deadline, delay):
+                return result
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _outlives(deadline, delay):
+    '''
+    True when waiting delay seconds would reach the deadline
+    '''
+    remaining = deadline.remaining() if deadline is not None else None
+    return remaining is not None and delay >= remaining
@@ -1,41 +1,158 @@
-import jwt
+import asyncio
+import inspect
+import threading
 import time
 from skyflow.errors._skyflowerrors import *
+from skyflow._utils import decodeTokenClaims
+
+# tokens are refreshed once they have less than this many seconds left
+REFRESH_MARGIN = 300
+
+
+class TokenCache:
+    '''
+    Bearer token shared by every call of a client. At most one refresh runs at a time:
+    while it does, callers keep using the current token if it has not expired yet and
+    otherwise wait for the refresh and use its token instead of calling the provider.
+    '''
+
+    def __init__(self, tokenProvider):
+        self.tokenProvider = tokenProvider
+        # the token and its expiry, swapped together so that calls check a float
+        self._current = ('', None)
+        # wall clock time the current token was received at
+        self.obtainedAt = None
+        self._lock = threading.Lock()
+        self._asyncLock = None
+        self._asyncLockLoop = None
+
+    @property
+    def token(self) -> str:
+        return self._current[0]
+
+    @token.setter
+    def token(self, token: str):
+        self._current = (token, getTokenExpiry(token))
+
+    @property
+    def expiresAt(self):
+        return self._current[1]
+
+    def get(self, interface: str) -> str:
+        token, expiresAt = self._current
+        if expiresAt is not None and time.time() + REFRESH_MARGIN < expiresAt:
+            return token
+        if not self._lock.acquire(blocking=False):
+            if expiresAt is not None and time.time() < expiresAt:
+                return token
+            self._lock.acquire()
+        try:
+            # the refresh we waited for may have stored a valid token already
+            self._store(tokenProviderWrapper(self.token, self.tokenProvider, interface))
+            return self.token
+        finally:
+            self._lock.release()
+
+    def refresh(self, interface: str) -> str:
+        '''
+        Fetches a new token even if the current one is still valid. Callers of get keep
+        using the current token until the new one is swapped in.
+        '''
+        with self._lock:
+            token = self.tokenProvider()
+            verify_token_from_provider(token, interface)
+            # a provider caching tokens itself may return the current one again
+            self.obtainedAt = time.time()
+            self.token = token
+            return token
+
+    async def getAsync(self, interface: str) -> str:
+        '''
+        Same as get for AsyncClient, the token provider may return an awaitable
+        '''
+        token, expiresAt = self._current
+        if expiresAt is not None and time.time() + REFRESH_MARGIN < expiresAt:
+            return token
+        lock = self._getAsyncLock()
+        if lock.locked() and expiresAt is not None and time.time() < expiresAt:
+            return token
+        async with lock:
+            self._store(await asyncTokenProviderWrapper(self.token, self.tokenProvider, interface))
+            return self.token
+
+    def _store(self, token: str):
+        if token != self.token:
+            self.obtainedAt = time.time()
+            self.token = token
+
+    def _getAsyncLock(self):
+        # asyncio locks are bound to the event loop running when they are first used
+        loop = asyncio.get_event_loop()
+        if self._asyncLock is None or self._asyncLockLoop is not loop:
+            self._asyncLock = asyncio.Lock()
+            self._asyncLockLoop = loop
+        return self._asyncLock
 
 
 def tokenProviderWrapper(storedToken: str, newTokenProvider, interface: str):
     '''
     Check if stored token is not expired, if not return a new token
     '''
+    if isStoredTokenValid(storedToken, interface):
+        return storedToken
+
+    newToken = newTokenProvider()
+    verify_token_from_provider(newToken, interface)
+    return newToken
 
+
+async def asyncTokenProviderWrapper(storedToken: str, newTokenProvider, interface: str):
+    '''
+    Same as tokenProviderWrapper, but also accepts a token provider returning an awaitable
+    '''
+    if isStoredTokenValid(storedToken, interface):
+        return storedToken
+
+    newToken = newTokenProvider()
+    if inspect.isawaitable(newToken):
+        newToken = await newToken
+    verify_token_from_provider(newToken, interface)
+    return newToken
+
+
+def isStoredTokenValid(storedToken: str, interface: str):
+    '''
+    Check if the stored token has more than 5 minutes left before it expires
+    '''
     if len(storedToken) == 0:
-        newToken = newTokenProvider()
-        verify_token_from_provider(newToken, interface)
-        return newToken
+        return False
 
     try:
-        decoded = jwt.decode(storedToken, options={
-                             "verify_signature": False, "verify_aud": False})
-        if time.time() + 300 < decoded['exp']:
-            return storedToken
-        else:
-            newToken = newTokenProvider()
-            verify_token_from_provider(newToken, interface)
-            return newToken
+        return time.time() + REFRESH_MARGIN < decodeTokenClaims(storedToken)['exp']
     except Exception:
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
                            SkyflowErrorMessages.JWT_DECODE_ERROR, interface=interface)
 
 
+def getTokenExpiry(token: str):
+    '''
+    Expiry of the token as a unix timestamp, None if it cannot be decoded
+    '''
+    if len(token) == 0:
+        return None
+    try:
+        return decodeTokenClaims(token)['exp']
+    except Exception:
+        return None
+
+
 def verify_token_from_provider(token, interface):
     '''
     Verify the jwt from token provider
     '''
     try:
-        jwt.decode(token, options={
-            "verify_signature": False,
-            "verify_aud": False
-        }, algorithms=['RS256'])
+        # decoded once here, the validity checks of later calls hit the cache
+        decodeTokenClaims(token)
     except Exception as e:
         raise SkyflowError(SkyflowErrorCodes.INVALID_INPUT,
                            SkyflowErrorMessages.TOKEN_PROVIDER_INVALID_TOKEN, interface=interface)
@@ -0,0 +1,92 @@
+import threading
+import time
+from skyflow._utils import log_info, log_error, InfoMessages, InterfaceName
+from ._token import TokenCache, getTokenExpiry
+
+interface = InterfaceName.TOKEN_REFRESH.value
+
+
+class TokenRefreshPolicy:
+    '''
+    Renews the bearer token of a Client on a background thread once `refreshAt` of its
+    lifetime, measured from when it was received to its expiry, has passed. Calls keep
+    using the current token until the new one is swapped in, so no call waits for the
+    token provider while the refresh succeeds.
+
+    A failed refresh is retried after initialBackoff * backoffMultiplier ** (n - 1)
+    seconds, capped at maxBackoff. Calls refresh the token inline as before if it
+    nevertheless gets within 5 minutes of its expiry.
+    '''
+
+    def __init__(self, refreshAt: float = 0.8, initialBackoff: float = 1.0, maxBackoff: float = 60.0,
+                 backoffMultiplier: float = 2.0):
+        self.refreshAt = refreshAt
+        self.initialBackoff = initialBackoff
+        self.maxBackoff = maxBackoff
+        self.backoffMultiplier = backoffMultiplier
+
+    def getRefreshDelay(self, token: str, obtainedAt: float):
+        '''
+        Seconds until the token is due for renewal, 0 if it is due now or cannot be decoded
+        '''
+        expiry = getTokenExpiry(token)
+        if expiry is None or obtainedAt is None:
+            return 0.0
+        refreshTime = obtainedAt + self.refreshAt * (expiry - obtainedAt)
+        return max(0.0, refreshTime - time.time())
+
+    def getBackoff(self, failures: int):
+        return min(self.maxBackoff, self.initialBackoff * self.backoffMultiplier ** (failures - 1))
+
+
+class TokenRefresher:
+    '''
+    Daemon thread renewing the token of a TokenCache according to a TokenRefreshPolicy
+    '''
+
+    def __init__(self, tokenCache: TokenCache, policy: TokenRefreshPolicy):
+        self.tokenCache = tokenCache
+        self.policy = policy
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='skyflow-token-refresh', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        '''
+            Stops the thread, waiting for a refresh in progress to return
+        '''
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        failures = 0
+        while not self._stopped.is_set():
+            if failures > 0:
+                delay = self.policy.getBackoff(failures)
+            else:
+                delay = self.policy.getRefreshDelay(self.tokenCache.token, self.tokenCache.obtainedAt)
+            if delay > 0:
+                self._stopped.wait(delay)
+                # calls may have refreshed the token meanwhile, the delay is recomputed
+                if failures == 0:
+                    continue
+            if self._stopped.is_set():
+                return
+            try:
+                self.tokenCache.refresh(interface)
+            except Exception as e:
+                failures += 1
+                log_error(InfoMessages.TOKEN_REFRESH_FAILED.value % str(e), interface)
+                continue
+            if self.policy.getRefreshDelay(self.tokenCache.token, self.tokenCache.obtainedAt) == 0:
+                # renewing again right away would call the provider in a loop
+                failures += 1
+                log_error(InfoMessages.TOKEN_REFRESH_FAILED.value % 'the new token is already due for renewal',
+                          interface)
+                continue
+            failures = 0
+            log_info(InfoMessages.TOKEN_REFRESHED.value, interface)
@@ -0,0 +1,23 @@
+from aiohttp import ClientSession, TCPConnector
+from skyflow.transport._transport import AsyncTransport, AiohttpTransport, Http2Transport
+from ._config import PoolOptions
+
+
+def createAsyncTransport(poolOptions: PoolOptions) -> AsyncTransport:
+    '''
+        Creates the transport selected by the pool options, must be called from a running loop
+    '''
+    if poolOptions.http2:
+        return Http2Transport(poolOptions.poolSize * poolOptions.maxConnectionsPerHost, poolOptions.keepAlive)
+    return AiohttpTransport(createClientSession(poolOptions))
+
+
+def createClientSession(poolOptions: PoolOptions) -> ClientSession:
+    '''
+        Creates an aiohttp session sized by the pool options, must be called from a running loop
+    '''
+    # aiohttp caps in-flight requests by open connections, so the total
+    # limit is sized for every host pool rather than a single host
+    connector = TCPConnector(limit=poolOptions.poolSize * poolOptions.maxConnectionsPerHost,
+                             force_close=not poolOptions.keepAlive)
+    return ClientSession(connector=connector)
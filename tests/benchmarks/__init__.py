@@ -0,0 +1,10 @@
+'''
+Micro-benchmarks of the SDK hot paths. Modules here are not named test* so unit test
+discovery skips them; run them with
+
+    python -m tests.benchmarks --output results.json
+    python -m tests.benchmarks --compare results.json
+
+The second form runs again and exits with status 1 when a benchmark got slower, or
+allocates more memory, than the baseline by more than --threshold.
+'''
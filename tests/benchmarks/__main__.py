@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+
+from . import benchmarks
+from ._harness import BENCHMARKS, runBenchmark, compare, printResult, dump
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m tests.benchmarks')
+    parser.add_argument('--output', help='file the JSON results are written to')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown or memory growth reported as a regression')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='seconds every repeat runs for at least')
+    options = parser.parse_args(args)
+
+    results = []
+    for name, size, factory in BENCHMARKS:
+        if options.filter in name:
+            results.append(runBenchmark(name, size, factory, options.repeat, options.min_time))
+            printResult(results[-1])
+
+    if options.output is not None:
+        dump(results, options.output)
+    if options.compare is not None:
+        with open(options.compare) as baseline:
+            if len(compare(results, json.load(baseline), options.threshold)) > 0:
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
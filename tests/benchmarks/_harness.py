@@ -0,0 +1,120 @@
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+BENCHMARKS = []
+
+
+def benchmark(name, sizes=(1,)):
+    '''
+    Registers a benchmark. The decorated generator receives a size, sets up its
+    inputs, yields the function to time and cleans up after it is resumed.
+    '''
+    def register(factory):
+        for size in sizes:
+            BENCHMARKS.append((name, size, factory))
+        return factory
+    return register
+
+
+def runBenchmark(name, size, factory, repeat, minTime):
+    setup = factory(size)
+    function = next(setup)
+    try:
+        function()
+        iterations = _calibrate(function, minTime)
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                function()
+            timings.append((time.perf_counter() - started) / iterations)
+
+        tracemalloc.start()
+        try:
+            function()
+            _, peakMemory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        setup.close()
+
+    median = statistics.median(timings)
+    return {
+        'name': name,
+        'size': size,
+        'iterations': iterations,
+        'repeat': repeat,
+        'median': median,
+        'min': min(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'opsPerSecond': 1 / median if median > 0 else None,
+        'peakMemory': peakMemory
+    }
+
+
+def _calibrate(function, minTime):
+    '''
+    Smallest power of ten of iterations taking at least minTime
+    '''
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        if time.perf_counter() - started >= minTime or iterations >= 10 ** 6:
+            return iterations
+        iterations *= 10
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+
+
+def compare(results, baseline, threshold):
+    '''
+    Prints the change of every benchmark against the baseline and returns the
+    regressions, a slowdown or memory growth of more than threshold
+    '''
+    previous = {(result['name'], result['size']): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['name'], result['size']))
+        if before is None:
+            continue
+        timeRatio = result['median'] / before['median']
+        memoryRatio = (result['peakMemory'] + 1) / (before['peakMemory'] + 1)
+        regressed = timeRatio > 1 + threshold or memoryRatio > 1 + threshold
+        if regressed:
+            regressions.append(result)
+        print('%-36s %8d  time x%.2f  memory x%.2f%s' % (result['name'], result['size'], timeRatio, memoryRatio,
+                                                         '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def printResult(result):
+    print('%-36s %8d  %12.1f ops/s  %10.3f ms  peak %10d B' % (
+        result['name'], result['size'], result['opsPerSecond'] or 0, result['median'] * 1000,
+        result['peakMemory']))
+
+
+def dump(results, path):
+    with open(path, 'w') as output:
+        json.dump({'environment': environment(), 'results': results}, output, indent=2)
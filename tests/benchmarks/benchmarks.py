@@ -0,0 +1,153 @@
+import asyncio
+import concurrent.futures
+import json
+import time
+
+import jwt
+from aiohttp import ClientSession
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from skyflow._utils import r_urlencode
+from skyflow.service_account import is_expired, generate_bearer_token_from_creds, BearerTokenCache
+from skyflow.service_account._token import getSignedJWT
+from skyflow.testing import InMemoryVault, InMemoryTransport, AsyncInMemoryTransport
+from skyflow.testing.mockvault import MockVaultServer
+from skyflow.transport import AiohttpTransport
+from skyflow.vault._config import ConnectionConfig, RequestMethod
+from skyflow.vault._connection import createRequest
+from skyflow.vault._detokenize import sendDetokenizeRequests
+from skyflow.vault._getById import createGetByIdResponseBody
+from skyflow.vault._insert import getInsertRequestBody, convertResponse
+from skyflow.vault._token import tokenProviderWrapper, TokenCache
+from ._harness import benchmark
+
+RECORD_SIZES = (1, 1000, 100000)
+FAN_OUT_SIZES = (1, 100, 1000)
+
+
+def insertRecords(size):
+    return {'records': [{'table': 'cards', 'fields': {'card_number': '4111111111111111', 'cvv': str(index)}}
+                        for index in range(size)]}
+
+
+@benchmark('getInsertRequestBody', RECORD_SIZES)
+def insertRequestBody(size):
+    records = insertRecords(size)
+    yield lambda: getInsertRequestBody(records, True)
+
+
+@benchmark('convertResponse', RECORD_SIZES)
+def insertConvertResponse(size):
+    records = insertRecords(size)
+    responses = [{'records': [{'skyflow_id': 'id-%d' % index}]} for index in range(size)]
+    responses += [{'fields': {'card_number': 'token-%d' % index, 'cvv': 'token-%d' % index}}
+                  for index in range(size)]
+    yield lambda: convertResponse(records, {'responses': responses}, True)
+
+
+@benchmark('sendDetokenizeRequests.inMemory', FAN_OUT_SIZES)
+def detokenizeInMemory(size):
+    vault = InMemoryVault()
+    records = detokenizeRecords(vault, size)
+    transport = AsyncInMemoryTransport(vault)
+    loop = asyncio.new_event_loop()
+    try:
+        yield lambda: loop.run_until_complete(sendDetokenizeRequests(
+            records, 'https://vault.skyflow.test/v1/vaults/id/detokenize', 'token', transport=transport))
+    finally:
+        loop.close()
+
+
+@benchmark('sendDetokenizeRequests.localServer', FAN_OUT_SIZES)
+def detokenizeLocalServer(size):
+    server = MockVaultServer()
+    server.start()
+    records = detokenizeRecords(server.vault, size)
+    loop = asyncio.new_event_loop()
+    transport = loop.run_until_complete(_createTransport())
+    try:
+        yield lambda: loop.run_until_complete(sendDetokenizeRequests(
+            records, server.url + '/v1/vaults/id/detokenize', 'token', transport=transport))
+    finally:
+        loop.run_until_complete(transport.close())
+        loop.close()
+        server.close()
+
+
+async def _createTransport():
+    return AiohttpTransport(ClientSession())
+
+
+def detokenizeRecords(vault, size):
+    tokens = ['token-%d' % index for index in range(size)]
+    for token in tokens:
+        vault.tokens[token] = 'value'
+    return {'records': [{'token': token} for token in tokens]}
+
+
+@benchmark('createGetByIdResponseBody', RECORD_SIZES)
+def getByIdResponseBody(size):
+    records = [{'fields': {'skyflow_id': 'id-%d' % index, 'card_number': '4111111111111111'}}
+               for index in range(size)]
+    response = concurrent.futures.Future()
+    response.set_result((json.dumps({'records': records}).encode('utf-8'), 200, 'cards'))
+    yield lambda: createGetByIdResponseBody([response])
+
+
+@benchmark('tokenProviderWrapper')
+def tokenProvider(size):
+    token = jwt.encode({'exp': int(time.time()) + 3600}, 'a' * 32, algorithm='HS256')
+    yield lambda: tokenProviderWrapper(token, lambda: token, 'benchmark')
+
+
+@benchmark('TokenCache.get')
+def tokenCache(size):
+    token = jwt.encode({'exp': int(time.time()) + 3600}, 'a' * 32, algorithm='HS256')
+    cache = TokenCache(lambda: token)
+    cache.get('benchmark')
+    yield lambda: cache.get('benchmark')
+
+
+@benchmark('is_expired')
+def isExpired(size):
+    token = jwt.encode({'exp': int(time.time()) + 3600}, 'a' * 32, algorithm='HS256')
+    yield lambda: is_expired(token)
+
+
+@benchmark('createRequest.json', (1, 100, 1000))
+def connectionJSON(size):
+    config = ConnectionConfig('https://connection.skyflow.test/cards/{card_id}', RequestMethod.POST,
+                              pathParams={'card_id': '1234'}, queryParams={'page': '1'},
+                              requestBody=connectionBody(size))
+    yield lambda: createRequest(config)
+
+
+@benchmark('r_urlencode', (1, 100, 1000))
+def formData(size):
+    body = connectionBody(size)
+    yield lambda: r_urlencode(list(), dict(), body)
+
+
+def connectionBody(size):
+    return {'card_%d' % index: {'number': '4111111111111111', 'expiry': ['12', '2030']}
+            for index in range(size)}
+
+
+@benchmark('getSignedJWT')
+def signedJWT(size):
+    privateKey = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    yield lambda: getSignedJWT('client', 'key', 'https://manage.skyflow.test/v1/auth/sa/oauth/token', privateKey)
+
+
+@benchmark('generate_bearer_token_from_creds.cached')
+def cachedBearerToken(size):
+    privateKey = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    credentials = json.dumps({'privateKey': privateKey.decode(), 'clientID': 'client', 'keyID': 'key',
+                              'tokenURI': 'https://manage.skyflow.test/v1/auth/sa/oauth/token'})
+    transport = InMemoryTransport(InMemoryVault())
+    cache = BearerTokenCache()
+    generate_bearer_token_from_creds(credentials, transport, cache)
+    yield lambda: generate_bearer_token_from_creds(credentials, transport, cache)
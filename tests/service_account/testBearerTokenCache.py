@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from skyflow.service_account import BearerTokenCache, generate_bearer_token, generate_bearer_token_from_creds
+from skyflow.service_account._token import ResponseToken
+from skyflow.testing import InMemoryVault, InMemoryTransport
+
+
+def privateKey():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+
+
+class TestBearerTokenCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.privateKey = privateKey()
+
+    def setUp(self) -> None:
+        self.vault = InMemoryVault()
+        self.transport = InMemoryTransport(self.vault)
+        self.directory = tempfile.mkdtemp()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+        return super().tearDown()
+
+    def credentials(self, clientID='client', key=None):
+        return json.dumps({'privateKey': key or self.privateKey, 'clientID': clientID, 'keyID': 'key',
+                           'tokenURI': 'https://manage.skyflow.test/v1/auth/sa/oauth/token'})
+
+    def generate(self, cache, credentials=None):
+        return generate_bearer_token_from_creds(credentials or self.credentials(), self.transport, cache)
+
+    def testReturnsCachedToken(self):
+        cache = BearerTokenCache()
+        first = self.generate(cache)
+        self.assertEqual(self.generate(cache), first)
+        self.assertEqual(self.vault.requestCount, 1)
+
+        self.assertNotEqual(self.generate(cache, self.credentials('other')), first)
+        self.assertEqual(self.vault.requestCount, 2)
+
+    def testWithoutCache(self):
+        self.generate(None)
+        self.generate(None)
+        self.assertEqual(self.vault.requestCount, 2)
+
+    def testCredentialsFile(self):
+        path = os.path.join(self.directory, 'credentials.json')
+        with open(path, 'w') as file:
+            file.write(self.credentials())
+        cache = BearerTokenCache()
+        self.assertEqual(generate_bearer_token(path, self.transport, cache), self.generate(cache))
+        self.assertEqual(self.vault.requestCount, 1)
+
+    def testRefreshesExpiringToken(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return ResponseToken(jwt.encode({'exp': int(time.time()) + 100}, 'a' * 32, algorithm='HS256'), 'Bearer')
+
+        cache = BearerTokenCache()
+        credentials = json.loads(self.credentials())
+        cache.getToken(credentials, fetch)
+        cache.getToken(credentials, fetch)
+        self.assertEqual(len(calls), 2)
+        cache = BearerTokenCache(refreshMargin=10)
+        cache.getToken(credentials, fetch)
+        cache.getToken(credentials, fetch)
+        self.assertEqual(len(calls), 3)
+
+    def testSingleFetchAcrossThreads(self):
+        cache = BearerTokenCache()
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            tokens = list(executor.map(lambda _: self.generate(cache), range(16)))
+        self.assertEqual(len(set(tokens)), 1)
+        self.assertEqual(self.vault.requestCount, 1)
+
+    def testSharedThroughDirectory(self):
+        first = self.generate(BearerTokenCache(self.directory))
+        # a new instance stands for another process on the host
+        self.assertEqual(self.generate(BearerTokenCache(self.directory)), first)
+        self.assertEqual(self.vault.requestCount, 1)
+
+        files = os.listdir(self.directory)
+        self.assertEqual(len(files), 1)
+        path = os.path.join(self.directory, files[0])
+        with open(path, 'rb') as file:
+            content = file.read()
+        self.assertNotIn(first.AccessToken.encode(), content)
+        self.assertNotIn(b'client', files[0].encode())
+        if os.name == 'posix':
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def testOtherPrivateKeyCannotRead(self):
+        self.generate(BearerTokenCache(self.directory))
+        self.generate(BearerTokenCache(self.directory), self.credentials(key=privateKey()))
+        self.assertEqual(self.vault.requestCount, 2)
+
+    def testCorruptFileIgnored(self):
+        self.generate(BearerTokenCache(self.directory))
+        for name in os.listdir(self.directory):
+            with open(os.path.join(self.directory, name), 'wb') as file:
+                file.write(b'corrupt')
+        self.generate(BearerTokenCache(self.directory))
+        self.assertEqual(self.vault.requestCount, 2)
+
+    def testClear(self):
+        cache = BearerTokenCache()
+        self.generate(cache)
+        cache.clear()
+        self.generate(cache)
+        self.assertEqual(self.vault.requestCount, 2)
@@ -1,5 +1,7 @@
 import os
+import time
 import unittest
+from unittest import mock
 from dotenv import dotenv_values
 
 from skyflow.service_account._token import *
@@ -32,3 +34,10 @@ class TestGenerateBearerToken(unittest.TestCase):
             self.assertEqual(True, is_expired(expiredToken))
         except SkyflowError:
             self.fail('raised error for expired token')
+
+    def testIsExpiredDecodesOnce(self):
+        token = jwt.encode({'exp': time.time() + 3600}, 'a' * 32, algorithm='HS256')
+        with mock.patch('skyflow._utils.jwt.decode', wraps=jwt.decode) as decode:
+            self.assertFalse(is_expired(token))
+            self.assertFalse(is_expired(token))
+        self.assertEqual(decode.call_count, 1)
@@ -0,0 +1,101 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import jwt
+
+
+def validToken(lifetime=3600):
+    return jwt.encode({'exp': int(time.time()) + lifetime}, 'a' * 32, algorithm='HS256')
+
+
+class LocalVaultHandler(BaseHTTPRequestHandler):
+    '''
+    Minimal vault stand-in: batch insert, detokenize, get by id and a connection echo.
+    Tokens starting with "invalid" are answered with a 404 error, inserts into
+    the "invalid" table with a 400 error.
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.server.requests.append(self)
+        self.server.clientPorts.add(self.client_address[1])
+        path = urlparse(self.path).path
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        if path.endswith('/detokenize'):
+            self._detokenize(json.loads(body))
+        elif path.startswith('/v1/vaults/'):
+            self._insert(json.loads(body))
+        else:
+            self._respond(200, {'path': path, 'body': body.decode(),
+                                'headers': {k.lower(): v for k, v in self.headers.items()}})
+
+    def do_HEAD(self):
+        self.server.requests.append(self)
+        self.server.clientPorts.add(self.client_address[1])
+        # keeps concurrent warmup requests in flight together
+        time.sleep(0.05)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests.append(self)
+        url = urlparse(self.path)
+        table = url.path.rsplit('/', 1)[1]
+        query = parse_qs(url.query)
+        records = [{'fields': {'skyflow_id': id, 'redaction': query['redaction'][0]}}
+                   for id in query['skyflow_ids']]
+        self._respond(200, {'records': records})
+
+    def _detokenize(self, body):
+        records = []
+        for parameter in body['detokenizationParameters']:
+            token = parameter['token']
+            if token.startswith('invalid'):
+                return self._respond(404, {'error': {'http_code': 404, 'message': 'Token not found for ' + token}})
+            records.append({'token': token, 'value': 'value-' + token})
+        self._respond(200, {'records': records})
+
+    def _insert(self, body):
+        inserts = [r for r in body['records'] if r['method'] == 'POST']
+        if any(r['tableName'] == 'invalid' for r in inserts):
+            return self._respond(400, {'error': {'http_code': 400, 'message': 'Invalid table'}})
+        gets = [r for r in body['records'] if r['method'] == 'GET']
+        responses = [{'records': [{'skyflow_id': 'id-' + str(index)}]}
+                     for index, _ in enumerate(inserts)]
+        for index, _ in enumerate(gets):
+            fields = {key: 'token-' + str(value)
+                      for key, value in inserts[index]['fields'].items()}
+            responses.append({'fields': fields})
+        self._respond(200, {'responses': responses})
+
+    def _respond(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalVault:
+    def __init__(self, handler=LocalVaultHandler):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.requests = []
+        self.server.clientPorts = set()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_port
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                         daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from skyflow.vault import AdaptiveConcurrency, Client
+from skyflow.vault._concurrency import runBounded, runBoundedThreads
+from skyflow.vault._config import *
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class SlowHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        time.sleep(0.1)
+        super()._detokenize(body)
+
+
+class RecordingLimiter:
+    '''
+    Fixed limit recording the statuses reported by the fan-outs
+    '''
+
+    def __init__(self, limit, maxLimit=None):
+        self.limit = limit
+        self.maxLimit = maxLimit or limit
+        self.statuses = []
+        self._lock = threading.Lock()
+
+    def onResponse(self, latency, status):
+        with self._lock:
+            self.statuses.append(status)
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+
+    def testAdditiveIncrease(self):
+        limiter = AdaptiveConcurrency(initialLimit=4, maxLimit=10)
+        for _ in range(4):
+            limiter.onResponse(0.01, 200)
+        self.assertEqual(limiter.limit, 4)
+        for _ in range(5):
+            limiter.onResponse(0.01, 200)
+        self.assertEqual(limiter.limit, 5)
+
+    def testIncreaseCappedAtMaxLimit(self):
+        limiter = AdaptiveConcurrency(initialLimit=2, maxLimit=3)
+        for _ in range(100):
+            limiter.onResponse(0.01, 200)
+        self.assertEqual(limiter.limit, 3)
+
+    def testMultiplicativeDecreaseOncePerWindow(self):
+        limiter = AdaptiveConcurrency(initialLimit=16)
+        limiter.onResponse(1.0, 200)
+        limiter.onResponse(1.0, 429)
+        limiter.onResponse(1.0, 503)
+        self.assertEqual(limiter.limit, 8)
+
+    def testDecreaseOnFailureAndLatencySpike(self):
+        limiter = AdaptiveConcurrency(initialLimit=16, minLimit=3)
+        limiter.onResponse(0.001, 200)
+        time.sleep(0.002)
+        limiter.onResponse(0.5, 200)
+        self.assertEqual(limiter.limit, 8)
+        time.sleep(0.002)
+        limiter.onResponse(0.001, None)
+        self.assertEqual(limiter.limit, 4)
+        time.sleep(0.002)
+        limiter.onResponse(0.001, 429)
+        self.assertEqual(limiter.limit, 3)
+
+    def testRunBoundedFollowsLimit(self):
+        limiter = AdaptiveConcurrency(initialLimit=3, maxLimit=3)
+        state = {'inFlight': 0, 'peak': 0}
+
+        async def request():
+            state['inFlight'] += 1
+            state['peak'] = max(state['peak'], state['inFlight'])
+            await asyncio.sleep(0.001)
+            state['inFlight'] -= 1
+            return (b'{}', 200)
+
+        futures = asyncio.run(runBounded([request] * 30, limiter=limiter))
+        self.assertEqual(state['peak'], 3)
+        self.assertEqual(len(futures), 30)
+
+    def testRunBoundedThreadsBacksOff(self):
+        limiter = AdaptiveConcurrency(initialLimit=8)
+
+        def throttled():
+            time.sleep(0.001)
+            return (b'', 429)
+
+        runBoundedThreads([throttled] * 20, limiter=limiter)
+        self.assertLess(limiter.limit, 8)
+
+    def testClientFanOutsReportToLimiter(self):
+        vault = LocalVault()
+        token = validToken()
+        limiter = RecordingLimiter(limit=2)
+        config = Configuration('vaultid', vault.url, lambda: token,
+                               adaptiveConcurrency=limiter)
+        try:
+            with Client(config) as client:
+                client.detokenize(
+                    {'records': [{'token': str(i)} for i in range(20)]})
+                client.insert({'records': [{'table': 'cards', 'fields': {'cvv': str(i)}} for i in range(20)]},
+                              InsertOptions(batchSize=2))
+                items = list(client.detokenize_stream(
+                    {'records': [{'token': str(i)} for i in range(5)]}))
+        finally:
+            vault.close()
+        self.assertEqual(len(items), 5)
+        # 20 detokenize requests, 10 insert chunks and 5 streamed requests
+        self.assertEqual(limiter.statuses, [200] * 35)
+
+    def testStreamFollowsLimit(self):
+        vault = LocalVault(SlowHandler)
+        token = validToken()
+        limiter = RecordingLimiter(limit=1, maxLimit=4)
+        config = Configuration('vaultid', vault.url, lambda: token, adaptiveConcurrency=limiter)
+        started = time.monotonic()
+        try:
+            with Client(config) as client:
+                list(client.detokenize_stream({'records': [{'token': str(i)} for i in range(3)]}))
+        finally:
+            vault.close()
+        # one request at a time although four workers are allowed
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        self.assertEqual(limiter.statuses, [200] * 3)
@@ -0,0 +1,92 @@
+import asyncio
+import unittest
+
+from skyflow.vault import AsyncClient
+from skyflow.vault._config import *
+from skyflow.errors._skyflowerrors import *
+from tests.vault.localVault import LocalVault, validToken
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        self.token = validToken()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def run_with_client(self, operation, tokenProvider=None):
+        config = Configuration('vaultid', self.vault.url,
+                               tokenProvider or (lambda: self.token))
+
+        async def run():
+            async with AsyncClient(config) as client:
+                return await operation(client)
+        return asyncio.run(run())
+
+    def testInsert(self):
+        data = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]}
+        result = self.run_with_client(lambda client: client.insert(data))
+        self.assertEqual(result['records'][0]['table'], 'cards')
+        self.assertEqual(result['records'][0]['fields']['cvv'], 'token-123')
+        self.assertEqual(result['records'][0]['fields']['skyflow_id'], 'id-0')
+
+    def testDetokenize(self):
+        data = {'records': [{'token': 'abc'}, {'token': 'def'}]}
+        result = self.run_with_client(lambda client: client.detokenize(data))
+        self.assertEqual([r['value'] for r in result['records']],
+                         ['value-abc', 'value-def'])
+
+    def testDetokenizePartialSuccess(self):
+        data = {'records': [{'token': 'abc'}, {'token': 'invalid-token'}]}
+        try:
+            self.run_with_client(lambda client: client.detokenize(data))
+            self.fail('Should have thrown an error')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+            self.assertEqual(e.data['records'][0]['value'], 'value-abc')
+            self.assertEqual(e.data['errors'][0]['error']['code'], 404)
+
+    def testGetById(self):
+        data = {'records': [
+            {'ids': ['id1', 'id2'], 'table': 'cards', 'redaction': RedactionType.PLAIN_TEXT}]}
+        result = self.run_with_client(lambda client: client.get_by_id(data))
+        self.assertEqual(len(result['records']), 2)
+        self.assertEqual(result['records'][0]['table'], 'cards')
+        self.assertEqual(result['records'][1]['fields']['skyflow_id'], 'id2')
+
+    def testInvokeConnection(self):
+        config = ConnectionConfig(self.vault.url + '/connection/{id}', RequestMethod.POST,
+                                  pathParams={'id': 'abc'}, requestBody={'card': '4111'})
+        result = self.run_with_client(
+            lambda client: client.invoke_connection(config))
+        self.assertEqual(result['path'], '/connection/abc')
+        self.assertEqual(result['body'], '{"card": "4111"}')
+        self.assertEqual(
+            result['headers']['x-skyflow-authorization'], self.token)
+
+    def testAsyncTokenProvider(self):
+        async def tokenProvider():
+            await asyncio.sleep(0)
+            return self.token
+
+        data = {'records': [{'token': 'abc'}]}
+        result = self.run_with_client(
+            lambda client: client.detokenize(data), tokenProvider)
+        self.assertEqual(result['records'][0]['value'], 'value-abc')
+
+    def testInvalidAsyncToken(self):
+        async def tokenProvider():
+            return 'invalid-token'
+
+        try:
+            self.run_with_client(lambda client: client.detokenize(
+                {'records': [{'token': 'abc'}]}), tokenProvider)
+            self.fail('Should have thrown an error')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.INVALID_INPUT.value)
+            self.assertEqual(
+                e.message, SkyflowErrorMessages.TOKEN_PROVIDER_INVALID_TOKEN.value)
@@ -0,0 +1,39 @@
+import unittest
+
+from skyflow.vault._client import Client
+from skyflow.vault._config import *
+from tests.vault.localVault import LocalVault, validToken
+
+
+class TestBackgroundLoop(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        token = validToken()
+        self.config = Configuration('vaultid', self.vault.url, lambda: token,
+                                    poolOptions=PoolOptions(persistentEventLoop=True))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def testDetokenizeReusesLoopAndTransport(self):
+        with Client(self.config) as client:
+            first = client.detokenize({'records': [{'token': 'abc'}]})
+            backgroundLoop = client._backgroundLoop
+            second = client.detokenize({'records': [{'token': 'def'}]})
+            self.assertIs(client._backgroundLoop, backgroundLoop)
+
+        self.assertEqual(first['records'][0]['value'], 'value-abc')
+        self.assertEqual(second['records'][0]['value'], 'value-def')
+        self.assertEqual(len(self.vault.server.clientPorts), 1)
+
+    def testCloseStopsLoop(self):
+        client = Client(self.config)
+        client.detokenize({'records': [{'token': 'abc'}]})
+        backgroundLoop = client._backgroundLoop
+        client.close()
+        self.assertIsNone(client._backgroundLoop)
+        self.assertFalse(backgroundLoop._thread.is_alive())
+        self.assertTrue(backgroundLoop.transport.closed)
@@ -0,0 +1,36 @@
+import argparse
+import contextlib
+import io
+import json
+import unittest
+
+from skyflow.testing.bench import main, parseMix, percentile
+
+
+class TestBench(unittest.TestCase):
+
+    def testParseMix(self):
+        self.assertEqual(parseMix('insert=1, detokenize=4'), {'insert': 1, 'detokenize': 4})
+        for spec in ['insert', 'update=1', 'insert=-1', 'insert=0']:
+            self.assertRaises(argparse.ArgumentTypeError, parseMix, spec)
+
+    def testPercentile(self):
+        latencies = list(range(1, 1001))
+        self.assertEqual(percentile(latencies, 50), 500)
+        self.assertEqual(percentile(latencies, 99.9), 999)
+        self.assertEqual(percentile([7], 99), 7)
+        # tail ranks round up on small samples
+        self.assertEqual(percentile(list(range(1, 26)), 90), 23)
+        self.assertEqual(percentile(list(range(1, 6)), 90), 5)
+
+    def testRunAgainstMockVault(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(['--duration', '0.5', '--concurrency', '2', '--records', '5', '--json',
+                  '--mix', 'insert=1,detokenize=1,get_by_id=1,invoke_connection=1'])
+        result = json.loads(output.getvalue())
+        self.assertGreater(result['total']['calls'], 0)
+        self.assertEqual(result['total']['errors'], 0)
+        self.assertEqual(set(result['operations']),
+                         {'insert', 'detokenize', 'get_by_id', 'invoke_connection'})
+        self.assertGreater(result['client']['cpuSeconds'], 0)
@@ -0,0 +1,115 @@
+import time
+import unittest
+
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes
+from skyflow.vault import Client, CircuitBreaker, CircuitState
+from skyflow.vault._config import *
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class BrokenDetokenizeHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        self._respond(500, {'error': {'http_code': 500, 'message': 'Internal error'}})
+
+
+class FailingTokensHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        if body['detokenizationParameters'][0]['token'].startswith('failing'):
+            return self._respond(500, {'error': {'http_code': 500, 'message': 'Internal error'}})
+        super()._detokenize(body)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.changes = []
+        self.breaker = CircuitBreaker(failureThreshold=2, recoveryTimeout=0.05,
+                                      onStateChange=lambda *change: self.changes.append(change))
+        return super().setUp()
+
+    def testOpensAfterConsecutiveFailures(self):
+        self.breaker.record('a', 500)
+        self.breaker.record('a', 200)
+        self.breaker.record('a', 503)
+        self.assertEqual(self.breaker.state('a'), CircuitState.CLOSED)
+        self.breaker.record('a', error=ConnectionError())
+        self.assertEqual(self.breaker.state('a'), CircuitState.OPEN)
+        with self.assertRaises(SkyflowError) as context:
+            self.breaker.allow('a')
+        self.assertEqual(context.exception.code, 503)
+        # other endpoints are unaffected
+        self.breaker.allow('b')
+        self.breaker.record('a', 404)
+
+    def testHalfOpenProbe(self):
+        self.breaker.record('a', 500)
+        self.breaker.record('a', 500)
+        time.sleep(0.06)
+        self.breaker.allow('a')
+        self.assertEqual(self.breaker.state('a'), CircuitState.HALF_OPEN)
+        with self.assertRaises(SkyflowError):
+            self.breaker.allow('a')
+        self.breaker.record('a', 500)
+        self.assertEqual(self.breaker.state('a'), CircuitState.OPEN)
+
+        time.sleep(0.06)
+        self.breaker.allow('a')
+        self.breaker.record('a', 200)
+        self.assertEqual(self.breaker.state('a'), CircuitState.CLOSED)
+        self.assertEqual([change[2] for change in self.changes],
+                         [CircuitState.OPEN, CircuitState.HALF_OPEN, CircuitState.OPEN,
+                          CircuitState.HALF_OPEN, CircuitState.CLOSED])
+
+    def testReleasedProbeFreesSlot(self):
+        self.breaker.record('a', 500)
+        self.breaker.record('a', 500)
+        time.sleep(0.06)
+        self.breaker.allow('a')
+        self.breaker.release('a')
+        self.breaker.allow('a')
+        self.assertEqual(self.breaker.state('a'), CircuitState.HALF_OPEN)
+
+
+class TestClientCircuitBreaker(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault(BrokenDetokenizeHandler)
+        self.token = validToken()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def testFailsFastPerEndpoint(self):
+        breaker = CircuitBreaker(failureThreshold=3, recoveryTimeout=60)
+        config = Configuration('vaultid', self.vault.url, lambda: self.token,
+                               circuitBreaker=breaker)
+        records = {'records': [{'token': str(i)} for i in range(10)]}
+        with Client(config) as client:
+            with self.assertRaises(SkyflowError):
+                client.detokenize(records, DetokenizeOptions(maxConcurrency=1))
+            self.assertEqual(len(self.vault.server.requests), 3)
+            self.assertEqual(breaker.state(self.vault.url + '/v1/vaults/vaultid/detokenize'),
+                             CircuitState.OPEN)
+
+            # inserts and connections go to endpoints with their own circuits
+            client.insert({'records': [{'table': 'cards', 'fields': {'cvv': '1'}}]})
+            client.invoke_connection(ConnectionConfig(
+                self.vault.url + '/connection', RequestMethod.POST, requestBody={'a': 1}))
+        self.assertEqual(len(self.vault.server.requests), 5)
+
+    def testOpenCircuitKeepsResults(self):
+        vault = LocalVault(FailingTokensHandler)
+        self.addCleanup(vault.close)
+        breaker = CircuitBreaker(failureThreshold=2, recoveryTimeout=60)
+        config = Configuration('vaultid', vault.url, lambda: self.token, circuitBreaker=breaker)
+        records = {'records': [{'token': token} for token in ['a', 'failing-b', 'failing-c', 'd', 'e']]}
+        with Client(config) as client:
+            with self.assertRaises(SkyflowError) as context:
+                client.detokenize(records, DetokenizeOptions(maxConcurrency=1))
+        self.assertEqual(context.exception.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+        self.assertEqual(context.exception.data['records'], [{'token': 'a', 'value': 'value-a'}])
+        self.assertEqual([error['error']['code'] for error in context.exception.data['errors']],
+                         [500, 500, 503, 503])
+        self.assertEqual(len(vault.server.requests), 3)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import jwt
+from requests.models import Response
+
+from skyflow.vault import AsyncClient
+from skyflow.vault._client import Client
+from skyflow.vault._config import *
+from skyflow.errors._skyflowerrors import *
+from skyflow.transport import AsyncTransport, TransportResponse
+
+
+def validToken():
+    return jwt.encode({'exp': int(time.time()) + 3600}, 'a' * 32, algorithm='HS256')
+
+
+def insertResponse():
+    response = Response()
+    response.status_code = 200
+    response._content = b'{"responses": [{"records": [{"skyflow_id": "id1"}]}]}'
+    return response
+
+
+class RecordingTransport(AsyncTransport):
+    async def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+        self.headers = headers
+        return TransportResponse(200, b'{}', {})
+
+    async def close(self):
+        pass
+
+
+class TestClientSession(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.token = validToken()
+        self.config = Configuration(
+            'vaultid', 'https://vault.skyflow.com', lambda: self.token)
+        return super().setUp()
+
+    def testPoolOptionsDefaults(self):
+        options = PoolOptions()
+        self.assertEqual(options.poolSize, 10)
+        self.assertEqual(options.maxConnectionsPerHost, 10)
+        self.assertTrue(options.keepAlive)
+
+    def testSessionMountsConfiguredAdapter(self):
+        config = Configuration('vaultid', 'https://vault.skyflow.com', lambda: self.token,
+                               poolOptions=PoolOptions(poolSize=3, maxConnectionsPerHost=20))
+        client = Client(config)
+        adapter = client._session.get_adapter('https://vault.skyflow.com')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 20)
+        client.close()
+
+    def testKeepAliveDisabled(self):
+        config = Configuration('vaultid', 'https://vault.skyflow.com', lambda: self.token,
+                               poolOptions=PoolOptions(keepAlive=False))
+        with Client(config) as client:
+            self.assertEqual(client._session.headers['Connection'], 'close')
+
+    def testKeepAliveDisabledForAsyncConnections(self):
+        transport = RecordingTransport()
+        config = Configuration('vaultid', 'https://vault.skyflow.com', lambda: self.token,
+                               poolOptions=PoolOptions(keepAlive=False), asyncTransport=transport)
+        connection = ConnectionConfig('https://connection.skyflow.com', RequestMethod.POST, requestBody={'a': 1})
+
+        async def invoke():
+            async with AsyncClient(config) as client:
+                await client.invoke_connection(connection)
+
+        asyncio.run(invoke())
+        self.assertEqual(transport.headers['Connection'], 'close')
+
+    def testInvalidPoolSize(self):
+        config = Configuration('vaultid', 'https://vault.skyflow.com', lambda: self.token,
+                               poolOptions=PoolOptions(poolSize=0))
+        try:
+            Client(config)
+            self.fail('Should fail due to invalid pool size')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.INVALID_INPUT.value)
+            self.assertEqual(e.message, SkyflowErrorMessages.INVALID_POSITIVE_INT.value % (
+                'poolSize', '0'))
+
+    def testInsertReusesSession(self):
+        client = Client(self.config)
+        data = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]}
+        with mock.patch.object(client._session, 'request', return_value=insertResponse()) as request:
+            client.insert(data, InsertOptions(tokens=False))
+            client.insert(data, InsertOptions(tokens=False))
+        self.assertEqual(request.call_count, 2)
+        client.close()
+
+    def testContextManagerClosesSession(self):
+        with mock.patch('requests.Session.close') as close:
+            with Client(self.config):
+                pass
+        close.assert_called_once()
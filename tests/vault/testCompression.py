@@ -0,0 +1,92 @@
+import asyncio
+import gzip
+import json
+import unittest
+
+from skyflow.vault import Client, AsyncClient
+from skyflow.vault._config import *
+from skyflow.vault._compression import ACCEPT_ENCODING
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class GzipHandler(LocalVaultHandler):
+    '''
+    Gzips every response when the client accepts it, remembering request encodings
+    '''
+
+    def do_POST(self):
+        self.server.requestEncodings.append(self.headers.get('Content-Encoding'))
+        super().do_POST()
+
+    def _respond(self, status, body):
+        if 'gzip' not in self.headers.get('Accept-Encoding', ''):
+            return super()._respond(status, body)
+        content = gzip.compress(json.dumps(body).encode())
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault(GzipHandler)
+        self.vault.server.requestEncodings = []
+        self.token = validToken()
+        self.events = []
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def config(self, requestThreshold=None):
+        compression = CompressionOptions(requestThreshold=requestThreshold,
+                                         onCompress=lambda *event: self.events.append(event))
+        return Configuration('vaultid', self.vault.url, lambda: self.token, compression=compression)
+
+    def records(self, count):
+        return {'records': [{'table': 'cards', 'fields': {'cvv': '123', 'name': 'a' * 50}}
+                            for _ in range(count)]}
+
+    def testAcceptEncoding(self):
+        self.assertTrue(ACCEPT_ENCODING.startswith('gzip, deflate'))
+
+    def testLargeInsertBodiesAreCompressed(self):
+        with Client(self.config(requestThreshold=1024)) as client:
+            small = client.insert(self.records(1))
+            large = client.insert(self.records(50))
+        self.assertEqual(small['records'][0]['fields']['skyflow_id'], 'id-0')
+        self.assertEqual(len(large['records']), 50)
+        self.assertEqual(self.vault.server.requestEncodings, [None, 'gzip'])
+
+        requests = [event for event in self.events if event[0] == 'request']
+        self.assertEqual(len(requests), 1)
+        _, originalSize, compressedSize, seconds = requests[0]
+        self.assertLess(compressedSize, originalSize / 5)
+        self.assertGreaterEqual(seconds, 0)
+
+    def testCompressedResponsesAreReported(self):
+        with Client(self.config()) as client:
+            result = client.get_by_id({'records': [{'ids': [str(i) for i in range(100)], 'table': 'cards',
+                                                    'redaction': RedactionType.PLAIN_TEXT}]})
+            client.detokenize({'records': [{'token': 'a'}]})
+        self.assertEqual(len(result['records']), 100)
+        self.assertEqual(self.vault.server.requestEncodings, [None])
+        responses = [event for event in self.events if event[0] == 'response']
+        self.assertEqual(len(responses), 2)
+        self.assertGreater(responses[0][1], responses[0][2])
+        self.assertIsNone(responses[0][3])
+
+    def testAsyncClient(self):
+        async def run():
+            async with AsyncClient(self.config(requestThreshold=1)) as client:
+                await client.insert(self.records(2))
+                return await client.detokenize({'records': [{'token': 'a'}]})
+
+        result = asyncio.run(run())
+        self.assertEqual(result['records'][0]['value'], 'value-a')
+        self.assertEqual(self.vault.server.requestEncodings, ['gzip', 'gzip'])
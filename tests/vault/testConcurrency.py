@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from skyflow.vault._concurrency import runBounded
+from skyflow.vault._client import Client
+from skyflow.vault._config import *
+from skyflow.errors._skyflowerrors import *
+from tests.vault.localVault import LocalVault, validToken
+
+
+class TestConcurrency(unittest.TestCase):
+
+    def testRunBoundedCapsInFlight(self):
+        state = {'inFlight': 0, 'peak': 0}
+
+        async def request(index):
+            state['inFlight'] += 1
+            state['peak'] = max(state['peak'], state['inFlight'])
+            await asyncio.sleep(0.001)
+            state['inFlight'] -= 1
+            return index
+
+        factories = [lambda i=i: request(i) for i in range(50)]
+        futures = asyncio.run(runBounded(factories, 4))
+        self.assertEqual(state['peak'], 4)
+        self.assertEqual([f.result() for f in futures], list(range(50)))
+
+    def testRunBoundedUnlimited(self):
+        state = {'inFlight': 0, 'peak': 0}
+
+        async def request():
+            state['inFlight'] += 1
+            state['peak'] = max(state['peak'], state['inFlight'])
+            await asyncio.sleep(0.001)
+            state['inFlight'] -= 1
+
+        asyncio.run(runBounded([request] * 20))
+        self.assertEqual(state['peak'], 20)
+
+    def testRunBoundedKeepsExceptionPerRequest(self):
+        async def fail():
+            raise ValueError('failed')
+
+        async def succeed():
+            return 'ok'
+
+        futures = asyncio.run(runBounded([succeed, fail, succeed], 1))
+        self.assertEqual(futures[0].result(), 'ok')
+        self.assertRaises(ValueError, futures[1].result)
+        self.assertEqual(futures[2].result(), 'ok')
+
+    def testInvalidClientMaxConcurrency(self):
+        config = Configuration('vaultid', 'https://vault.skyflow.com', lambda: 'token',
+                               maxConcurrency=0)
+        try:
+            Client(config)
+            self.fail('Should fail due to invalid max concurrency')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.INVALID_INPUT.value)
+            self.assertEqual(e.message, SkyflowErrorMessages.INVALID_POSITIVE_INT.value % (
+                'maxConcurrency', '0'))
+
+    def testDetokenizeWithMaxConcurrency(self):
+        vault = LocalVault()
+        token = validToken()
+        config = Configuration('vaultid', vault.url,
+                               lambda: token, maxConcurrency=2)
+        try:
+            with Client(config) as client:
+                records = {'records': [{'token': str(i)} for i in range(10)]}
+                result = client.detokenize(
+                    records, DetokenizeOptions(maxConcurrency=3))
+        finally:
+            vault.close()
+        self.assertEqual([r['value'] for r in result['records']],
+                         ['value-' + str(i) for i in range(10)])
@@ -0,0 +1,228 @@
+import asyncio
+import time
+import unittest
+
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes
+from skyflow.testing import InMemoryVault, InMemoryTransport, AsyncInMemoryTransport
+from skyflow.vault import Client, AsyncClient, RetryPolicy, RateLimiter
+from skyflow.vault._config import *
+from skyflow.vault._deadline import Deadline, DeadlineExceeded
+from tests.vault.localVault import validToken
+
+RECORDS = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}},
+                       {'table': 'cards', 'fields': {'cvv': '456'}}]}
+
+
+class SlowAfter:
+    '''
+    Latency of a vault whose first `fast` requests are instant and the others take `latency` seconds
+    '''
+
+    def __init__(self, fast, latency):
+        self.fast = fast
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return 0.0 if self.calls <= self.fast else self.latency
+
+
+class TestDeadline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = InMemoryVault()
+        self.token = validToken()
+        return super().setUp()
+
+    def config(self, **kwargs):
+        return Configuration('vaultid', 'https://vault.skyflow.test', lambda: self.token,
+                             transport=InMemoryTransport(self.vault),
+                             asyncTransport=AsyncInMemoryTransport(self.vault), **kwargs)
+
+    def insertTokens(self):
+        with Client(self.config()) as client:
+            inserted = client.insert(RECORDS)
+        return [record['fields']['cvv'] for record in inserted['records']]
+
+    def assertTimedOut(self, error, timedOut):
+        self.assertEqual(error.code, SkyflowErrorCodes.REQUEST_TIMEOUT.value)
+        self.assertEqual(error.data['timedOut'], timedOut)
+
+    def testDeadline(self):
+        self.assertIsNone(Deadline().remaining())
+        self.assertFalse(Deadline().expired())
+        deadline = Deadline(0.01)
+        self.assertLessEqual(deadline.remaining(), 0.01)
+        time.sleep(0.02)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0.0)
+        self.assertRaises(DeadlineExceeded, deadline.check)
+
+    def testInvalidTimeout(self):
+        for timeout in [0, -1, 'abc', True]:
+            self.assertRaises(SkyflowError, Client, self.config(timeout=timeout))
+        with Client(self.config()) as client:
+            try:
+                client.insert(RECORDS, InsertOptions(timeout=0))
+                self.fail('Should fail for a zero timeout')
+            except SkyflowError as e:
+                self.assertEqual(e.code, SkyflowErrorCodes.INVALID_INPUT.value)
+
+    def testInsertWithinTimeout(self):
+        with Client(self.config(timeout=5)) as client:
+            result = client.insert(RECORDS, InsertOptions(batchSize=1))
+        self.assertEqual(len(result['records']), 2)
+
+    def testInsertTimeout(self):
+        self.vault.latency = SlowAfter(1, 1.0)
+        started = time.monotonic()
+        with Client(self.config()) as client:
+            try:
+                client.insert(RECORDS, InsertOptions(batchSize=1, maxConcurrency=1, timeout=0.2))
+                self.fail('Should fail when the second chunk is too slow')
+            except SkyflowError as e:
+                self.assertTimedOut(e, [RECORDS['records'][1]])
+                self.assertEqual(len(e.data['records']), 1)
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def testClientTimeout(self):
+        self.vault.latency = 1.0
+        with Client(self.config(timeout=0.1)) as client:
+            try:
+                client.insert(RECORDS)
+                self.fail('Should fail when the vault is too slow')
+            except SkyflowError as e:
+                self.assertTimedOut(e, RECORDS['records'])
+                self.assertEqual(e.data['records'], [])
+
+    def testRetriesStopAtDeadline(self):
+        self.vault.errorRate = 1
+        retryPolicy = RetryPolicy(maxAttempts=100, initialBackoff=0.05, retryableStatusCodes=(500,))
+        started = time.monotonic()
+        with Client(self.config(retryPolicy=retryPolicy)) as client:
+            try:
+                client.insert(RECORDS, InsertOptions(timeout=0.2))
+                self.fail('Should fail when every attempt fails')
+            except SkyflowError as e:
+                self.assertIn(e.code, (500, SkyflowErrorCodes.REQUEST_TIMEOUT.value))
+        self.assertLess(time.monotonic() - started, 1)
+
+    def testRateLimiterWaitStopsAtDeadline(self):
+        connection = ConnectionConfig('https://connection.skyflow.test/cards', RequestMethod.POST,
+                                      requestBody={'cvv': '123'}, timeout=0.5)
+        with Client(self.config(rateLimiter=RateLimiter(rate=0.2, burst=1))) as client:
+            client.insert(RECORDS)
+            started = time.monotonic()
+            for call in [lambda: client.insert(RECORDS, InsertOptions(timeout=0.5)),
+                         lambda: client.invoke_connection(connection)]:
+                try:
+                    call()
+                    self.fail('Should fail when the next token comes after the deadline')
+                except SkyflowError as e:
+                    self.assertEqual(e.code, SkyflowErrorCodes.REQUEST_TIMEOUT.value)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(self.vault.requestCount, 1)
+
+    def testDetokenizeTimeout(self):
+        tokens = self.insertTokens()
+        self.vault.latency = SlowAfter(1, 1.0)
+        started = time.monotonic()
+        with Client(self.config()) as client:
+            try:
+                client.detokenize({'records': [{'token': token} for token in tokens]},
+                                  DetokenizeOptions(maxConcurrency=1, timeout=0.2))
+                self.fail('Should fail when the second request is too slow')
+            except SkyflowError as e:
+                self.assertTimedOut(e, [{'token': tokens[1]}])
+                self.assertEqual(e.data['records'][0]['value'], '123')
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def testGetByIdTimeout(self):
+        self.vault.latency = 1.0
+        records = {'records': [{'ids': ['id1'], 'table': 'cards', 'redaction': RedactionType.PLAIN_TEXT}]}
+        with Client(self.config()) as client:
+            try:
+                client.get_by_id(records, GetByIdOptions(timeout=0.1))
+                self.fail('Should fail when the vault is too slow')
+            except SkyflowError as e:
+                self.assertTimedOut(e, [{'ids': ['id1'], 'table': 'cards'}])
+
+    def testDetokenizeStreamTimeout(self):
+        tokens = self.insertTokens()
+        self.vault.latency = SlowAfter(1, 1.0)
+        items = []
+        with Client(self.config()) as client:
+            try:
+                for item in client.detokenize_stream({'records': [{'token': token} for token in tokens]},
+                                                     DetokenizeOptions(maxConcurrency=1, timeout=0.2)):
+                    items.append(item)
+                self.fail('Should fail when the second request is too slow')
+            except SkyflowError as e:
+                self.assertEqual(e.code, SkyflowErrorCodes.REQUEST_TIMEOUT.value)
+        self.assertEqual([item['value'] for item in items], ['123'])
+
+    def testTokenProviderTimeout(self):
+        def slowTokenProvider():
+            time.sleep(0.2)
+            return self.token
+
+        config = Configuration('vaultid', 'https://vault.skyflow.test', slowTokenProvider,
+                               transport=InMemoryTransport(self.vault))
+        with Client(config) as client:
+            try:
+                client.insert(RECORDS, InsertOptions(timeout=0.1))
+                self.fail('Should fail when the token takes longer than the timeout')
+            except SkyflowError as e:
+                self.assertEqual(e.code, SkyflowErrorCodes.REQUEST_TIMEOUT.value)
+        self.assertEqual(self.vault.requestCount, 0)
+
+    def testAsyncInsertTimeout(self):
+        self.vault.latency = SlowAfter(1, 1.0)
+
+        async def insert():
+            async with AsyncClient(self.config()) as client:
+                return await client.insert(RECORDS, InsertOptions(batchSize=1, maxConcurrency=1, timeout=0.2))
+
+        started = time.monotonic()
+        try:
+            asyncio.run(insert())
+            self.fail('Should fail when the second chunk is too slow')
+        except SkyflowError as e:
+            self.assertTimedOut(e, [RECORDS['records'][1]])
+            self.assertEqual(len(e.data['records']), 1)
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def testAsyncTokenProviderTimeout(self):
+        async def slowTokenProvider():
+            await asyncio.sleep(1)
+            return self.token
+
+        async def detokenize():
+            config = Configuration('vaultid', 'https://vault.skyflow.test', slowTokenProvider,
+                                   asyncTransport=AsyncInMemoryTransport(self.vault), timeout=0.1)
+            async with AsyncClient(config) as client:
+                return await client.detokenize({'records': [{'token': 'token'}]})
+
+        started = time.monotonic()
+        try:
+            asyncio.run(detokenize())
+            self.fail('Should fail when the token takes longer than the timeout')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.REQUEST_TIMEOUT.value)
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def testAsyncInvokeConnectionTimeout(self):
+        self.vault.latency = 1.0
+        connection = ConnectionConfig('https://connection.skyflow.test/cards', RequestMethod.POST,
+                                      requestBody={'cvv': '123'}, timeout=0.1)
+
+        async def invoke():
+            async with AsyncClient(self.config()) as client:
+                return await client.invoke_connection(connection)
+
+        try:
+            asyncio.run(invoke())
+            self.fail('Should fail when the connection is too slow')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.REQUEST_TIMEOUT.value)
@@ -0,0 +1,106 @@
+import time
+import unittest
+
+from skyflow.vault._client import Client
+from skyflow.vault._config import *
+from skyflow.errors._skyflowerrors import *
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class ThrottlingHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        self._respond(429, {'error': {'http_code': 429, 'message': 'Too many requests'}})
+
+
+class UnauthorizedHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        self._respond(401, {'error': {'http_code': 401, 'message': 'Unauthorized'}})
+
+
+class UnavailableHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        self._respond(503, {'error': {'http_code': 503, 'message': 'Service unavailable'}})
+
+
+class SlowSingleTokenHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        if len(body['detokenizationParameters']) == 1:
+            time.sleep(0.2)
+        super()._detokenize(body)
+
+
+class TestDetokenizeBatching(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        token = validToken()
+        self.client = Client(Configuration(
+            'vaultid', self.vault.url, lambda: token))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.vault.close()
+        return super().tearDown()
+
+    def testBatchedRequests(self):
+        records = {'records': [{'token': str(i)} for i in range(25)]}
+        result = self.client.detokenize(
+            records, DetokenizeOptions(batchSize=10))
+        self.assertEqual(len(self.vault.server.requests), 3)
+        self.assertEqual([r['token'] for r in result['records']],
+                         [str(i) for i in range(25)])
+        self.assertEqual(result['records'][24]['value'], 'value-24')
+
+    def testFailedBatchMapsErrorsToTokens(self):
+        records = {'records': [{'token': 'a'}, {'token': 'invalid-b'},
+                               {'token': 'c'}, {'token': 'd'}]}
+        try:
+            self.client.detokenize(records, DetokenizeOptions(batchSize=2))
+            self.fail('Should have thrown an error')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+            self.assertEqual([r['token'] for r in e.data['records']],
+                             ['a', 'c', 'd'])
+            self.assertEqual(len(e.data['errors']), 1)
+            self.assertEqual(e.data['errors'][0]['error']['description'],
+                             'Token not found for invalid-b')
+        # two batches, then the failed batch re-sent token by token
+        self.assertEqual(len(self.vault.server.requests), 4)
+
+    def testThrottledUnauthorizedAndServerErrorsAreNotSplit(self):
+        records = {'records': [{'token': str(i)} for i in range(4)]}
+        for handler, status in [(ThrottlingHandler, 429), (UnauthorizedHandler, 401), (UnavailableHandler, 503)]:
+            vault = LocalVault(handler)
+            self.addCleanup(vault.close)
+            with Client(Configuration('vaultid', vault.url, lambda: validToken())) as client:
+                for detokenize in [lambda: client.detokenize(records, DetokenizeOptions(batchSize=2)),
+                                   lambda: list(client.detokenize_stream(records, DetokenizeOptions(batchSize=2)))]:
+                    try:
+                        errors = detokenize()
+                    except SkyflowError as e:
+                        errors = e.data['errors']
+                    # one error per token, no request per token
+                    self.assertEqual([error['error']['code'] for error in errors], [status] * 4)
+            self.assertEqual(len(vault.server.requests), 4)
+
+    def testStreamSendsSplitTokensConcurrently(self):
+        vault = LocalVault(SlowSingleTokenHandler)
+        self.addCleanup(vault.close)
+        records = {'records': [{'token': token} for token in ['invalid-a', 'b', 'c', 'd']]}
+        started = time.monotonic()
+        with Client(Configuration('vaultid', vault.url, lambda: validToken())) as client:
+            items = list(client.detokenize_stream(records, DetokenizeOptions(batchSize=4, maxConcurrency=4)))
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(sorted(item.get('token', '') for item in items), ['', 'b', 'c', 'd'])
+        self.assertEqual(len(vault.server.requests), 5)
+
+    def testInvalidBatchSize(self):
+        try:
+            self.client.detokenize({'records': [{'token': 'a'}]},
+                                   DetokenizeOptions(batchSize=0))
+            self.fail('Should have thrown an error')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.INVALID_INPUT.value)
+            self.assertEqual(e.message, SkyflowErrorMessages.INVALID_POSITIVE_INT.value % (
+                'batchSize', '0'))
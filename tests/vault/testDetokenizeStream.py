@@ -0,0 +1,76 @@
+import asyncio
+import time
+import unittest
+
+from skyflow.vault import Client, AsyncClient
+from skyflow.vault._config import *
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class SlowTokenHandler(LocalVaultHandler):
+    def _detokenize(self, body):
+        if body['detokenizationParameters'][0]['token'] == 'slow':
+            time.sleep(0.3)
+        super()._detokenize(body)
+
+
+class TestDetokenizeStream(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault(SlowTokenHandler)
+        self.token = validToken()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def config(self, poolOptions=None):
+        return Configuration('vaultid', self.vault.url, lambda: self.token, poolOptions=poolOptions)
+
+    def testYieldsInCompletionOrder(self):
+        records = {'records': [{'token': 'slow'}, {'token': 'a'}, {'token': 'b'}]}
+        with Client(self.config()) as client:
+            items = list(client.detokenize_stream(records))
+        # a and b may arrive in either order, both before the slow token
+        self.assertEqual({item['token'] for item in items[:2]}, {'a', 'b'})
+        self.assertEqual(items[2]['token'], 'slow')
+
+    def testYieldsErrorsAsItems(self):
+        records = {'records': [{'token': 'a'}, {'token': 'invalid-b'}]}
+        with Client(self.config()) as client:
+            items = list(client.detokenize_stream(
+                records, DetokenizeOptions(maxConcurrency=1)))
+        self.assertEqual(items[0], {'token': 'a', 'value': 'value-a'})
+        self.assertEqual(items[1]['error']['code'], 404)
+
+    def testBatchedStreamMapsErrorsToTokens(self):
+        records = {'records': [{'token': 'a'}, {'token': 'invalid-b'}, {'token': 'c'}]}
+        with Client(self.config()) as client:
+            items = list(client.detokenize_stream(
+                records, DetokenizeOptions(batchSize=3)))
+        self.assertEqual(sorted(item.get('token', 'error') for item in items),
+                         ['a', 'c', 'error'])
+
+    def testEarlyCloseOnPersistentLoop(self):
+        records = {'records': [{'token': str(i)} for i in range(50)]}
+        with Client(self.config(PoolOptions(persistentEventLoop=True))) as client:
+            stream = client.detokenize_stream(
+                records, DetokenizeOptions(maxConcurrency=2))
+            first = next(stream)
+            stream.close()
+            self.assertIn('value', first)
+            # the client keeps working after an abandoned stream
+            result = client.detokenize({'records': [{'token': 'x'}]})
+            self.assertEqual(result['records'][0]['value'], 'value-x')
+        self.assertLess(len(self.vault.server.requests), 50)
+
+    def testAsyncStream(self):
+        records = {'records': [{'token': 'slow'}, {'token': 'a'}]}
+
+        async def run():
+            async with AsyncClient(self.config()) as client:
+                return [item async for item in client.detokenize_stream(records)]
+
+        items = asyncio.run(run())
+        self.assertEqual([item['token'] for item in items], ['a', 'slow'])
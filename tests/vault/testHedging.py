@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from skyflow.vault import Client, HedgingPolicy
+from skyflow.vault._config import *
+from skyflow.vault._hedging import hedgeAsync
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class SlowOnceHandler(LocalVaultHandler):
+    '''
+    The first request for the token "slow" or the table "slow" takes half a second
+    '''
+
+    def _detokenize(self, body):
+        if body['detokenizationParameters'][0]['token'] == 'slow':
+            self._slowOnce()
+        super()._detokenize(body)
+
+    def do_GET(self):
+        if '/slow?' in self.path:
+            self._slowOnce()
+        super().do_GET()
+
+    def _slowOnce(self):
+        with self.server.lock:
+            first = not self.server.slowed
+            self.server.slowed = True
+        if first:
+            time.sleep(0.5)
+
+
+class TestHedgingPolicy(unittest.TestCase):
+
+    def testDelayFollowsPercentile(self):
+        policy = HedgingPolicy(percentile=90, initialDelay=1.0,
+                               minDelay=0.001, minSamples=10)
+        self.assertEqual(policy.getDelay(), 1.0)
+        for latency in range(1, 11):
+            policy.onLatency(latency / 100)
+        self.assertEqual(policy.getDelay(), 0.1)
+
+    def testBudget(self):
+        policy = HedgingPolicy(budget=0.5, maxBurst=1)
+        self.assertFalse(policy.tryHedge())
+        for _ in range(10):
+            policy.onRequest()
+        self.assertTrue(policy.tryHedge())
+        self.assertFalse(policy.tryHedge())
+
+    def testFirstResponseWinsAndLoserIsCancelled(self):
+        policy = HedgingPolicy(initialDelay=0.01, budget=1)
+        calls = []
+        cancelled = []
+
+        async def request():
+            calls.append(len(calls))
+            try:
+                await asyncio.sleep(0.5 if len(calls) == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return len(calls)
+
+        started = time.monotonic()
+        self.assertEqual(asyncio.run(hedgeAsync(policy, request)), 2)
+        self.assertLess(time.monotonic() - started, 0.3)
+        self.assertEqual(cancelled, [True])
+
+    def testFailedCopyWaitsForTheOther(self):
+        policy = HedgingPolicy(initialDelay=0.01, budget=1)
+        calls = []
+
+        async def request():
+            calls.append(None)
+            if len(calls) == 1:
+                await asyncio.sleep(0.05)
+                return 'slow'
+            raise ConnectionError()
+
+        self.assertEqual(asyncio.run(hedgeAsync(policy, request)), 'slow')
+
+
+class TestClientHedging(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault(SlowOnceHandler)
+        self.vault.server.lock = threading.Lock()
+        self.vault.server.slowed = False
+        self.token = validToken()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def config(self, hedgingPolicy):
+        return Configuration('vaultid', self.vault.url, lambda: self.token, hedgingPolicy=hedgingPolicy)
+
+    def testDetokenizeHedgesSlowRequest(self):
+        with Client(self.config(HedgingPolicy(initialDelay=0.05, budget=1))) as client:
+            started = time.monotonic()
+            result = client.detokenize({'records': [{'token': 'slow'}]})
+            self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(result['records'][0]['value'], 'value-slow')
+        self.assertEqual(len(self.vault.server.requests), 2)
+
+    def testGetByIdHedgesSlowRequest(self):
+        records = {'records': [{'ids': ['a'], 'table': 'slow',
+                                'redaction': RedactionType.PLAIN_TEXT}]}
+        with Client(self.config(HedgingPolicy(initialDelay=0.05, budget=1))) as client:
+            started = time.monotonic()
+            result = client.get_by_id(records)
+            self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(len(result['records']), 1)
+
+    def testNoHedgeWithoutBudget(self):
+        with Client(self.config(HedgingPolicy(initialDelay=0.05, budget=0))) as client:
+            client.detokenize({'records': [{'token': 'slow'}]})
+        self.assertEqual(len(self.vault.server.requests), 1)
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorMessages
+from skyflow.vault import Client, AsyncClient
+from skyflow.vault._config import *
+from skyflow.transport import Http2Transport
+from skyflow.transport._transport import httpx
+from tests.vault.localVault import LocalVault, validToken
+
+
+class TestHttp2Transport(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        self.token = validToken()
+        self.config = Configuration('vaultid', self.vault.url, lambda: self.token,
+                                    poolOptions=PoolOptions(http2=True))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def testHttp2ImpliesPersistentLoop(self):
+        self.assertTrue(PoolOptions(http2=True).persistentEventLoop)
+        self.assertFalse(PoolOptions().http2)
+
+    @unittest.skipUnless(httpx, 'requires the skyflow[http2] extra')
+    def testAllOperationsUseTransport(self):
+        with Client(self.config) as client:
+            with mock.patch.object(client._session, 'post') as post, \
+                    mock.patch.object(client._session, 'send') as send:
+                inserted = client.insert(
+                    {'records': [{'table': 'cards', 'fields': {'cvv': '1'}}]})
+                detokenized = client.detokenize(
+                    {'records': [{'token': str(i)} for i in range(20)]})
+                records = client.get_by_id({'records': [{'ids': ['a'], 'table': 'cards',
+                                                         'redaction': RedactionType.PLAIN_TEXT}]})
+                echoed = client.invoke_connection(ConnectionConfig(
+                    self.vault.url + '/connection', RequestMethod.POST, requestBody={'a': 1}))
+            post.assert_not_called()
+            send.assert_not_called()
+            transport = client._backgroundLoop.transport
+            self.assertIsInstance(transport, Http2Transport)
+        self.assertTrue(transport.closed)
+
+        self.assertEqual(inserted['records'][0]['fields']['skyflow_id'], 'id-0')
+        self.assertEqual(len(detokenized['records']), 20)
+        self.assertEqual(len(records['records']), 1)
+        self.assertEqual(echoed['body'], '{"a": 1}')
+
+    @unittest.skipUnless(httpx, 'requires the skyflow[http2] extra')
+    def testAsyncClient(self):
+        async def run():
+            async with AsyncClient(self.config) as client:
+                result = await client.detokenize({'records': [{'token': 'a'}]})
+                self.assertIsInstance(client._transport, Http2Transport)
+                return result
+
+        self.assertEqual(asyncio.run(run())['records'][0]['value'], 'value-a')
+
+    def testMissingDependency(self):
+        with mock.patch('skyflow.transport._transport.httpx', None):
+            with self.assertRaises(SkyflowError) as context:
+                Client(self.config)
+        self.assertEqual(context.exception.message,
+                         SkyflowErrorMessages.HTTP2_NOT_AVAILABLE.value)
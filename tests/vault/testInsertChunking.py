@@ -0,0 +1,81 @@
+import json
+import unittest
+
+from skyflow.vault._insert import getInsertRequestBody, getInsertRequestChunks
+from skyflow.vault._client import Client
+from skyflow.vault._config import *
+from skyflow.errors._skyflowerrors import *
+from tests.vault.localVault import LocalVault, validToken
+
+
+def cardRecords(count, table='cards'):
+    return {'records': [{'table': table, 'fields': {'cvv': str(i)}} for i in range(count)]}
+
+
+class TestInsertChunking(unittest.TestCase):
+
+    def testSingleChunkMatchesRequestBody(self):
+        data = cardRecords(3)
+        chunks = getInsertRequestChunks(data, True)
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0][1], getInsertRequestBody(data, True))
+        self.assertEqual(json.loads(chunks[0][1]), {'records': [
+            {'tableName': 'cards', 'fields': {'cvv': str(i)}, 'method': 'POST', 'quorum': True} for i in range(3)] + [
+            {'method': 'GET', 'tableName': 'cards', 'ID': '$responses.%d.records.0.skyflow_id' % i,
+             'tokenization': True} for i in range(3)]})
+
+    def testChunksByCount(self):
+        chunks = getInsertRequestChunks(cardRecords(7), True, batchSize=3)
+        self.assertEqual([len(request['records'])
+                         for request, _ in chunks], [3, 3, 1])
+        lastBody = json.loads(chunks[2][1])
+        self.assertEqual(lastBody['records'][0]['fields'], {'cvv': '6'})
+        self.assertEqual(lastBody['records'][1]['ID'],
+                         '$responses.0.records.0.skyflow_id')
+
+    def testChunksByBytes(self):
+        chunks = getInsertRequestChunks(
+            cardRecords(10), False, maxBatchBytes=250)
+        for _, body in chunks:
+            self.assertLessEqual(len(body), 250)
+        self.assertEqual(sum(len(request['records'])
+                         for request, _ in chunks), 10)
+        self.assertGreater(len(chunks), 1)
+
+    def testOversizedRecordSentAlone(self):
+        chunks = getInsertRequestChunks(
+            cardRecords(2), True, maxBatchBytes=10)
+        self.assertEqual([len(request['records'])
+                         for request, _ in chunks], [1, 1])
+
+    def testClientInsertChunksKeepOrder(self):
+        vault = LocalVault()
+        token = validToken()
+        try:
+            with Client(Configuration('vaultid', vault.url, lambda: token)) as client:
+                result = client.insert(cardRecords(
+                    10), InsertOptions(batchSize=3, maxConcurrency=2))
+        finally:
+            vault.close()
+        self.assertEqual(len(vault.server.requests), 4)
+        self.assertEqual([r['fields']['cvv'] for r in result['records']],
+                         ['token-' + str(i) for i in range(10)])
+
+    def testClientInsertPartialFailure(self):
+        vault = LocalVault()
+        token = validToken()
+        data = cardRecords(2)
+        data['records'].append({'table': 'invalid', 'fields': {'cvv': '1'}})
+        try:
+            with Client(Configuration('vaultid', vault.url, lambda: token)) as client:
+                client.insert(data, InsertOptions(tokens=False, batchSize=2))
+            self.fail('Should have thrown an error')
+        except SkyflowError as e:
+            self.assertEqual(e.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+            self.assertEqual(len(e.data['records']), 2)
+            self.assertEqual(e.data['errors'][0]['error'], {
+                             'code': 400, 'description': 'Invalid table'})
+            # the inputs of the failed chunk, to be resubmitted
+            self.assertEqual(e.data['errors'][0]['records'], [data['records'][2]])
+        finally:
+            vault.close()
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+
+from skyflow.vault import Client, AsyncClient
+from skyflow.vault._config import *
+from skyflow.errors._skyflowerrors import *
+from tests.vault.localVault import LocalVault, validToken
+
+
+class TestInsertStream(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        token = validToken()
+        self.config = Configuration('vaultid', self.vault.url, lambda: token)
+        self.consumed = 0
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def records(self, count, table='cards'):
+        for i in range(count):
+            self.consumed += 1
+            yield {'table': table, 'fields': {'cvv': str(i)}}
+
+    def testStreamYieldsBatchesInOrder(self):
+        with Client(self.config) as client:
+            batches = list(client.insert_stream(
+                self.records(25), InsertOptions(batchSize=10)))
+        self.assertEqual([len(batch['records']) for batch in batches], [10, 10, 5])
+        values = [r['fields']['cvv'] for batch in batches for r in batch['records']]
+        self.assertEqual(values, ['token-' + str(i) for i in range(25)])
+
+    def testStreamReadsLazily(self):
+        with Client(self.config) as client:
+            stream = client.insert_stream(self.records(1000), InsertOptions(
+                tokens=False, batchSize=10, maxConcurrency=2))
+            first = next(stream)
+            self.assertEqual(len(first['records']), 10)
+            self.assertLessEqual(self.consumed, 30)
+            stream.close()
+
+    def testStreamRaisesFailedBatch(self):
+        with Client(self.config) as client:
+            stream = client.insert_stream(
+                self.records(5, table='invalid'), InsertOptions(batchSize=5))
+            try:
+                next(stream)
+                self.fail('Should have thrown an error')
+            except SkyflowError as e:
+                self.assertEqual(e.code, 400)
+                self.assertEqual(e.message, 'Invalid table')
+
+    def mixedRecords(self):
+        for table in ['cards', 'invalid', 'cards', 'cards']:
+            for i in range(2):
+                yield {'table': table, 'fields': {'cvv': str(i)}}
+
+    def assertReportsInFlightBatches(self, batches, error):
+        # the batches sent with the failed one are reported, not dropped
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(error.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+        self.assertEqual(len(error.data['records']), 4)
+        self.assertEqual(error.data['errors'][0]['error']['code'], 400)
+        self.assertEqual([record['table'] for record in error.data['errors'][0]['records']], ['invalid'] * 2)
+        self.assertEqual(len(self.vault.server.requests), 4)
+
+    def testStreamReportsBatchesInFlightWithFailure(self):
+        batches = []
+        with Client(self.config) as client:
+            try:
+                for batch in client.insert_stream(self.mixedRecords(), InsertOptions(batchSize=2, maxConcurrency=4)):
+                    batches.append(batch)
+                self.fail('Should have thrown an error')
+            except SkyflowError as e:
+                self.assertReportsInFlightBatches(batches, e)
+
+    def testAsyncStreamReportsBatchesInFlightWithFailure(self):
+        batches = []
+
+        async def run():
+            async with AsyncClient(self.config) as client:
+                async for batch in client.insert_stream(self.mixedRecords(),
+                                                        InsertOptions(batchSize=2, maxConcurrency=4)):
+                    batches.append(batch)
+
+        try:
+            asyncio.run(run())
+            self.fail('Should have thrown an error')
+        except SkyflowError as e:
+            self.assertReportsInFlightBatches(batches, e)
+
+    def testAsyncStreamFromAsyncIterable(self):
+        async def records():
+            for i in range(7):
+                yield {'table': 'cards', 'fields': {'cvv': str(i)}}
+
+        async def run():
+            async with AsyncClient(self.config) as client:
+                return [batch async for batch in client.insert_stream(records(), InsertOptions(batchSize=3))]
+
+        batches = asyncio.run(run())
+        self.assertEqual([len(batch['records']) for batch in batches], [3, 3, 1])
+        self.assertEqual(batches[2]['records'][0]['fields']['cvv'], 'token-6')
@@ -0,0 +1,88 @@
+import argparse
+import subprocess
+import sys
+import time
+import unittest
+
+import requests
+
+from skyflow.errors._skyflowerrors import SkyflowError
+from skyflow.testing import InMemoryVault, FixedLatency, UniformLatency, LognormalLatency
+from skyflow.testing.mockvault import MockVaultServer, parseLatency
+from skyflow.vault import Client, RetryPolicy
+from skyflow.vault._config import *
+from tests.vault.localVault import validToken
+
+RECORDS = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]}
+
+
+class TestMockVault(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.token = validToken()
+        return super().setUp()
+
+    def config(self, server, **kwargs):
+        return Configuration('vaultid', server.url, lambda: self.token, **kwargs)
+
+    def testClientRoundTrip(self):
+        with MockVaultServer() as server, Client(self.config(server)) as client:
+            inserted = client.insert(RECORDS)
+            token = inserted['records'][0]['fields']['cvv']
+            result = client.detokenize({'records': [{'token': token}]})
+        self.assertEqual(result['records'][0]['value'], '123')
+
+    def testCompressedInsert(self):
+        with MockVaultServer() as server, \
+                Client(self.config(server, compression=CompressionOptions(requestThreshold=1))) as client:
+            result = client.insert(RECORDS, InsertOptions(tokens=False))
+        self.assertEqual(len(result['records']), 1)
+
+    def testLatency(self):
+        with MockVaultServer(InMemoryVault(latency=FixedLatency(0.1))) as server:
+            started = time.monotonic()
+            requests.post(server.url + '/echo', data='{}')
+            self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def testThrottling(self):
+        vault = InMemoryVault(throttleRate=1, retryAfter=2)
+        with MockVaultServer(vault) as server:
+            response = requests.post(server.url + '/v1/vaults/vaultid/detokenize', data='{}')
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers['Retry-After'], '2')
+
+            with Client(self.config(server)) as client:
+                try:
+                    client.insert(RECORDS)
+                    self.fail('Should fail when every request is throttled')
+                except SkyflowError as e:
+                    self.assertEqual(e.code, 429)
+
+    def testRetriedErrors(self):
+        vault = InMemoryVault(errorRate=0.5, seed=1)
+        retryPolicy = RetryPolicy(
+            maxAttempts=10, initialBackoff=0.001, retryableStatusCodes=(500,), nonIdempotentStatusCodes=(500,))
+        with MockVaultServer(vault) as server, Client(self.config(server, retryPolicy=retryPolicy)) as client:
+            for _ in range(5):
+                client.insert(RECORDS)
+        self.assertGreater(vault.requestCount, 5)
+
+    def testParseLatency(self):
+        self.assertEqual(parseLatency('fixed:0.5')(), 0.5)
+        self.assertIsInstance(parseLatency('uniform:0.1,0.2'), UniformLatency)
+        self.assertIsInstance(parseLatency('lognormal:0.01,0.5'), LognormalLatency)
+        for spec in ['fixed', 'normal:1', 'uniform:1', 'fixed:abc']:
+            self.assertRaises(argparse.ArgumentTypeError, parseLatency, spec)
+
+    def testCommandLine(self):
+        process = subprocess.Popen([sys.executable, '-m', 'skyflow.testing.mockvault', '--port', '0'],
+                                   stdout=subprocess.PIPE, universal_newlines=True)
+        try:
+            url = process.stdout.readline().split()[-1]
+            response = requests.post(url + '/v1/auth/sa/oauth/token',
+                                     json={'grant_type': 'urn:ietf:params:oauth:grant-type:jwt-bearer'})
+            self.assertEqual(response.json()['tokenType'], 'Bearer')
+        finally:
+            process.terminate()
+            process.wait()
+            process.stdout.close()
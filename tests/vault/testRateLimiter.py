@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes
+from skyflow.vault import Client, AsyncClient, RateLimiter
+from skyflow.vault._config import *
+from skyflow.vault._deadline import DeadlineExceeded
+from tests.vault.localVault import LocalVault, validToken
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def testBurstIsImmediate(self):
+        limiter = RateLimiter(rate=1, burst=5)
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - started, 0.05)
+
+    def testWaitsForRefill(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def testDefaultBurstIsRate(self):
+        self.assertEqual(RateLimiter(rate=2.5).burst, 3)
+        self.assertEqual(RateLimiter(rate=0.5).burst, 1)
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
+
+    def testFailFast(self):
+        limiter = RateLimiter(rate=1, burst=2, blocking=False)
+        limiter.acquire()
+        limiter.acquire()
+        with self.assertRaises(SkyflowError) as context:
+            limiter.acquire()
+        self.assertEqual(context.exception.code, 429)
+
+    def testTimeoutReturnsToken(self):
+        limiter = RateLimiter(rate=10, burst=1)
+        limiter.acquire()
+        with self.assertRaises(DeadlineExceeded):
+            limiter.acquire(timeout=0.05)
+        started = time.monotonic()
+        limiter.acquire(timeout=0.15)
+        # one refill, the failed call did not keep its token
+        self.assertLess(time.monotonic() - started, 0.15)
+
+    def testCancelledWaitReturnsToken(self):
+        limiter = RateLimiter(rate=10, burst=1)
+
+        async def run():
+            await limiter.acquireAsync()
+            waiting = asyncio.ensure_future(limiter.acquireAsync())
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            started = time.monotonic()
+            await limiter.acquireAsync()
+            return time.monotonic() - started
+
+        # waits for one refill, not for the cancelled reservation as well
+        self.assertLess(asyncio.run(run()), 0.15)
+
+    def testAsyncAcquireDoesNotBlockLoop(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(ticker(), *[limiter.acquireAsync() for _ in range(3)])
+
+        started = time.monotonic()
+        asyncio.run(run())
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+        self.assertEqual(len(ticks), 5)
+
+
+class TestClientRateLimiting(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        self.token = validToken()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def config(self, limiter):
+        return Configuration('vaultid', self.vault.url, lambda: self.token, rateLimiter=limiter)
+
+    def testSharedAcrossClientsAndThreads(self):
+        limiter = RateLimiter(rate=100, burst=2)
+        records = {'records': [{'token': str(i)} for i in range(5)]}
+
+        def work():
+            with Client(self.config(limiter)) as client:
+                client.detokenize(records)
+                client.insert(
+                    {'records': [{'table': 'cards', 'fields': {'cvv': '1'}}]})
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 24 requests at 100 per second after a burst of 2
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(len(self.vault.server.requests), 24)
+
+    def testFailFastInFanOut(self):
+        limiter = RateLimiter(rate=0.01, burst=2, blocking=False)
+        with Client(self.config(limiter)) as client:
+            with self.assertRaises(SkyflowError) as context:
+                client.detokenize(
+                    {'records': [{'token': str(i)} for i in range(5)]})
+        self.assertEqual(context.exception.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+        self.assertEqual(len(context.exception.data['records']), 2)
+        self.assertEqual([error['error']['code'] for error in context.exception.data['errors']], [429] * 3)
+        self.assertEqual(len(self.vault.server.requests), 2)
+
+    def testFanOutOverBudgetKeepsResults(self):
+        limiter = RateLimiter(rate=0.01, burst=20, blocking=False)
+        with Client(self.config(limiter)) as client:
+            with self.assertRaises(SkyflowError) as context:
+                client.detokenize(
+                    {'records': [{'token': str(i)} for i in range(100)]})
+            self.assertEqual(len(context.exception.data['records']), 20)
+            self.assertEqual(len(context.exception.data['errors']), 80)
+
+            with self.assertRaises(SkyflowError) as context:
+                client.get_by_id({'records': [{'ids': [str(i)], 'table': 'cards',
+                                               'redaction': RedactionType.PLAIN_TEXT} for i in range(5)]})
+            self.assertEqual(context.exception.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+            self.assertEqual([error['error']['code'] for error in context.exception.data['errors']], [429] * 5)
+        self.assertEqual(len(self.vault.server.requests), 20)
+
+    def testConnectionsAreLimited(self):
+        limiter = RateLimiter(rate=1, burst=1, blocking=False)
+        connection = ConnectionConfig(
+            self.vault.url + '/connection', RequestMethod.POST, requestBody={'a': 1})
+
+        async def run():
+            async with AsyncClient(self.config(limiter)) as client:
+                await client.invoke_connection(connection)
+                await client.invoke_connection(connection)
+
+        with self.assertRaises(SkyflowError):
+            asyncio.run(run())
+        with Client(self.config(limiter)) as client:
+            with self.assertRaises(SkyflowError):
+                client.invoke_connection(connection)
+        self.assertEqual(len(self.vault.server.requests), 1)
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+import requests
+
+from skyflow.errors._skyflowerrors import SkyflowError
+from skyflow.vault import Client, AsyncClient, RetryPolicy
+from skyflow.vault._config import *
+from skyflow.vault._retry import parseRetryAfter
+from skyflow.transport._transport import httpx
+from tests.vault.localVault import LocalVault, LocalVaultHandler, validToken
+
+
+class FlakyHandler(LocalVaultHandler):
+    '''
+    Answers the first request for every token, id or insert body with a 503
+    '''
+
+    def _detokenize(self, body):
+        if self._firstSeen(json.dumps(body)):
+            return self._unavailable()
+        super()._detokenize(body)
+
+    def _insert(self, body):
+        if self._firstSeen(json.dumps(body)):
+            return self._unavailable()
+        super()._insert(body)
+
+    def do_GET(self):
+        if self._firstSeen(self.path):
+            return self._unavailable()
+        super().do_GET()
+
+    def _firstSeen(self, key):
+        with self.server.lock:
+            seen = key in self.server.seen
+            self.server.seen.add(key)
+            self.server.attempts += 1
+        return not seen
+
+    status = 503
+
+    def _unavailable(self):
+        content = json.dumps({'error': {'http_code': self.status, 'message': 'Unavailable'}}).encode()
+        self.send_response(self.status)
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class GatewayTimeoutHandler(FlakyHandler):
+    status = 504
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def testBackoffGrowsAndIsCapped(self):
+        policy = RetryPolicy(maxAttempts=10, initialBackoff=0.1,
+                             maxBackoff=0.3, jitter=False)
+        self.assertEqual([policy.getDelay(attempt, 503) for attempt in (1, 2, 3)],
+                         [0.1, 0.2, 0.3])
+
+    def testJitterStaysWithinBackoff(self):
+        policy = RetryPolicy(maxAttempts=10, initialBackoff=0.1)
+        for _ in range(20):
+            self.assertTrue(0 <= policy.getDelay(2, 429) <= 0.2)
+
+    def testGivesUpAfterMaxAttempts(self):
+        policy = RetryPolicy(maxAttempts=2)
+        self.assertIsNotNone(policy.getDelay(1, 503))
+        self.assertIsNone(policy.getDelay(2, 503))
+
+    def testOnlyRetryableOutcomes(self):
+        policy = RetryPolicy()
+        self.assertIsNone(policy.getDelay(1, 200))
+        self.assertIsNone(policy.getDelay(1, 400))
+        self.assertIsNone(policy.getDelay(1, error=ValueError()))
+        self.assertIsNotNone(policy.getDelay(1, error=asyncio.TimeoutError()))
+
+    def testNonIdempotentOnlyWhenNotProcessed(self):
+        policy = RetryPolicy()
+        for status in (429, 503):
+            self.assertIsNotNone(policy.getDelay(1, status, idempotent=False))
+        for status in (502, 504):
+            self.assertIsNone(policy.getDelay(1, status, idempotent=False))
+        self.assertIsNotNone(policy.getDelay(1, error=requests.exceptions.ConnectionError(), idempotent=False))
+        self.assertIsNone(policy.getDelay(1, error=requests.exceptions.ReadTimeout(), idempotent=False))
+        self.assertIsNone(policy.getDelay(1, error=asyncio.TimeoutError(), idempotent=False))
+
+    @unittest.skipUnless(httpx, 'requires the skyflow[http2] extra')
+    def testHttp2TransportErrors(self):
+        policy = RetryPolicy()
+        self.assertIsNotNone(policy.getDelay(1, error=httpx.ConnectError('refused')))
+        self.assertIsNotNone(policy.getDelay(1, error=httpx.ReadTimeout('timed out')))
+
+    def testRetryAfter(self):
+        policy = RetryPolicy(maxBackoff=5.0)
+        self.assertEqual(policy.getDelay(1, 429, headers={'Retry-After': '3'}), 3.0)
+        self.assertIsNone(policy.getDelay(1, 429, headers={'Retry-After': '60'}))
+        ignoring = RetryPolicy(respectRetryAfter=False, jitter=False)
+        self.assertEqual(ignoring.getDelay(1, 429, headers={'Retry-After': '3'}), 0.1)
+
+    def testParseRetryAfterDate(self):
+        date = time.strftime('%a, %d %b %Y %H:%M:%S GMT',
+                             time.gmtime(time.time() + 30))
+        self.assertTrue(25 < parseRetryAfter(date) <= 30)
+        self.assertIsNone(parseRetryAfter('soon'))
+
+
+class TestClientRetries(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault(FlakyHandler)
+        self.vault.server.seen = set()
+        self.vault.server.attempts = 0
+        self.vault.server.lock = threading.Lock()
+        self.token = validToken()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def config(self, retryPolicy):
+        return Configuration('vaultid', self.vault.url, lambda: self.token, retryPolicy=retryPolicy)
+
+    def testWithoutPolicyFailuresAreReturned(self):
+        with Client(self.config(None)) as client:
+            with self.assertRaises(SkyflowError) as context:
+                client.detokenize({'records': [{'token': 'a'}]})
+        self.assertEqual(context.exception.data['errors'][0]['error']['code'], 503)
+
+    def testFanOutRetriesOnlyFailedRequests(self):
+        records = {'records': [{'token': str(i)} for i in range(5)]}
+        with Client(self.config(RetryPolicy())) as client:
+            result = client.detokenize(records)
+        self.assertEqual(len(result['records']), 5)
+        # one failed and one successful attempt per token
+        self.assertEqual(self.vault.server.attempts, 10)
+
+    def testGetByIdAndInsertRetry(self):
+        with Client(self.config(RetryPolicy())) as client:
+            result = client.get_by_id({'records': [{'ids': ['a'], 'table': 'cards',
+                                                    'redaction': RedactionType.PLAIN_TEXT}]})
+            self.assertEqual(len(result['records']), 1)
+            result = client.insert(
+                {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]})
+            self.assertEqual(result['records'][0]['fields']['skyflow_id'], 'id-0')
+
+    def testInsertNotRetriedAfterGatewayTimeout(self):
+        vault = LocalVault(GatewayTimeoutHandler)
+        self.addCleanup(vault.close)
+        vault.server.seen = set()
+        vault.server.attempts = 0
+        vault.server.lock = threading.Lock()
+        config = Configuration('vaultid', vault.url, lambda: self.token, retryPolicy=RetryPolicy())
+        with Client(config) as client:
+            with self.assertRaises(SkyflowError) as context:
+                client.insert({'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]})
+            self.assertEqual(context.exception.code, 504)
+            self.assertEqual(vault.server.attempts, 1)
+            # reads are still retried
+            client.detokenize({'records': [{'token': 'a'}]})
+        self.assertEqual(vault.server.attempts, 3)
+
+    def testAsyncClientRetries(self):
+        async def run():
+            async with AsyncClient(self.config(RetryPolicy())) as client:
+                await client.insert({'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]})
+                return await client.detokenize({'records': [{'token': 'a'}]})
+
+        result = asyncio.run(run())
+        self.assertEqual(result['records'][0]['value'], 'value-a')
+        self.assertEqual(self.vault.server.attempts, 4)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import jwt
+
+from skyflow.testing import InMemoryVault, InMemoryTransport
+from skyflow.vault import Client
+from skyflow.vault._config import Configuration
+from skyflow.vault._token import TokenCache
+from tests.vault.localVault import validToken
+
+
+class CountingProvider:
+    '''
+    Token provider taking `delay` seconds per call and counting its calls
+    '''
+
+    def __init__(self, delay=0.1, lifetime=3600):
+        self.delay = delay
+        self.lifetime = lifetime
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return validToken(self.lifetime)
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def testSingleFlight(self):
+        provider = CountingProvider()
+        cache = TokenCache(provider)
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            tokens = list(executor.map(lambda _: cache.get('Test'), range(64)))
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(len(set(tokens)), 1)
+
+    def testStillValidTokenDuringRefresh(self):
+        provider = CountingProvider(delay=0.3)
+        cache = TokenCache(provider)
+        # expires in 100 seconds, inside the 5 minute refresh window
+        cache.token = validToken(100)
+        refresh = threading.Thread(target=cache.get, args=('Test',))
+        refresh.start()
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        token = cache.get('Test')
+        self.assertLess(time.monotonic() - started, 0.2)
+        self.assertEqual(token, cache.token)
+        refresh.join()
+        self.assertEqual(provider.calls, 1)
+        self.assertNotEqual(cache.token, token)
+
+    def testClaimsDecodedOnce(self):
+        token = jwt.encode({'exp': time.time() + 3600}, 'a' * 32, algorithm='HS256')
+        cache = TokenCache(lambda: token)
+        with mock.patch('skyflow._utils.jwt.decode', wraps=jwt.decode) as decode:
+            for _ in range(10):
+                self.assertEqual(cache.get('Test'), token)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(cache.expiresAt, jwt.decode(token, options={'verify_signature': False})['exp'])
+
+    def testAsyncSingleFlight(self):
+        calls = []
+
+        async def provider():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return validToken()
+
+        cache = TokenCache(provider)
+
+        async def getTokens():
+            return await asyncio.gather(*[cache.getAsync('Test') for _ in range(20)])
+
+        tokens = asyncio.run(getTokens())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(tokens)), 1)
+        # the lock is recreated for a new event loop
+        asyncio.run(getTokens())
+
+    def testClientThreads(self):
+        provider = CountingProvider()
+        vault = InMemoryVault()
+        config = Configuration('vaultid', 'https://vault.skyflow.test', lambda: provider(),
+                               transport=InMemoryTransport(vault))
+        records = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]}
+        with Client(config) as client, ThreadPoolExecutor(max_workers=64) as executor:
+            list(executor.map(lambda _: client.insert(records), range(64)))
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(vault.requestCount, 64)
+
+    def testStoredTokenSetter(self):
+        provider = CountingProvider()
+        config = Configuration('vaultid', 'https://vault.skyflow.test', lambda: provider(),
+                               transport=InMemoryTransport(InMemoryVault()))
+        with Client(config) as client:
+            token = validToken()
+            client.storedToken = token
+            self.assertEqual(client.storedToken, token)
+            client.insert({'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]})
+        # the assigned token is used until it nears expiry
+        self.assertEqual(provider.calls, 0)
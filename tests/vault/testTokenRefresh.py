@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+
+from skyflow.testing import InMemoryVault, InMemoryTransport
+from skyflow.vault import Client, TokenRefreshPolicy
+from skyflow.vault._config import Configuration
+from tests.vault.localVault import validToken
+
+RECORDS = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]}
+
+
+class Provider:
+    '''
+    Token provider counting its calls, failing the first `failures` of them
+    '''
+
+    def __init__(self, lifetime=3600, failures=0):
+        self.lifetime = lifetime
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise ConnectionError('token endpoint unavailable')
+        return validToken(self.lifetime)
+
+
+def waitFor(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestTokenRefresh(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = InMemoryVault()
+        return super().setUp()
+
+    def config(self, provider, policy):
+        return Configuration('vaultid', 'https://vault.skyflow.test', lambda: provider(),
+                             transport=InMemoryTransport(self.vault), tokenRefresh=policy)
+
+    def testRefreshDelay(self):
+        policy = TokenRefreshPolicy(refreshAt=0.5)
+        now = time.time()
+        token = validToken(1000)
+        self.assertAlmostEqual(policy.getRefreshDelay(token, now), 500, delta=2)
+        self.assertEqual(policy.getRefreshDelay(token, now - 1000), 0)
+        self.assertEqual(policy.getRefreshDelay('', None), 0)
+
+    def testBackoff(self):
+        policy = TokenRefreshPolicy(initialBackoff=1, maxBackoff=5)
+        self.assertEqual([policy.getBackoff(n) for n in range(1, 5)], [1, 2, 4, 5])
+
+    def testFetchesTokenAhead(self):
+        provider = Provider()
+        with Client(self.config(provider, TokenRefreshPolicy())) as client:
+            self.assertTrue(waitFor(lambda: client.storedToken != ''))
+            client.insert(RECORDS)
+            client.insert(RECORDS)
+        self.assertEqual(provider.calls, 1)
+
+    def testRenewsAtFractionOfLifetime(self):
+        provider = Provider(lifetime=400)
+        # renewed every 0.4 seconds
+        with Client(self.config(provider, TokenRefreshPolicy(refreshAt=0.001))) as client:
+            self.assertTrue(waitFor(lambda: provider.calls >= 3))
+            client.insert(RECORDS)
+        calls = provider.calls
+        time.sleep(0.5)
+        self.assertEqual(provider.calls, calls)
+
+    def testRetriesFailedRefresh(self):
+        provider = Provider(failures=2)
+        policy = TokenRefreshPolicy(initialBackoff=0.05)
+        with Client(self.config(provider, policy)) as client:
+            self.assertTrue(waitFor(lambda: client.storedToken != ''))
+        self.assertEqual(provider.calls, 3)
+
+    def testTokenDueImmediately(self):
+        # expired tokens must not make the thread call the provider in a loop
+        provider = Provider(lifetime=-10)
+        policy = TokenRefreshPolicy(initialBackoff=0.2)
+        with Client(self.config(provider, policy)):
+            time.sleep(0.3)
+        self.assertLessEqual(provider.calls, 3)
@@ -0,0 +1,99 @@
+import asyncio
+import json
+import unittest
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes
+from skyflow.service_account import generate_bearer_token_from_creds
+from skyflow.testing import InMemoryVault, InMemoryTransport, AsyncInMemoryTransport
+from skyflow.vault import Client, AsyncClient
+from skyflow.vault._config import *
+from skyflow.transport import Transport, AsyncTransport
+from tests.vault.localVault import validToken
+
+RECORDS = {'records': [{'table': 'cards', 'fields': {'card_number': '4111111111111111', 'cvv': '123'}},
+                       {'table': 'cards', 'fields': {'card_number': '5555555555554444', 'cvv': '456'}}]}
+
+
+class TestInMemoryTransport(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = InMemoryVault()
+        self.token = validToken()
+        self.config = Configuration('vaultid', 'https://vault.skyflow.test', lambda: self.token,
+                                    transport=InMemoryTransport(self.vault),
+                                    asyncTransport=AsyncInMemoryTransport(self.vault))
+        return super().setUp()
+
+    def testIncompleteTransportFailsOnCreation(self):
+        class NoClose(Transport):
+            def request(self, method, url, headers=None, data=None, params=None, verify=True, timeout=None):
+                pass
+
+        class NoRequest(AsyncTransport):
+            async def close(self):
+                pass
+
+        self.assertRaises(TypeError, NoClose)
+        self.assertRaises(TypeError, NoRequest)
+
+    def testClientRoundTrip(self):
+        with Client(self.config) as client:
+            inserted = client.insert(RECORDS)
+            fields = inserted['records'][0]['fields']
+            detokenized = client.detokenize(
+                {'records': [{'token': fields['card_number']}]})
+            fetched = client.get_by_id({'records': [{'ids': [fields['skyflow_id']], 'table': 'cards',
+                                                     'redaction': RedactionType.MASKED}]})
+
+        self.assertEqual(detokenized['records'][0]['value'], '4111111111111111')
+        self.assertEqual(fetched['records'][0]['fields']['card_number'], '************1111')
+        self.assertEqual(self.vault.requestCount, 3)
+
+    def testAsyncClientRoundTrip(self):
+        async def roundTrip():
+            async with AsyncClient(self.config) as client:
+                inserted = await client.insert(RECORDS, InsertOptions(batchSize=1))
+                tokens = [record['fields']['cvv'] for record in inserted['records']]
+                return await client.detokenize({'records': [{'token': token} for token in tokens]})
+
+        result = asyncio.run(roundTrip())
+        self.assertEqual([record['value'] for record in result['records']], ['123', '456'])
+
+    def testUnknownToken(self):
+        with Client(self.config) as client:
+            try:
+                client.detokenize({'records': [{'token': 'unknown'}]})
+                self.fail('Should fail for an unknown token')
+            except SkyflowError as e:
+                self.assertEqual(e.code, SkyflowErrorCodes.PARTIAL_SUCCESS.value)
+                self.assertIn('Token not found for unknown',
+                              e.data['errors'][0]['error']['description'])
+
+    def testInvokeConnection(self):
+        connection = ConnectionConfig('https://connection.skyflow.test/cards/{card_id}', RequestMethod.POST,
+                                      pathParams={'card_id': '1234'}, requestBody={'cvv': '123'})
+        with Client(self.config) as client:
+            result = client.invoke_connection(connection)
+        self.assertEqual(result['path'], '/cards/1234')
+        self.assertEqual(json.loads(result['body']), {'cvv': '123'})
+        self.assertEqual(result['headers']['x-skyflow-authorization'], self.token)
+
+    def testLatencyFunction(self):
+        vault = InMemoryVault(latency=lambda: 0.001)
+        response = InMemoryTransport(vault).request('GET', 'https://vault.skyflow.test/v1/vaults/id/cards',
+                                                    params={'skyflow_ids': []})
+        self.assertEqual(response.statusCode, 200)
+        self.assertEqual(json.loads(response.content), {'records': []})
+
+    def testServiceAccountToken(self):
+        privateKey = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+        credentials = json.dumps({'privateKey': privateKey.decode(), 'clientID': 'client', 'keyID': 'key',
+                                  'tokenURI': 'https://manage.skyflow.test/v1/auth/sa/oauth/token'})
+        token, tokenType = generate_bearer_token_from_creds(
+            credentials, transport=InMemoryTransport(self.vault))
+        self.assertEqual(tokenType, 'Bearer')
+        self.assertEqual(token.count('.'), 2)
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from skyflow.errors._skyflowerrors import SkyflowError, SkyflowErrorCodes
+from skyflow.vault import Client, AsyncClient
+from skyflow.vault._config import *
+from tests.vault.localVault import LocalVault, validToken
+
+RECORDS = {'records': [{'table': 'cards', 'fields': {'cvv': '123'}}]}
+
+
+class TestWarmup(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vault = LocalVault()
+        self.token = validToken()
+        self.tokenCalls = 0
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.vault.close()
+        return super().tearDown()
+
+    def tokenProvider(self):
+        self.tokenCalls += 1
+        return self.token
+
+    def config(self, **poolOptions):
+        return Configuration('vaultid', self.vault.url, lambda: self.tokenProvider(),
+                             poolOptions=PoolOptions(**poolOptions))
+
+    def testWarmupOpensConnectionsAndFetchesToken(self):
+        with Client(self.config()) as client:
+            client.warmup(3)
+            self.assertEqual(self.tokenCalls, 1)
+            self.assertEqual(len(self.vault.server.clientPorts), 3)
+            client.insert(RECORDS)
+        self.assertEqual(self.tokenCalls, 1)
+        self.assertEqual(len(self.vault.server.clientPorts), 3)
+
+    def testWarmupOnConstruction(self):
+        with Client(self.config(maxConnectionsPerHost=2, persistentEventLoop=True, warmup=True)) as client:
+            self.assertEqual(self.tokenCalls, 1)
+            # one pool for insert and invoke_connection, one for detokenize and get_by_id
+            self.assertEqual(len(self.vault.server.clientPorts), 4)
+            client.detokenize({'records': [{'token': 'abc'}]})
+        self.assertEqual(len(self.vault.server.clientPorts), 4)
+
+    def testAsyncWarmup(self):
+        async def warmup():
+            async with AsyncClient(self.config(maxConnectionsPerHost=2, warmup=True)) as client:
+                await client.detokenize({'records': [{'token': 'abc'}]})
+
+        asyncio.run(warmup())
+        self.assertEqual(self.tokenCalls, 1)
+        self.assertEqual(len(self.vault.server.clientPorts), 2)
+
+    def testInvalidConnections(self):
+        with Client(self.config()) as client:
+            try:
+                client.warmup(0)
+                self.fail('Should fail for zero connections')
+            except SkyflowError as e:
+                self.assertEqual(e.code, SkyflowErrorCodes.INVALID_INPUT.value)